@@ -1,7 +1,14 @@
+from gcode_interpreter import FlushPolicy
 from machine.arduino.machine import Arduino3AxisSerialMachine
+from motion_planner import MotionPlanner
 
 STEPS_PER_REVOLUTION = 200.0 * 32.0
 
+# The maximum acceleration of the tool (in mm/s^2, e.g. 50) or None to execute every move at its full feed rate
+# from start to end. With the acceleration limited (please refer to motion_planner), higher feed rates can be
+# used without the motors losing steps, and consecutive moves are executed without slowing down in between.
+MOTION_PLANNER_ACCELERATION = None
+
 MACHINE = Arduino3AxisSerialMachine(
     # Because the X and Y axes screw pitch is 3mm, Z axis is 4mm on my machine.
     # Feel free to configure as you see fit.
@@ -13,4 +20,32 @@ MACHINE = Arduino3AxisSerialMachine(
     invert_z=False,
     default_feed_rate=500,
     rapid_move_feed_rate=500,
+    # Requires the firmware from this repository to be uploaded - older versions don't support lookahead
+    # nor switching the baud rate.
+    lookahead=True,
+    baud_rate=115200,
+    motion_planner=MotionPlanner(MOTION_PLANNER_ACCELERATION) if MOTION_PLANNER_ACCELERATION else None,
 )
+
+# With lookahead enabled, the firmware executes the moves as new ones arrive, so flushing before the
+# end of the program would only introduce stops.
+GCODE_FLUSH_POLICY = FlushPolicy.END_OF_PROGRAM
+
+# If not None, runs of linear (G1) moves are simplified before being milled or simulated, so that the path
+# deviates from the original one by at most this many millimeters - e.g. 0.01. Nearly collinear moves
+# (common in programs converted from curves) are merged, so that there are fewer moves to execute.
+GCODE_SIMPLIFICATION_TOLERANCE = None
+
+# How many simulation results should be kept in memory, so that simulating the same program again
+# (e.g. rendering it as SVG after displaying it in 3D) is instant.
+SIMULATION_CACHE_SIZE = 16
+# A directory to store the simulation results in (so that they survive restarts) or None to keep them only
+# in memory.
+SIMULATION_CACHE_DIRECTORY = None
+
+# How many bytes of rendered SVG previews should be kept in memory and for how many seconds.
+SVG_STORE_MAX_BYTES = 64 * 1024 * 1024
+SVG_STORE_TTL = 3600
+# SVG previews rendered to files by older versions are removed when they are older than this (in seconds).
+STALE_SVG_FILES_MAX_AGE = 24 * 3600
+STALE_SVG_FILES_CHECK_INTERVAL = 3600
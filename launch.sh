@@ -3,4 +3,6 @@
 . bin/create_and_enter_virtualenv.sh
 
 export FLASK_APP=src/server.py
+# Type annotations are checked in tests - in production, the checks would only slow down the moves
+export CNC_DISABLE_TYPECHECKING=1
 PYTHONPATH=.:src python -m flask run -h 0.0.0.0
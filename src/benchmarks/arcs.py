@@ -0,0 +1,101 @@
+"""
+A benchmark of arc interpolation: generating all arc points at once and sending the segments to the machine
+in one go vs. the way GCodeInterpreter used to do it - a typechecked _move_to_absolute() call (and a distance
+check) per segment.
+
+Usage:
+
+    PYTHONPATH=.:src python -m benchmarks.arcs [number of arcs in the synthetic program]
+"""
+import sys
+import time
+
+from gcode_interpreter import GCodeInterpreter
+from gcode_program import compile_gcode_string
+from machine.base import BaseMachine
+from machine.simulated_machine import SimulatedMachine
+from pygcode_modules import flower
+from utils.math_utils import euclidean_distance
+
+
+class LegacyArcGCodeInterpreter(GCodeInterpreter):
+    """
+    Sends arc segments to the machine one by one, the way GCodeInterpreter used to.
+    """
+    def _move_by_many_and_update_tool_position(self, moves, feed_rate):
+        x = self._tool_positions.x.tool_position
+        y = self._tool_positions.y.tool_position
+        z = self._tool_positions.z.tool_position
+
+        for move_x, move_y, move_z in moves:
+            # The old loop checked the distance to the arc finish after every segment.
+            euclidean_distance((x, y, z), (x + move_x, y + move_y, z + move_z))
+
+            x += move_x
+            y += move_y
+            z += move_z
+            self._move_to_absolute(x, y, z, feed_rate)
+
+
+class NullMachine(BaseMachine):
+    """
+    A machine that ignores the moves, so that only the interpreter is measured.
+    """
+    def initialize(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def move_by(self, x, y, z, feed_rate):
+        pass
+
+    @property
+    def default_feed_rate(self):
+        return 1
+
+    @property
+    def rapid_move_feed_rate(self):
+        return 10
+
+
+def create_program(num_arcs: int) -> str:
+    pattern = [
+        "G2 X10 Y0 I5 J0",
+        "G3 X10 Y0 I5 J0",
+        "G2 X0 Y-4 R3",
+        "G3 X0 Y4 R-3",
+    ]
+    return "G91 G17\n" + '\n'.join(pattern[i % len(pattern)] for i in range(num_arcs))
+
+
+def measure(interpreter_class, machine_class, program) -> float:
+    machine = machine_class()
+    start_time = time.perf_counter()
+    interpreter_class(machine).run_program(program)
+    return time.perf_counter() - start_time
+
+
+def main():
+    num_arcs = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    # Parsing is the same in both cases, so it is done once, outside of the measurements.
+    programs = [
+        ("flower.py", compile_gcode_string(flower.code())),
+        ("%d synthetic arcs" % num_arcs, compile_gcode_string(create_program(num_arcs))),
+    ]
+
+    for program_description, program in programs:
+        print(program_description)
+        for machine_class in [NullMachine, SimulatedMachine]:
+            before = measure(LegacyArcGCodeInterpreter, machine_class, program)
+            after = measure(GCodeInterpreter, machine_class, program)
+
+            print("    %s" % machine_class.__name__)
+            print("        segment by segment: %.03f s" % before)
+            print("        all at once:        %.03f s" % after)
+            print("        speedup:            %.02fx" % (before / after))
+
+
+if __name__ == '__main__':
+    main()
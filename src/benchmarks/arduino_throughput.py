@@ -0,0 +1,112 @@
+"""
+A benchmark of the Arduino serial protocol: how many moves per second can be sent to the (emulated) firmware
+and how long it takes for a single move to be executed, for different Arduino3AxisSerialMachine settings
+and baud rates (negotiated after connecting, as with the real firmware).
+
+The moves (segments of circles, as generated for arcs by GCodeInterpreter) are executed instantly by
+the emulator, so that only the protocol and the serial link are measured.
+
+Usage:
+
+    PYTHONPATH=.:src python -m benchmarks.arduino_throughput [number of moves] [baud rate...]
+"""
+import math
+import sys
+import time
+import typing
+
+from machine.arduino.emulator import ArduinoEmulator
+from machine.arduino.machine import Arduino3AxisSerialMachine, FIRMWARE_INITIAL_BAUD_RATE
+
+
+BAUD_RATES = [9600, 115200, 250000, 1000000]
+
+CONFIGURATIONS = [
+    ("lockstep, no batching", dict(batch_size=1, max_commands_in_flight=1, compact_encoding=False)),
+    ("window, no batching", dict(batch_size=1, compact_encoding=False)),
+    ("window, batches of 3", dict(batch_size=3, compact_encoding=False)),
+    ("window, batches of 3, lookahead", dict(batch_size=3, lookahead=True, compact_encoding=False)),
+    ("window, batches of 10, lookahead, compact", dict(batch_size=10, lookahead=True)),
+]
+
+# The circles the moves are segments of
+CIRCLE_RADIUS = 5
+CIRCLE_NUM_SEGMENTS = 60
+
+
+def create_machine(emulator: ArduinoEmulator, **kwargs) -> Arduino3AxisSerialMachine:
+    machine = Arduino3AxisSerialMachine(
+        steps_per_mm_x=100,
+        steps_per_mm_y=100,
+        steps_per_mm_z=100,
+        invert_x=False,
+        invert_y=False,
+        invert_z=False,
+        default_feed_rate=100,
+        rapid_move_feed_rate=200,
+        port_path_template=emulator.port_path,
+        **kwargs
+    )
+    machine.initialize()
+    return machine
+
+
+def create_moves(num_moves: int) -> typing.List[typing.Tuple[float, float, float]]:
+    angle_step = 2 * math.pi / CIRCLE_NUM_SEGMENTS
+    return [
+        (
+            CIRCLE_RADIUS * (math.cos((i + 1) * angle_step) - math.cos(i * angle_step)),
+            CIRCLE_RADIUS * (math.sin((i + 1) * angle_step) - math.sin(i * angle_step)),
+            0,
+        )
+        for i in range(num_moves)
+    ]
+
+
+def measure_throughput(machine: Arduino3AxisSerialMachine, moves: typing.List[typing.Tuple[float, float, float]]) \
+        -> float:
+    start_time = time.perf_counter()
+    for x, y, z in moves:
+        machine.move_by(x, y, z, 100)
+    machine.flush()
+    return len(moves) / (time.perf_counter() - start_time)
+
+
+def measure_latency(machine: Arduino3AxisSerialMachine, num_moves: int) -> float:
+    start_time = time.perf_counter()
+    for unused_i in range(num_moves):
+        machine.move_by(0.1, 0, 0, 100)
+        machine.flush()
+    return (time.perf_counter() - start_time) / num_moves
+
+
+def main():
+    num_moves = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    baud_rates = [int(baud_rate) for baud_rate in sys.argv[2:]] or BAUD_RATES
+
+    moves = create_moves(num_moves)
+
+    print("%d moves" % num_moves)
+    for baud_rate in baud_rates:
+        print("%d baud" % baud_rate)
+
+        for description, kwargs in CONFIGURATIONS:
+            with ArduinoEmulator(baud_rate=FIRMWARE_INITIAL_BAUD_RATE, time_scale=0) as emulator:
+                machine = create_machine(emulator, baud_rate=baud_rate, **kwargs)
+                try:
+                    num_received_bytes = emulator.num_received_bytes
+                    throughput = measure_throughput(machine, moves)
+                    bytes_per_move = (emulator.num_received_bytes - num_received_bytes) / num_moves
+                    latency = measure_latency(machine, max(num_moves // 20, 1))
+                finally:
+                    machine.close()
+
+            print("    %s" % description)
+            print("        throughput:       %.01f moves/s" % throughput)
+            print("        bytes sent:       %.01f per move" % bytes_per_move)
+            print("        move+flush time:  %.02f ms" % (1000 * latency))
+            print("        RX overflows:     %d" % emulator.rx_overflows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+A simulated cycle-time estimate of the bundled G-code modules (pygcode_modules), with the acceleration limited:
+each move stopping at its end (which is what executing the moves independently requires) vs. the speeds
+planned with lookahead across consecutive moves (please refer to motion_planner). The time without
+any acceleration limit (i.e. with infinite acceleration) is printed as a lower bound.
+
+Usage:
+
+    PYTHONPATH=.:src python -m benchmarks.cycle_time [acceleration in mm/s^2] [feed rate in mm/min]
+"""
+import importlib
+import math
+import os
+import sys
+
+from gcode_interpreter import GCodeInterpreter
+from machine.base import BaseMachine
+from motion_planner import DEFAULT_JUNCTION_DEVIATION, MotionPlanner
+
+
+class RecordingMachine(BaseMachine):
+    """
+    A machine that only records the moves.
+    """
+    def __init__(self, feed_rate):
+        self.moves = []
+        self._feed_rate = feed_rate
+
+    def initialize(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def move_by(self, x, y, z, feed_rate):
+        self.moves.append((x, y, z, feed_rate))
+
+    @property
+    def default_feed_rate(self):
+        return self._feed_rate
+
+    @property
+    def rapid_move_feed_rate(self):
+        return self._feed_rate
+
+
+def planned_time(moves, planner, stop_after_every_move) -> float:
+    planned_moves = []
+    for move in moves:
+        planned_moves += planner.add(*move)
+        if stop_after_every_move:
+            planned_moves += planner.flush()
+    planned_moves += planner.flush()
+
+    return sum(planned_move.duration for planned_move in planned_moves)
+
+
+def main():
+    acceleration = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    feed_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    print("Acceleration: %g mm/s^2, junction deviation: %g mm, feed rate: %g mm/min" % (
+        acceleration, DEFAULT_JUNCTION_DEVIATION, feed_rate))
+    print("%-20s %8s %16s %16s %16s %10s" % (
+        "module", "moves", "no acceleration", "stop every move", "lookahead", "reduction"))
+
+    modules_directory = os.path.join(os.path.dirname(__file__), '..', 'pygcode_modules')
+    for name in sorted(os.listdir(modules_directory)):
+        if not name.endswith('.py') or name.startswith('__'):
+            continue
+
+        module = importlib.import_module('pygcode_modules.' + name[:-len('.py')])
+        machine = RecordingMachine(feed_rate)
+        GCodeInterpreter(machine).run_gcode_string(module.code())
+
+        unlimited_time = sum(
+            60 * math.sqrt(x * x + y * y + z * z) / move_feed_rate for x, y, z, move_feed_rate in machine.moves)
+        stopping_time = planned_time(machine.moves, MotionPlanner(acceleration), stop_after_every_move=True)
+        lookahead_time = planned_time(machine.moves, MotionPlanner(acceleration), stop_after_every_move=False)
+
+        print("%-20s %8d %14.1f s %14.1f s %14.1f s %9.0f%%" % (
+            name,
+            len(machine.moves),
+            unlimited_time,
+            stopping_time,
+            lookahead_time,
+            100 * (1 - lookahead_time / stopping_time) if stopping_time else 0,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+A micro-benchmark of per-word G-code dispatch cost: the isinstance() chain GCodeInterpreter used to walk
+for every word (calling get_param_dict() repeatedly) vs. the class-to-opcode table used by compile_gcode().
+
+Usage:
+
+    PYTHONPATH=.:src python -m benchmarks.dispatch [number of lines]
+"""
+import sys
+import time
+
+import pygcode
+import pygcode.gcodes
+
+from gcode_program import compile_gcode
+from utils.typing import typechecked
+
+
+@typechecked
+def legacy_dispatch(gcode: pygcode.gcodes.GCode) -> None:
+    """
+    The classification and parameter extraction GCodeInterpreter.run_gcode_command used to do,
+    without actually moving anything.
+    """
+    if isinstance(gcode, pygcode.gcodes.GCodeIncrementalDistanceMode):
+        pass
+    elif isinstance(gcode, pygcode.gcodes.GCodeAbsoluteDistanceMode):
+        pass
+    elif isinstance(gcode, pygcode.gcodes.GCodeSelectXYPlane):
+        pass
+    elif isinstance(gcode, pygcode.gcodes.GCodeLineNumber):
+        pass
+    elif isinstance(gcode, pygcode.gcodes.GCodeUseMillimeters):
+        pass
+    elif isinstance(gcode, pygcode.gcodes.GCodeArcMoveCW) or isinstance(gcode, pygcode.gcodes.GCodeArcMoveCCW):
+        gcode.get_param_dict().get('X', 0)
+        gcode.get_param_dict().get('Y', 0)
+        gcode.get_param_dict().get('Z', 0)
+        gcode.get_param_dict()
+    elif isinstance(gcode, pygcode.gcodes.GCodeRapidMove) or isinstance(gcode, pygcode.gcodes.GCodeLinearMove):
+        if len(set(gcode.get_param_dict().keys()) - set(['X', 'Y', 'Z'])) > 0:
+            raise Exception("Unknown axes in %s" % repr(gcode.get_param_dict()))
+
+        for axis in ['X', 'Y', 'Z']:
+            if axis in gcode.get_param_dict():
+                gcode.get_param_dict()[axis]
+    elif isinstance(gcode, pygcode.gcodes.GCodeFeedRate):
+        gcode.word.value
+    else:
+        raise Exception("Unknown GCode: %s" % gcode.__class__)
+
+
+def create_program(num_lines: int) -> str:
+    pattern = [
+        "G90 G17",
+        "G0 X1 Y2 Z3",
+        "G1 X4 Y5",
+        "F100",
+        "G1 Z-1",
+        "G2 X5 Y6 I1 J0",
+        "G3 X4 Y5 I-1 J0",
+        "N10 G91 G1 X0.1 Y0.1",
+    ]
+    return '\n'.join(pattern[i % len(pattern)] for i in range(num_lines))
+
+
+def measure(function, gcodes) -> float:
+    start_time = time.perf_counter()
+    for gcode in gcodes:
+        function(gcode)
+    return time.perf_counter() - start_time
+
+
+def main():
+    num_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    # Parsing is the same in both cases, so it is done once, outside of the measurements.
+    gcodes = [
+        gcode
+        for input_line in create_program(num_lines).split('\n')
+        for gcode in pygcode.Line(input_line).block.gcodes
+    ]
+
+    print("%d lines, %d words" % (num_lines, len(gcodes)))
+
+    # The typechecked wrappers cost the same in both cases, so the dispatch itself is also measured without them
+    # (if typechecking is disabled, there are no wrappers in the first place).
+    for description, legacy_function, function in [
+            ("with typeguard", legacy_dispatch, compile_gcode),
+            ("without typeguard", getattr(legacy_dispatch, '__wrapped__', legacy_dispatch),
+             getattr(compile_gcode, '__wrapped__', compile_gcode))]:
+        before = measure(legacy_function, gcodes)
+        after = measure(function, gcodes)
+
+        print(description)
+        print("    isinstance chain: %.03f s, %.02f us/word" % (before, 1e6 * before / len(gcodes)))
+        print("    dispatch table:   %.03f s, %.02f us/word" % (after, 1e6 * after / len(gcodes)))
+        print("    speedup:          %.02fx" % (before / after))
+
+
+if __name__ == '__main__':
+    main()
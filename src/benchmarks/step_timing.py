@@ -0,0 +1,75 @@
+"""
+A benchmark of stepper motor step timing: scheduling the steps against absolute deadlines (StepExecutor)
+vs. the way StepperMotorControlMachine used to do it - BaseMotorDriver.step(), sleeping for half of the step
+time twice per step.
+
+The motor drivers don't do anything, so only the timing itself is measured.
+
+Usage:
+
+    PYTHONPATH=.:src python -m benchmarks.step_timing [move time in seconds]
+"""
+import sys
+import time
+
+from machine.step_executor import StepExecutor
+from motor_driver.base import BaseMotorDriver
+from utils.steps_sequence import iterate_xyz_steps
+
+
+REQUESTED_STEP_RATES = [500, 2000, 5000, 10000, 20000]
+
+
+class NullMotorDriver(BaseMotorDriver):
+    def signal_go_left(self):
+        pass
+
+    def signal_go_right(self):
+        pass
+
+    def signal_pul_up(self):
+        pass
+
+    def signal_pul_down(self):
+        pass
+
+
+def measure_sleeping(num_steps: int, move_time: float) -> float:
+    """
+    Executes the steps as StepperMotorControlMachine used to and returns the achieved step rate.
+    """
+    motors = {'X': NullMotorDriver(), 'Y': NullMotorDriver()}
+    step_time = move_time / num_steps
+
+    start_time = time.perf_counter()
+    for unused_event_time, axis in iterate_xyz_steps(num_steps // 2, num_steps - num_steps // 2, 0):
+        motors[axis].step(step_time)
+    return num_steps / (time.perf_counter() - start_time)
+
+
+def main():
+    move_time = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+
+    for requested_step_rate in REQUESTED_STEP_RATES:
+        num_steps = int(requested_step_rate * move_time)
+
+        executor = StepExecutor()
+        executor.execute(
+            iterate_xyz_steps(num_steps // 2, num_steps - num_steps // 2, 0),
+            move_time,
+            {'X': NullMotorDriver(), 'Y': NullMotorDriver()},
+        )
+        statistics = executor.statistics
+
+        print("requested %d steps/s" % requested_step_rate)
+        print("    sleeping after each step: %.0f steps/s" % measure_sleeping(num_steps, move_time))
+        print("    deadlines:                %.0f steps/s, lateness %.01f us mean, %.01f us jitter, %.01f us max" % (
+            statistics.achieved_step_rate,
+            1e6 * statistics.mean_lateness,
+            1e6 * statistics.lateness_stddev,
+            1e6 * statistics.max_lateness,
+        ))
+
+
+if __name__ == '__main__':
+    main()
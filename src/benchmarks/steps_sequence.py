@@ -0,0 +1,59 @@
+"""
+A benchmark of generating the stepper motor steps of a move: merging the (already ordered) steps of each axis
+lazily vs. the way StepperMotorControlMachine used to do it - building a list of all the steps and sorting it.
+
+Usage:
+
+    PYTHONPATH=.:src python -m benchmarks.steps_sequence [length of the move in millimeters]
+"""
+import sys
+import time
+import tracemalloc
+import typing
+
+from utils.steps_sequence import create_steps_sequence, iterate_xyz_steps
+
+
+# 6400 steps per revolution (200 steps with 1/32 microstepping) and 3 mm per revolution.
+STEPS_PER_MM = 6400 / 3
+
+
+def legacy_xyz_steps_sequence(num_x_steps, num_y_steps, num_z_steps):
+    return sorted(
+        create_steps_sequence(num_x_steps, 'X') +
+        create_steps_sequence(num_y_steps, 'Y') +
+        create_steps_sequence(num_z_steps, 'Z')
+    )
+
+
+def measure(function, num_x_steps, num_y_steps, num_z_steps) -> typing.Tuple[float, int]:
+    """
+    Consumes the steps as StepperMotorControlMachine does and returns the time it took and the peak memory usage.
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    for unused_event_time, unused_axis in function(num_x_steps, num_y_steps, num_z_steps):
+        pass
+    duration = time.perf_counter() - start_time
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak_memory
+
+
+def main():
+    length = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # A diagonal move, with a bit of Z
+    num_steps = (int(length * STEPS_PER_MM), int(length * STEPS_PER_MM / 2), int(length * STEPS_PER_MM / 10))
+    print("%.1f mm move, %d steps" % (length, sum(num_steps)))
+
+    for description, function in [
+            ("sorted list", legacy_xyz_steps_sequence),
+            ("merged generators", iterate_xyz_steps)]:
+        duration, peak_memory = measure(function, *num_steps)
+        print("    %-18s %.03f s, %.02f us/step, peak memory %.01f kB" % (
+            description + ':', duration, 1e6 * duration / sum(num_steps), peak_memory / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+A benchmark of the overhead of the typeguard checks on the simulate endpoint: the G-code of a program is
+interpreted by GCodeInterpreter and the moves are collected by SimulatedMachine, as in /api/simulate/json/,
+with and without CNC_DISABLE_TYPECHECKING set.
+
+@typechecked is applied when the modules are imported, so each measurement runs in a separate process.
+
+Usage:
+
+    PYTHONPATH=.:src python -m benchmarks.typechecking [number of repetitions of the program]
+"""
+import os
+import subprocess
+import sys
+import time
+import typing
+
+from utils.typing import DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE
+
+# The program contains both straight moves and arcs, so that both the interpreter and the arc interpolation
+# are measured.
+PROGRAM = """
+G0 X10 Y10
+G1 X20 Y10 F100
+G1 X20 Y20 Z-1
+G2 X30 Y20 I5 J0
+G3 X20 Y20 I-5 J0
+G1 X10 Y10 Z0
+"""
+
+
+def measure(num_repetitions: int) -> None:
+    """
+    Simulates the program and prints the time it took and the number of the simulated moves.
+    """
+    import gcode_interpreter
+    from machine.simulated_machine import SimulatedMachine
+
+    gcode = "G90 G17\n" + PROGRAM * num_repetitions
+
+    start_time = time.perf_counter()
+    simulated_machine = SimulatedMachine()
+    gcode_interpreter.GCodeInterpreter(simulated_machine).run_gcode_string(gcode)
+    print(time.perf_counter() - start_time, len(simulated_machine.simulated_moves))
+
+
+def measure_in_subprocess(num_repetitions: int, disable_typechecking: bool) -> typing.Tuple[float, int]:
+    env = dict(os.environ)
+    env.pop(DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE, None)
+    if disable_typechecking:
+        env[DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE] = '1'
+
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.typechecking', '--measure', str(num_repetitions)],
+        env=env,
+    )
+    duration, num_moves = output.split()
+    return float(duration), int(num_moves)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure(int(sys.argv[2]))
+        return
+
+    num_repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    before, num_moves = measure_in_subprocess(num_repetitions, disable_typechecking=False)
+    after, _ = measure_in_subprocess(num_repetitions, disable_typechecking=True)
+
+    print("%d moves" % num_moves)
+    print("    with typeguard:    %.03f s, %.02f us/move" % (before, 1e6 * before / num_moves))
+    print("    without typeguard: %.03f s, %.02f us/move" % (after, 1e6 * after / num_moves))
+    print("    overhead removed:  %.02f us/move (%.02fx speedup)" % (
+        1e6 * (before - after) / num_moves, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Estimating how long a program takes to run on a machine, from its simulated moves - so that jobs can be
+scheduled, and programs that would take unexpectedly long (e.g. a huge number of tiny moves) noticed, before
+actually milling them.
+
+The rapid moves and the milling moves the program doesn't set the feed rate for are simulated with placeholder
+feed rates (please refer to SimulatedMachine), which are replaced with the feed rates of the actual machine.
+If the acceleration is given, the moves are planned the way the machine would plan them (please refer
+to motion_planner) - otherwise each of them takes its length divided by its feed rate.
+"""
+from array import array
+import collections
+import math
+import typing
+
+from machine.simulated_machine import SimulatedMoves, is_default_feed_rate
+from motion_planner import DEFAULT_JUNCTION_DEVIATION, MotionPlanner
+from utils.typing import Numeric, typechecked
+
+
+class CycleTimeEstimate(typing.NamedTuple):
+    """
+    The estimated times (in seconds) and distances (in millimeters).
+
+    The total time consists of the milling, rapid move and dwell times. The acceleration overhead is how much
+    longer the moves take because of the limited acceleration (it's included in the milling and rapid move times).
+
+    move_times are the times of the individual moves: move_times[i] is the time of the move that ends at
+    moves[i] (so move_times[0], the starting point, is zero).
+    """
+    total_time: float
+    milling_time: float
+    rapid_time: float
+    dwell_time: float
+    acceleration_overhead: float
+    milling_distance: float
+    rapid_distance: float
+    num_moves: int
+    move_times: array
+
+
+@typechecked
+def estimate_cycle_time(
+        moves: SimulatedMoves,
+        default_feed_rate: Numeric,
+        rapid_move_feed_rate: Numeric,
+        acceleration: typing.Optional[Numeric] = None,
+        junction_deviation: Numeric = DEFAULT_JUNCTION_DEVIATION) -> CycleTimeEstimate:
+    """
+    Estimates how long the simulated moves take on a machine.
+
+    :param default_feed_rate: the feed rate of the milling moves the program doesn't set the feed rate for
+        (please refer to BaseMachine.default_feed_rate)
+    :param rapid_move_feed_rate: the feed rate of the rapid moves
+    :param acceleration: the maximum acceleration (in mm/s^2) or None if the moves are executed at their full
+        feed rates from start to end
+    :param junction_deviation: please refer to motion_planner.DEFAULT_JUNCTION_DEVIATION
+    """
+    if default_feed_rate <= 0 or rapid_move_feed_rate <= 0:
+        raise ValueError("Feed rates should be positive, not %s and %s" % (default_feed_rate, rapid_move_feed_rate))
+
+    num_moves = len(moves)
+    move_times = array('d', [0.0]) * num_moves
+    constant_feed_rate_times = array('d', [0.0]) * num_moves
+    lengths = array('d', [0.0]) * num_moves
+
+    planner = MotionPlanner(acceleration, junction_deviation) if acceleration is not None else None
+    # The indices of the moves that have been passed to the planner but haven't been planned yet.
+    planned_indices = collections.deque()
+
+    def add_planned_moves(planned_moves):
+        for planned_move in planned_moves:
+            move_times[planned_indices.popleft()] = planned_move.duration
+
+    x, y, z, rapid, feed_rates = moves.columns
+    with x, y, z, rapid, feed_rates:
+        for i in range(1, num_moves):
+            move_x = x[i] - x[i - 1]
+            move_y = y[i] - y[i - 1]
+            move_z = z[i] - z[i - 1]
+            length = math.sqrt(move_x * move_x + move_y * move_y + move_z * move_z)
+            if length == 0:
+                continue
+
+            if rapid[i]:
+                feed_rate = rapid_move_feed_rate
+            elif is_default_feed_rate(feed_rates[i]):
+                feed_rate = default_feed_rate
+            else:
+                feed_rate = feed_rates[i]
+
+            lengths[i] = length
+            constant_feed_rate_times[i] = 60 * length / feed_rate  # the feed rate is in mm/min
+
+            if planner is None:
+                move_times[i] = constant_feed_rate_times[i]
+            else:
+                planned_indices.append(i)
+                add_planned_moves(planner.add(move_x, move_y, move_z, feed_rate))
+
+        if planner is not None:
+            add_planned_moves(planner.flush())
+
+        milling_time = sum((move_time for move_time, is_rapid in zip(move_times, rapid) if not is_rapid), 0.0)
+        rapid_time = sum((move_time for move_time, is_rapid in zip(move_times, rapid) if is_rapid), 0.0)
+        milling_distance = sum((length for length, is_rapid in zip(lengths, rapid) if not is_rapid), 0.0)
+        rapid_distance = sum((length for length, is_rapid in zip(lengths, rapid) if is_rapid), 0.0)
+
+    return CycleTimeEstimate(
+        total_time=milling_time + rapid_time + moves.dwell_time,
+        milling_time=milling_time,
+        rapid_time=rapid_time,
+        dwell_time=moves.dwell_time,
+        acceleration_overhead=milling_time + rapid_time - sum(constant_feed_rate_times),
+        milling_distance=milling_distance,
+        rapid_distance=rapid_distance,
+        num_moves=max(0, num_moves - 1),
+        move_times=move_times,
+    )
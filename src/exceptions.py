@@ -4,3 +4,11 @@ class MachineCommunicationException(Exception):
     """
     def __init__(self, message):
         self.message = message
+
+
+class InvalidGCodeException(Exception):
+    """
+    An exception raised when we couldn't interpret given G-code.
+    """
+    def __init__(self, message: str):
+        self.message = message
@@ -2,16 +2,27 @@ import enum
 import math
 import typing
 
-from typeguard import typechecked
 import pygcode
 import pygcode.gcodes
 
+from exceptions import InvalidGCodeException
+from gcode_program import (
+    MM_PER_INCH,
+    GCodeProgram,
+    Instruction,
+    Opcode,
+    compile_gcode,
+    compile_gcode_string,
+    iterate_instructions,
+)
+from gcode_simplification import PolylineSimplifier
 from machine.base import BaseMachine
 from tool_position import ThreeAxesToolPositionContainer
-from utils.math_utils import euclidean_distance
+from utils.math_utils import arc_num_segments
 from utils.typing import (
     Numeric,
     mockable,
+    typechecked,
 )
 
 
@@ -32,12 +43,26 @@ class Plane(enum.Enum):
     YZ = 2
 
 
-class InvalidGCodeException(Exception):
+# For each plane: the two axes an arc is drawn in (in an order such that counterclockwise means increasing
+# angles when looking from the positive direction of the third axis) and the third (helical move) axis,
+# each along with the word that specifies the arc center offset on that axis.
+PLANE_AXES = {
+    Plane.XY: (('X', 'I'), ('Y', 'J'), ('Z', 'K')),
+    Plane.ZX: (('Z', 'K'), ('X', 'I'), ('Y', 'J')),
+    Plane.YZ: (('Y', 'J'), ('Z', 'K'), ('X', 'I')),
+}
+
+
+class FlushPolicy(enum.Enum):
     """
-    An exception raised when we couldn't interpret given G-code.
+    When should the interpreter flush the machine, i.e. make it execute the moves it has cached.
+
+    Regardless of the policy, the machine is flushed after the whole program has been run.
     """
-    def __init__(self, message: str):
-        self.message = message
+    EVERY_GCODE = 0  # after every G-code command
+    EVERY_N_MOVES = 1  # after every flush_every_n_moves moves
+    ON_BUFFER_FULL = 2  # after as many moves, as the machine is able to cache (BaseMachine.buffer_size)
+    END_OF_PROGRAM = 3  # only at the end, the machine is expected to execute moves when its cache gets full
 
 
 class GCodeInterpreter():
@@ -46,117 +71,243 @@ class GCodeInterpreter():
     movement and send to a machine.
     """
     @typechecked
-    def __init__(self, machine: mockable(BaseMachine)):
+    def __init__(
+            self,
+            machine: mockable(BaseMachine),
+            flush_policy: FlushPolicy = FlushPolicy.EVERY_GCODE,
+            flush_every_n_moves: int = 1,
+            simplification_tolerance: typing.Optional[Numeric] = None):
+        """
+        :param machine: the machine to send the moves to
+        :param flush_policy: when to flush the machine (please refer to FlushPolicy)
+        :param flush_every_n_moves: how often to flush the machine when using FlushPolicy.EVERY_N_MOVES
+        :param simplification_tolerance: if not None, runs of linear moves are simplified before being run,
+            deviating from the original path by at most this many millimeters (please refer to
+            gcode_simplification)
+        """
+        if flush_every_n_moves < 1:
+            raise ValueError("flush_every_n_moves should be positive, not %d" % flush_every_n_moves)
+
         self._machine = machine
+        self._flush_policy = flush_policy
+        self._simplification_tolerance = simplification_tolerance
+        self._num_removed_moves = 0
+
+        if flush_policy == FlushPolicy.EVERY_N_MOVES:
+            self._moves_between_flushes = flush_every_n_moves
+        elif flush_policy == FlushPolicy.ON_BUFFER_FULL:
+            self._moves_between_flushes = machine.buffer_size
+        else:
+            self._moves_between_flushes = None
+        self._moves_since_flush = 0
+        # Whether the machine has been told the moves are rapid (please refer to BaseMachine.set_rapid_moves),
+        # None until the first move.
+        self._rapid_moves = None
+
         self._tool_positions = ThreeAxesToolPositionContainer()
         self._zero_tool_planes_feed()
 
+        # Built once, so that running an instruction is a single dictionary lookup.
+        self._instruction_handlers = {
+            Opcode.SET_INCREMENTAL_MODE: self._handle_set_incremental_mode,
+            Opcode.SET_ABSOLUTE_MODE: self._handle_set_absolute_mode,
+            Opcode.SELECT_XY_PLANE: self._handle_select_xy_plane,
+            Opcode.SELECT_ZX_PLANE: self._handle_select_zx_plane,
+            Opcode.SELECT_YZ_PLANE: self._handle_select_yz_plane,
+            Opcode.SET_FEED_RATE: self._handle_set_feed_rate,
+            Opcode.RAPID_MOVE: self._handle_rapid_move,
+            Opcode.LINEAR_MOVE: self._handle_linear_move,
+            Opcode.ARC_MOVE_CW: self._handle_arc_move_cw,
+            Opcode.ARC_MOVE_CCW: self._handle_arc_move_ccw,
+            Opcode.USE_MILLIMETERS: self._handle_use_millimeters,
+            Opcode.USE_INCHES: self._handle_use_inches,
+            Opcode.GO_HOME: self._handle_go_home,
+            Opcode.DWELL: self._handle_dwell,
+        }
+
     @typechecked
     def run_gcode_string(self, input_text: str) -> None:
         """
         Parse a string with G-code and run it on a machine.
         """
-        for input_line in input_text.split('\n'):
-            line = pygcode.Line(input_line)
-            for gcode in line.block.gcodes:
-                self.run_gcode_command(gcode)
-                self._machine.flush()
+        self.run_program(compile_gcode_string(input_text))
 
     @typechecked
-    def run_gcode_command(self, gcode: pygcode.gcodes.GCode) -> None:
+    def run_gcode_stream(self, input_lines: typing.Iterable[str]) -> None:
         """
-        Run single G-code command on a machine.
+        Parse G-code lines from a file object or any other iterable and run them on a machine.
+
+        The lines are parsed lazily, so memory usage doesn't depend on the program size. Caution: in
+        contrast to run_gcode_string, invalid G-code is detected only after the preceding lines have been run.
         """
-        if isinstance(gcode, pygcode.gcodes.GCodeIncrementalDistanceMode):
-            self._mode = Mode.INCREMENTAL
-        elif isinstance(gcode, pygcode.gcodes.GCodeAbsoluteDistanceMode):
-            self._mode = Mode.ABSOLUTE
-        elif isinstance(gcode, pygcode.gcodes.GCodeSelectXYPlane):
-            self._plane = Plane.XY
-        elif isinstance(gcode, pygcode.gcodes.GCodeLineNumber):
-            pass
-        elif isinstance(gcode, pygcode.gcodes.GCodeUseMillimeters):
-            pass
-        elif isinstance(gcode, pygcode.gcodes.GCodeArcMoveCW) or isinstance(gcode, pygcode.gcodes.GCodeArcMoveCCW):
-            x = self._coordinates_to_incremental(
-                'X',
-                gcode.get_param_dict().get('X', 0),
-                self._mode,
-            )
+        self._run_instructions(iterate_instructions(input_lines))
 
-            y = self._coordinates_to_incremental(
-                'Y',
-                gcode.get_param_dict().get('Y', 0),
-                self._mode,
-            )
+    @typechecked
+    def run_program(self, program: GCodeProgram) -> None:
+        """
+        Run a compiled G-code program (see gcode_program.compile_gcode_string) on a machine.
+        """
+        self._run_instructions(program)
 
-            z = self._coordinates_to_incremental(
-                'Z',
-                gcode.get_param_dict().get('Z', 0),
-                self._mode,
+    @property
+    @typechecked
+    def num_removed_moves(self) -> int:
+        """
+        How many linear moves have been removed by simplification (please refer to simplification_tolerance
+        in the constructor) in the programs run so far.
+        """
+        return self._num_removed_moves
+
+    def _run_instructions(self, instructions: typing.Iterable[Instruction]) -> None:
+        instruction_handlers = self._instruction_handlers
+        flush_after_every_instruction = self._flush_policy == FlushPolicy.EVERY_GCODE
+
+        simplifier = None
+        if self._simplification_tolerance is not None:
+            # The interpreter may have been used before, so the simplifier starts from its current state.
+            simplifier = PolylineSimplifier(
+                self._simplification_tolerance,
+                position=(
+                    self._tool_positions.x.tool_position,
+                    self._tool_positions.y.tool_position,
+                    self._tool_positions.z.tool_position,
+                ),
+                incremental=self._mode == Mode.INCREMENTAL,
+                mm_per_unit=self._mm_per_unit,
             )
+            instructions = simplifier.simplify(instructions)
 
-            if isinstance(gcode, pygcode.gcodes.GCodeArcMoveCW):
-                angular_direction = -1
-            elif isinstance(gcode, pygcode.gcodes.GCodeArcMoveCCW):
-                angular_direction = 1
-            else:
-                assert(False)
-
-            self._arc(angular_direction, x, y, 0, gcode.get_param_dict())
-
-        elif isinstance(gcode, pygcode.gcodes.GCodeRapidMove) or isinstance(gcode, pygcode.gcodes.GCodeLinearMove):
-            if len(set(gcode.get_param_dict().keys()) - set(['X', 'Y', 'Z'])) > 0:
-                raise InvalidGCodeException("Unknown axes in %s" % repr(gcode.get_param_dict()))
-
-            if 'X' in gcode.get_param_dict():
-                x = self._coordinates_to_incremental(
-                    'X',
-                    gcode.get_param_dict()['X'],
-                    self._mode,
-                )
-            else:
-                x = 0
-
-            if 'Y' in gcode.get_param_dict():
-                y = self._coordinates_to_incremental(
-                    'Y',
-                    gcode.get_param_dict()['Y'],
-                    self._mode,
-                )
-            else:
-                y = 0
-
-            if 'Z' in gcode.get_param_dict():
-                z = self._coordinates_to_incremental(
-                    'Z',
-                    gcode.get_param_dict()['Z'],
-                    self._mode,
-                )
-            else:
-                z = 0
-
-            if isinstance(gcode, pygcode.gcodes.GCodeRapidMove):
-                self._move_by_and_update_tool_position(
-                    x,
-                    y,
-                    z,
-                    self._machine.rapid_move_feed_rate,
-                )
-            elif isinstance(gcode, pygcode.gcodes.GCodeLinearMove):
-                self._move_by_and_update_tool_position(
-                    x,
-                    y,
-                    z,
-                    self._feed_rate,
-                )
-            else:
-                assert(False)
-
-        elif isinstance(gcode, pygcode.gcodes.GCodeFeedRate):
-            self._feed_rate = gcode.word.value
-        else:
-            raise InvalidGCodeException("Unknown GCode: %s" % gcode.__class__)
+        try:
+            for opcode, params in instructions:
+                instruction_handlers[opcode](params)
+                if flush_after_every_instruction:
+                    self._flush()
+        finally:
+            if simplifier is not None:
+                self._num_removed_moves += simplifier.num_removed_moves
+
+        if not flush_after_every_instruction:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._machine.flush()
+        self._moves_since_flush = 0
+
+    @typechecked
+    def run_gcode_command(
+            self,
+            gcode: pygcode.gcodes.GCode,
+            modal_params: typing.Sequence[pygcode.Word] = ()) -> None:
+        """
+        Run single G-code command on a machine.
+
+        :param modal_params: the words of the command's block that don't belong to any command (please refer
+            to gcode_program.compile_gcode), e.g. the intermediate point of G28
+        """
+        instruction = compile_gcode(gcode, modal_params)
+        if instruction is not None:
+            self.run_instruction(instruction)
+
+    @typechecked
+    def run_instruction(self, instruction: Instruction) -> None:
+        """
+        Run single compiled G-code instruction on a machine.
+        """
+        opcode, params = instruction
+
+        try:
+            handler = self._instruction_handlers[opcode]
+        except KeyError:
+            raise InvalidGCodeException("Unknown instruction: %s" % repr(instruction))
+
+        handler(params)
+
+    def _handle_set_incremental_mode(self, params: typing.Dict[str, float]) -> None:
+        self._mode = Mode.INCREMENTAL
+
+    def _handle_set_absolute_mode(self, params: typing.Dict[str, float]) -> None:
+        self._mode = Mode.ABSOLUTE
+
+    def _handle_select_xy_plane(self, params: typing.Dict[str, float]) -> None:
+        self._plane = Plane.XY
+
+    def _handle_select_zx_plane(self, params: typing.Dict[str, float]) -> None:
+        self._plane = Plane.ZX
+
+    def _handle_select_yz_plane(self, params: typing.Dict[str, float]) -> None:
+        self._plane = Plane.YZ
+
+    def _handle_use_millimeters(self, params: typing.Dict[str, float]) -> None:
+        self._mm_per_unit = 1
+
+    def _handle_use_inches(self, params: typing.Dict[str, float]) -> None:
+        self._mm_per_unit = MM_PER_INCH
+
+    def _handle_set_feed_rate(self, params: typing.Dict[str, float]) -> None:
+        self._feed_rate = params['F'] * self._mm_per_unit
+
+    def _handle_rapid_move(self, params: typing.Dict[str, float]) -> None:
+        self._set_rapid_moves(True)
+        self._linear_move(params, self._machine.rapid_move_feed_rate)
+
+    def _handle_linear_move(self, params: typing.Dict[str, float]) -> None:
+        self._set_rapid_moves(False)
+        self._linear_move(params, self._feed_rate)
+
+    def _handle_arc_move_cw(self, params: typing.Dict[str, float]) -> None:
+        self._arc_move(-1, params)
+
+    def _handle_arc_move_ccw(self, params: typing.Dict[str, float]) -> None:
+        self._arc_move(1, params)
+
+    def _handle_go_home(self, params: typing.Dict[str, float]) -> None:
+        self._set_rapid_moves(True)
+        # Move through the intermediate point first (if any), so that the tool can be lifted above the workpiece
+        # before going home.
+        if params:
+            self._linear_move(params, self._machine.rapid_move_feed_rate)
+        # We don't store any predefined positions, so the home position is where the tool positions were zeroed.
+        self._move_to_absolute(0, 0, 0, self._machine.rapid_move_feed_rate)
+
+    def _handle_dwell(self, params: typing.Dict[str, float]) -> None:
+        self._machine.dwell(params.get('P', 0))
+        self._moves_since_flush = 0
+
+    def _set_rapid_moves(self, is_rapid: bool) -> None:
+        if self._rapid_moves is not is_rapid:
+            self._machine.set_rapid_moves(is_rapid)
+            self._rapid_moves = is_rapid
+
+    def _linear_move(self, params: typing.Dict[str, float], feed_rate: Numeric) -> None:
+        mm_per_unit = self._mm_per_unit
+        x = params.get('X')
+        y = params.get('Y')
+        z = params.get('Z')
+
+        self._move_by_and_update_tool_position(
+            0 if x is None else self._coordinates_to_incremental('X', x * mm_per_unit, self._mode),
+            0 if y is None else self._coordinates_to_incremental('Y', y * mm_per_unit, self._mode),
+            0 if z is None else self._coordinates_to_incremental('Z', z * mm_per_unit, self._mode),
+            feed_rate,
+        )
+
+    def _arc_move(self, angular_direction: int, params: typing.Dict[str, float]) -> None:
+        self._set_rapid_moves(False)
+        mm_per_unit = self._mm_per_unit
+        params = {key: value * mm_per_unit for key, value in params.items()}
+
+        # As in linear moves, the axes that aren't specified don't move (also in the absolute mode).
+        x = params.get('X')
+        y = params.get('Y')
+        z = params.get('Z')
+
+        self._arc(
+            angular_direction,
+            0 if x is None else self._coordinates_to_incremental('X', x, self._mode),
+            0 if y is None else self._coordinates_to_incremental('Y', y, self._mode),
+            0 if z is None else self._coordinates_to_incremental('Z', z, self._mode),
+            params,
+        )
 
     @typechecked
     def _arc(
@@ -166,77 +317,139 @@ class GCodeInterpreter():
             finish_y: Numeric,
             finish_z: Numeric,
             parameters: typing.Dict[str, Numeric]) -> None:
+        """
+        Approximate an arc (or a helix) with linear moves, deviating from it by at most the machine arc tolerance.
+
+        :param angular_direction: 1 for counterclockwise, -1 for clockwise
+        :param finish_x: where the arc ends, relatively to the current tool position
+        :param finish_y: where the arc ends, relatively to the current tool position
+        :param finish_z: where the arc ends, relatively to the current tool position
+        :param parameters: either the arc center offsets (relatively to the current tool position)
+            in the selected plane or the radius (R) - negative for arcs longer than half of a circle
+        """
         RADIUS_EPSILON = 10**(-2)
-        NUM_ANGULAR_STEPS = 60
-
-        start_tool_position_x = self._tool_positions.x.tool_position
-        start_tool_position_y = self._tool_positions.y.tool_position
-        start_tool_position_z = self._tool_positions.z.tool_position
+        ANGLE_EPSILON = 10**(-9)
 
         if angular_direction not in [-1, 1]:
             raise Exception("Unknown angular direction: %s" % repr(angular_direction))
 
         if self._plane is None:
             raise Exception("Unable to draw an arc - no plane seleted")
-        elif self._plane != Plane.XY:
-            raise NotImplementedError("Non-XY arcs are not supported")
-
-        if 'I' and 'J' in parameters.keys():
-            center_x = parameters['I']
-            center_y = parameters['J']
-        elif 'R' in parameters.keys():
-            raise NotImplementedError()
-        else:
-            raise Exception("Expected either I and J or R in GCode parameters")
 
-        if finish_z != 0:
-            raise NotImplementedError("Helical moves are not supported")
+        (axis_a, offset_a), (axis_b, offset_b), (axis_linear, unused_offset) = PLANE_AXES[self._plane]
+        finish = {'X': finish_x, 'Y': finish_y, 'Z': finish_z}
+        finish_a = finish[axis_a]
+        finish_b = finish[axis_b]
+        finish_linear = finish[axis_linear]
+
+        if 'R' in parameters.keys():
+            center_a, center_b = self._arc_center_from_radius(
+                angular_direction, finish_a, finish_b, parameters['R'], RADIUS_EPSILON)
+        elif offset_a in parameters.keys() or offset_b in parameters.keys():
+            center_a = parameters.get(offset_a, 0)
+            center_b = parameters.get(offset_b, 0)
+        else:
+            raise InvalidGCodeException(
+                "Expected either %s and %s or R in GCode parameters" % (offset_a, offset_b))
 
-        radius = euclidean_distance((0, 0, 0), (center_x, center_y, 0))
-        radius2 = euclidean_distance((finish_x, finish_y, 0), (center_x, center_y, 0))
+        radius = math.hypot(center_a, center_b)
+        radius2 = math.hypot(finish_a - center_a, finish_b - center_b)
 
         if abs(radius - radius2) > RADIUS_EPSILON:
-            raise Exception("Radia mismatch: %0.6f vs %.06f" % (
+            raise InvalidGCodeException("Radia mismatch: %0.6f vs %.06f" % (
                 radius,
                 radius2,
             ))
 
         if abs(radius) <= RADIUS_EPSILON:
-            raise Exception("Null radius")
-
-        angle_step = angular_direction * (2 * math.pi) / NUM_ANGULAR_STEPS
-        one_step_distance = euclidean_distance(
-            (0, radius, 0),
-            (radius * math.sin(angle_step), radius * math.cos(angle_step), 0))
-
-        start_angle = math.atan2(0 - center_y, 0 - center_x)
-        angle = start_angle
-
-        while True:
-            current_x = center_x + radius * math.cos(angle)
-            current_y = center_y + radius * math.sin(angle)
-
-            if euclidean_distance((current_x, current_y, 0), (finish_x, finish_y, 0)) < one_step_distance:
-                break
+            raise InvalidGCodeException("Null radius")
+
+        start_a = -center_a
+        start_b = -center_b
+        end_a = finish_a - center_a
+        end_b = finish_b - center_b
+
+        # The angle between the start and the end (relatively to the center), from the cross and dot products
+        # - so that there are no discontinuities when the arc crosses the negative side of the first axis.
+        start_angle = math.atan2(start_b, start_a)
+        angle = math.atan2(start_a * end_b - start_b * end_a, start_a * end_a + start_b * end_b)
+
+        # If the arc ends where it started, it is a full circle.
+        if angular_direction == 1 and angle < ANGLE_EPSILON:
+            angle += 2 * math.pi
+        elif angular_direction == -1 and angle > -ANGLE_EPSILON:
+            angle -= 2 * math.pi
+
+        num_segments = arc_num_segments(radius, angle, self._machine.arc_tolerance)
+
+        # All the points (relative to the current tool position) are computed at once, the last one being
+        # exactly the finish, and the moves between them are passed to the machine in one go.
+        angle_step = angle / num_segments
+        linear_step = finish_linear / num_segments
+        segment_angles = [start_angle + angle_step * i for i in range(1, num_segments)]
+
+        points = {
+            axis_a: [center_a + radius * math.cos(segment_angle) for segment_angle in segment_angles] + [finish_a],
+            axis_b: [center_b + radius * math.sin(segment_angle) for segment_angle in segment_angles] + [finish_b],
+            axis_linear: [linear_step * i for i in range(1, num_segments)] + [finish_linear],
+        }
+
+        self._move_by_many_and_update_tool_position(
+            zip(*(
+                [point - previous_point for previous_point, point in zip([0] + points[axis], points[axis])]
+                for axis in ('X', 'Y', 'Z')
+            )),
+            self._feed_rate,
+        )
 
-            self._move_to_absolute(
-                start_tool_position_x + current_x,
-                start_tool_position_y + current_y,
-                start_tool_position_z)
-            angle += angle_step
+    @typechecked
+    def _arc_center_from_radius(
+            self,
+            angular_direction: int,
+            finish_a: Numeric,
+            finish_b: Numeric,
+            radius: Numeric,
+            radius_epsilon: Numeric) -> typing.Tuple[Numeric, Numeric]:
+        """
+        Returns the center of an arc given in the radius format, relatively to the current tool position.
 
-        self._move_to_absolute(
-            start_tool_position_x + finish_x,
-            start_tool_position_y + finish_y,
-            start_tool_position_z)
+        The center lies on the bisector of the chord between the start and the finish. Of the two such points,
+        the one making the arc shorter than half of a circle is chosen for positive radius, the other one for
+        negative radius.
+        """
+        chord_length = math.hypot(finish_a, finish_b)
+        if chord_length <= radius_epsilon:
+            raise InvalidGCodeException("Unable to draw a full circle given only the radius")
+
+        # The squared distance from the center to the chord, multiplied by 4.
+        distance_to_chord_squared_x4 = 4 * radius ** 2 - chord_length ** 2
+        if distance_to_chord_squared_x4 < 0:
+            if 2 * abs(radius) < chord_length - radius_epsilon:
+                raise InvalidGCodeException("Radius %.06f too small to reach the arc end" % radius)
+            distance_to_chord_squared_x4 = 0
+
+        # The distance from the center to the chord, divided by half of the chord length, with the sign
+        # determining the side of the chord.
+        h = -math.sqrt(distance_to_chord_squared_x4) / chord_length
+        if angular_direction == 1:
+            h = -h
+        if radius < 0:
+            h = -h
+
+        return 0.5 * (finish_a - finish_b * h), 0.5 * (finish_b + finish_a * h)
 
     @typechecked
-    def _move_to_absolute(self, x: Numeric, y: Numeric, z: Numeric) -> None:
+    def _move_to_absolute(
+            self,
+            x: Numeric,
+            y: Numeric,
+            z: Numeric,
+            feed_rate: typing.Optional[Numeric] = None) -> None:
         self._move_by_and_update_tool_position(
             x - self._tool_positions.x.tool_position,
             y - self._tool_positions.y.tool_position,
             z - self._tool_positions.z.tool_position,
-            self._feed_rate,
+            self._feed_rate if feed_rate is None else feed_rate,
         )
 
     @typechecked
@@ -246,6 +459,39 @@ class GCodeInterpreter():
         self._tool_positions.y.add(y)
         self._tool_positions.z.add(z)
 
+        if self._moves_between_flushes is not None:
+            self._moves_since_flush += 1
+            if self._moves_since_flush >= self._moves_between_flushes:
+                self._flush()
+
+    def _move_by_many_and_update_tool_position(
+            self,
+            moves: typing.Iterable[typing.Tuple[Numeric, Numeric, Numeric]],
+            feed_rate: Numeric) -> None:
+        """
+        Does the same as calling _move_by_and_update_tool_position for each move, but passes the moves to
+        the machine in blocks (BaseMachine.move_by_many), as there may be a lot of them (e.g. arc segments).
+        """
+        rows = [(x, y, z, feed_rate) for x, y, z in moves]
+
+        if self._moves_between_flushes is None:
+            self._machine.move_by_many(rows)
+        else:
+            # The blocks end where the machine should be flushed.
+            start = 0
+            while start < len(rows):
+                end = start + self._moves_between_flushes - self._moves_since_flush
+                self._machine.move_by_many(rows[start:end])
+                self._moves_since_flush += len(rows[start:end])
+                start = end
+
+                if self._moves_since_flush >= self._moves_between_flushes:
+                    self._flush()
+
+        self._tool_positions.x.add(sum(row[0] for row in rows))
+        self._tool_positions.y.add(sum(row[1] for row in rows))
+        self._tool_positions.z.add(sum(row[2] for row in rows))
+
     @typechecked
     def _get_axis_position(self, axis: str) -> Numeric:
         return {
@@ -271,9 +517,11 @@ class GCodeInterpreter():
         - the arc plane will be reset to the XY plane
         - the mode (absolute vs relative) will be reset to absolute
         - the feed rate will be reset to the default
+        - the units will be reset to millimeters
         """
 
         self._tool_positions.zero_tool_positions()
         self._plane = Plane.XY
         self._mode = Mode.ABSOLUTE
         self._feed_rate = self._machine.default_feed_rate
+        self._mm_per_unit = 1
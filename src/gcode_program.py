@@ -0,0 +1,216 @@
+import collections
+import enum
+import hashlib
+import threading
+import typing
+
+import pygcode
+import pygcode.gcodes
+
+from exceptions import InvalidGCodeException
+from utils.typing import typechecked
+
+
+# How many instructions (in total) of the most recently compiled programs should be kept, so that re-running
+# the same G-code doesn't require parsing it again. Programs longer than that aren't cached at all.
+COMPILED_PROGRAMS_CACHE_MAX_INSTRUCTIONS = 100000
+
+MM_PER_INCH = 25.4
+
+
+class Opcode(enum.Enum):
+    """
+    A kind of operation that a compiled G-code program consists of.
+    """
+    SET_INCREMENTAL_MODE = 0
+    SET_ABSOLUTE_MODE = 1
+    SELECT_XY_PLANE = 2
+    SET_FEED_RATE = 3
+    RAPID_MOVE = 4
+    LINEAR_MOVE = 5
+    ARC_MOVE_CW = 6
+    ARC_MOVE_CCW = 7
+    USE_MILLIMETERS = 8
+    USE_INCHES = 9
+    GO_HOME = 10
+    DWELL = 11
+    SELECT_ZX_PLANE = 12
+    SELECT_YZ_PLANE = 13
+
+
+class Instruction(typing.NamedTuple):
+    """
+    A single compiled G-code command: an opcode and its numeric parameters (e.g. {'X': 1.0, 'Y': 2.0}),
+    that have already been parsed and validated.
+
+    Instructions are shared between runs of a cached program, so the parameters must not be modified.
+    """
+    opcode: Opcode
+    params: typing.Dict[str, float]
+
+
+class GCodeProgram():
+    """
+    A compiled G-code program - a sequence of instructions that can be executed by GCodeInterpreter.run_program()
+    any number of times, without parsing G-code again.
+    """
+    def __init__(self, instructions: typing.Iterable[Instruction]):
+        self._instructions = tuple(instructions)
+
+    def __iter__(self) -> typing.Iterator[Instruction]:
+        return iter(self._instructions)
+
+    def __len__(self) -> int:
+        return len(self._instructions)
+
+    @property
+    def instructions(self) -> typing.Tuple[Instruction, ...]:
+        """
+        Returns the instructions the program consists of.
+        """
+        return self._instructions
+
+
+# What opcode a given G-code class is compiled to. None means, that the G-code doesn't require any action.
+#
+# A G-code not listed here is rejected as unknown. To support a new command, add its class here and a handler
+# in GCodeInterpreter.
+GCODE_CLASS_TO_OPCODE = {
+    pygcode.gcodes.GCodeIncrementalDistanceMode: Opcode.SET_INCREMENTAL_MODE,
+    pygcode.gcodes.GCodeAbsoluteDistanceMode: Opcode.SET_ABSOLUTE_MODE,
+    pygcode.gcodes.GCodeSelectXYPlane: Opcode.SELECT_XY_PLANE,
+    pygcode.gcodes.GCodeSelectZXPlane: Opcode.SELECT_ZX_PLANE,
+    pygcode.gcodes.GCodeSelectYZPlane: Opcode.SELECT_YZ_PLANE,
+    pygcode.gcodes.GCodeLineNumber: None,
+    pygcode.gcodes.GCodeUseMillimeters: Opcode.USE_MILLIMETERS,
+    pygcode.gcodes.GCodeUseInches: Opcode.USE_INCHES,
+    pygcode.gcodes.GCodeArcMoveCW: Opcode.ARC_MOVE_CW,
+    pygcode.gcodes.GCodeArcMoveCCW: Opcode.ARC_MOVE_CCW,
+    pygcode.gcodes.GCodeRapidMove: Opcode.RAPID_MOVE,
+    pygcode.gcodes.GCodeLinearMove: Opcode.LINEAR_MOVE,
+    pygcode.gcodes.GCodeFeedRate: Opcode.SET_FEED_RATE,
+    pygcode.gcodes.GCodeGotoPredefinedPosition: Opcode.GO_HOME,
+    pygcode.gcodes.GCodeDwell: Opcode.DWELL,
+}
+
+# The parameters that are allowed for given opcode. If an opcode is not listed, any parameters are allowed.
+OPCODE_ALLOWED_PARAMS = {
+    Opcode.RAPID_MOVE: frozenset(['X', 'Y', 'Z']),
+    Opcode.LINEAR_MOVE: frozenset(['X', 'Y', 'Z']),
+    Opcode.ARC_MOVE_CW: frozenset(['X', 'Y', 'Z', 'I', 'J', 'K', 'R']),
+    Opcode.ARC_MOVE_CCW: frozenset(['X', 'Y', 'Z', 'I', 'J', 'K', 'R']),
+    Opcode.GO_HOME: frozenset(['X', 'Y', 'Z']),
+}
+
+
+@typechecked
+def compile_gcode(
+        gcode: pygcode.gcodes.GCode,
+        modal_params: typing.Sequence[pygcode.Word] = ()) -> typing.Optional[Instruction]:
+    """
+    Compile a single G-code command to an instruction.
+
+    :param modal_params: the words of the block that don't belong to any command - pygcode puts the
+        intermediate point of G28 (e.g. X10 in "G28 X10") there
+    :return: the instruction, or None if the command doesn't require any action (e.g. a line number).
+    """
+    for gcode_class in type(gcode).__mro__:
+        if gcode_class in GCODE_CLASS_TO_OPCODE:
+            opcode = GCODE_CLASS_TO_OPCODE[gcode_class]
+            break
+    else:
+        raise InvalidGCodeException("Unknown GCode: %s" % gcode.__class__)
+
+    if opcode is None:
+        return None
+
+    if opcode == Opcode.SET_FEED_RATE:
+        # Moves with a zero feed rate would never end (G93 inverse time mode isn't supported).
+        if gcode.word.value <= 0:
+            raise InvalidGCodeException("Feed rate should be positive: %s" % gcode.word)
+        return Instruction(opcode, {'F': gcode.word.value})
+
+    if opcode == Opcode.GO_HOME:
+        # GCodeGotoPredefinedPosition covers both G28 and G30, but only the home position (G28) is supported.
+        if gcode.word.value != 28:
+            raise InvalidGCodeException("Unsupported predefined position: %s" % gcode.word)
+        params = {word.letter: word.value for word in modal_params}
+    else:
+        params = gcode.get_param_dict()
+
+    if opcode in OPCODE_ALLOWED_PARAMS and not OPCODE_ALLOWED_PARAMS[opcode].issuperset(params.keys()):
+        raise InvalidGCodeException("Unknown axes in %s" % repr(params))
+
+    return Instruction(opcode, params)
+
+
+@typechecked
+def iterate_instructions(input_lines: typing.Iterable[str]) -> typing.Iterator[Instruction]:
+    """
+    Lazily parse G-code lines (e.g. a file object) and yield the compiled instructions.
+
+    Only one line is being kept in memory at a time, no matter how long the program is.
+    """
+    for input_line in input_lines:
+        line = pygcode.Line(input_line)
+        for gcode in line.block.gcodes:
+            instruction = compile_gcode(gcode, line.block.modal_params)
+            if instruction is not None:
+                yield instruction
+
+
+class _CompiledProgramsCache():
+    """
+    A LRU cache of compiled programs, bounded by the total number of their instructions.
+
+    The programs are keyed by a hash of their source, so that the source itself isn't kept in memory.
+    """
+    def __init__(self, max_instructions: int):
+        self._max_instructions = max_instructions
+        self._num_instructions = 0
+        self._programs = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compile(self, input_text: str) -> GCodeProgram:
+        key = hashlib.sha256(input_text.encode('utf-8')).digest()
+
+        with self._lock:
+            program = self._programs.get(key)
+            if program is not None:
+                self._programs.move_to_end(key)
+                return program
+
+        program = GCodeProgram(iterate_instructions(input_text.split('\n')))
+        if len(program) > self._max_instructions:
+            return program
+
+        with self._lock:
+            if key not in self._programs:
+                self._programs[key] = program
+                self._num_instructions += len(program)
+            while self._num_instructions > self._max_instructions:
+                unused_key, evicted_program = self._programs.popitem(last=False)
+                self._num_instructions -= len(evicted_program)
+        return program
+
+    def clear(self) -> None:
+        with self._lock:
+            self._programs.clear()
+            self._num_instructions = 0
+
+    def __len__(self) -> int:
+        return len(self._programs)
+
+
+_compiled_programs = _CompiledProgramsCache(COMPILED_PROGRAMS_CACHE_MAX_INSTRUCTIONS)
+
+
+@typechecked
+def compile_gcode_string(input_text: str) -> GCodeProgram:
+    """
+    Parse a string with G-code and compile it to a program.
+
+    The results are cached (please refer to COMPILED_PROGRAMS_CACHE_MAX_INSTRUCTIONS), so compiling the same
+    G-code again is cheap.
+    """
+    return _compiled_programs.get_or_compile(input_text)
@@ -0,0 +1,183 @@
+"""
+An optional stage between compiling G-code and running it, that simplifies polylines: runs of consecutive
+linear (G1) moves are approximated with fewer moves (using the Ramer-Douglas-Peucker algorithm), deviating
+from the original path by at most given tolerance.
+
+Programs converted from curves (e.g. pygcode_modules/heart.py) contain a lot of nearly collinear moves,
+each of them being a separate move for the machine (and a separate segment in the preview).
+"""
+import math
+import typing
+
+from gcode_program import MM_PER_INCH, Instruction, Opcode
+from utils.typing import Numeric, typechecked
+
+
+# The longest run of linear moves that is simplified at once, so that the memory usage is bounded also
+# when simplifying a stream of instructions.
+MAX_RUN_LENGTH = 10000
+
+Point = typing.Tuple[float, float, float]
+
+
+def point_to_segment_distance(point: Point, start: Point, end: Point) -> float:
+    """
+    Returns the distance between a point and a segment (not a line, so that a move that goes back
+    along the same line is not considered redundant).
+
+    It's called for every point of every range simplify_polyline() checks, so it isn't type checked and
+    the vector math is written out per axis.
+    """
+    segment_x = end[0] - start[0]
+    segment_y = end[1] - start[1]
+    segment_z = end[2] - start[2]
+    to_point_x = point[0] - start[0]
+    to_point_y = point[1] - start[1]
+    to_point_z = point[2] - start[2]
+    segment_length_squared = segment_x * segment_x + segment_y * segment_y + segment_z * segment_z
+
+    if segment_length_squared == 0:
+        t = 0
+    else:
+        t = (segment_x * to_point_x + segment_y * to_point_y + segment_z * to_point_z) / segment_length_squared
+        t = max(0, min(1, t))
+
+    distance_x = to_point_x - t * segment_x
+    distance_y = to_point_y - t * segment_y
+    distance_z = to_point_z - t * segment_z
+    return math.sqrt(distance_x * distance_x + distance_y * distance_y + distance_z * distance_z)
+
+
+@typechecked
+def simplify_polyline(points: typing.Sequence[Point], tolerance: Numeric) -> typing.List[int]:
+    """
+    Returns the indices of the points that should be kept, so that the polyline through them deviates
+    from the original one by at most given tolerance. The first and the last point are always kept.
+
+    Collinear points are removed also when the tolerance is zero.
+    """
+    if len(points) <= 2:
+        return list(range(len(points)))
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+
+    # The ranges of points that still have to be checked, as (first, last) index pairs - iteratively,
+    # as recursion could exceed the stack for long polylines.
+    ranges = [(0, len(points) - 1)]
+    while ranges:
+        first, last = ranges.pop()
+        max_distance = -1
+        max_distance_index = None
+        for i in range(first + 1, last):
+            distance = point_to_segment_distance(points[i], points[first], points[last])
+            if distance > max_distance:
+                max_distance = distance
+                max_distance_index = i
+
+        if max_distance_index is not None and max_distance > tolerance:
+            keep[max_distance_index] = True
+            ranges.append((first, max_distance_index))
+            ranges.append((max_distance_index, last))
+
+    return [i for i, is_kept in enumerate(keep) if is_kept]
+
+
+class PolylineSimplifier():
+    """
+    Simplifies runs of linear moves in a sequence of instructions, tracking the tool position, the distance mode
+    and the units the same way GCodeInterpreter does, starting from the given ones.
+    """
+    @typechecked
+    def __init__(
+            self,
+            tolerance: Numeric,
+            position: typing.Tuple[Numeric, Numeric, Numeric] = (0, 0, 0),
+            incremental: bool = False,
+            mm_per_unit: Numeric = 1):
+        """
+        :param tolerance: the maximum deviation (in millimeters) of the simplified path from the original one
+        :param position: where (in millimeters) the tool is before the instructions
+        :param incremental: whether the distance mode before the instructions is incremental (G91)
+        :param mm_per_unit: the units before the instructions (please refer to gcode_program.MM_PER_INCH)
+        """
+        if tolerance < 0:
+            raise ValueError("Simplification tolerance should not be negative, not %s" % tolerance)
+
+        self._tolerance = tolerance
+        self.num_removed_moves = 0
+
+        self._position = tuple(float(value) for value in position)
+        self._incremental = incremental
+        self._mm_per_unit = mm_per_unit
+
+    @typechecked
+    def simplify(self, instructions: typing.Iterable[Instruction]) -> typing.Iterator[Instruction]:
+        """
+        Yields the instructions, with runs of linear moves simplified. The instructions are processed lazily.
+        """
+        # The points (in millimeters, so that switching the units doesn't mix them) the current run of linear
+        # moves goes through, starting with the position before the run.
+        run = [self._position]
+
+        for instruction in instructions:
+            opcode, params = instruction
+
+            if opcode == Opcode.LINEAR_MOVE:
+                self._position = self._target(params)
+                run.append(self._position)
+                if len(run) > MAX_RUN_LENGTH:
+                    yield from self._simplified_run(run)
+                    run = [self._position]
+                continue
+
+            yield from self._simplified_run(run)
+
+            if opcode == Opcode.SET_INCREMENTAL_MODE:
+                self._incremental = True
+            elif opcode == Opcode.SET_ABSOLUTE_MODE:
+                self._incremental = False
+            elif opcode == Opcode.USE_MILLIMETERS:
+                self._mm_per_unit = 1
+            elif opcode == Opcode.USE_INCHES:
+                self._mm_per_unit = MM_PER_INCH
+            elif opcode in (Opcode.RAPID_MOVE, Opcode.ARC_MOVE_CW, Opcode.ARC_MOVE_CCW):
+                self._position = self._target(params)
+            elif opcode == Opcode.GO_HOME:
+                self._position = (0.0, 0.0, 0.0)
+
+            yield instruction
+            run = [self._position]
+
+        yield from self._simplified_run(run)
+
+    def _target(self, params: typing.Dict[str, float]) -> Point:
+        """
+        Where (in millimeters) a move with given parameters ends. The axes that aren't specified don't move.
+        """
+        mm_per_unit = self._mm_per_unit
+        return tuple(
+            position if axis not in params else
+            position + params[axis] * mm_per_unit if self._incremental else
+            params[axis] * mm_per_unit
+            for axis, position in zip(('X', 'Y', 'Z'), self._position)
+        )
+
+    def _simplified_run(self, run: typing.List[Point]) -> typing.Iterator[Instruction]:
+        if len(run) < 2:
+            return
+
+        kept_indices = simplify_polyline(run, self._tolerance)
+        self.num_removed_moves += len(run) - len(kept_indices)
+
+        mm_per_unit = self._mm_per_unit
+        for previous_index, index in zip(kept_indices, kept_indices[1:]):
+            if self._incremental:
+                values = [
+                    (value - previous_value) / mm_per_unit
+                    for previous_value, value in zip(run[previous_index], run[index])
+                ]
+            else:
+                values = [value / mm_per_unit for value in run[index]]
+
+            yield Instruction(Opcode.LINEAR_MOVE, dict(zip(('X', 'Y', 'Z'), values)))
@@ -0,0 +1,76 @@
+"""
+Levels of detail of simulated toolpaths, so that the 3D preview of a large program can first show a coarse
+version of it (quickly) and then progressively refine it.
+
+A coarse level is the toolpath decimated so that consecutive points are at least given distance apart
+(relatively to the toolpath size, so that the coarse levels look the same for small and large parts).
+"""
+import math
+import typing
+
+from machine.simulated_machine import SimulatedMoves
+from utils.typing import Numeric, typechecked
+
+
+# The tolerances of the coarse levels (from the coarsest), as fractions of the toolpath bounding box diagonal.
+# The last level is always the full toolpath.
+LEVEL_OF_DETAIL_RELATIVE_TOLERANCES = (1 / 100, 1 / 1000)
+
+# Toolpaths with fewer moves are displayed at once - the coarse levels wouldn't be noticeably faster.
+LEVEL_OF_DETAIL_MIN_MOVES = 10000
+
+
+@typechecked
+def level_of_detail_tolerances(moves: SimulatedMoves) -> typing.List[float]:
+    """
+    Returns the decimation tolerances (in millimeters) of the coarse levels of detail of a toolpath,
+    from the coarsest. Empty if the toolpath is small enough to be displayed at once.
+    """
+    if len(moves) < LEVEL_OF_DETAIL_MIN_MOVES:
+        return []
+
+    x, y, z, rapid, feed_rate = moves.columns
+    with x, y, z, rapid, feed_rate:
+        diagonal = math.sqrt(sum((max(column) - min(column)) ** 2 for column in (x, y, z)))
+
+    return [diagonal * relative_tolerance for relative_tolerance in LEVEL_OF_DETAIL_RELATIVE_TOLERANCES]
+
+
+@typechecked
+def decimate(moves: SimulatedMoves, tolerance: Numeric) -> SimulatedMoves:
+    """
+    Returns the moves with the points closer than tolerance to the previous kept point removed.
+
+    The first and the last point are always kept, as are the points where rapid moves change to milling
+    and vice versa, so that the decimated moves are drawn with the right colors.
+    """
+    result = SimulatedMoves()
+    num_moves = len(moves)
+    if num_moves == 0:
+        return result
+
+    tolerance_squared = tolerance ** 2
+    x, y, z, rapid, feed_rate = moves.columns
+    with x, y, z, rapid, feed_rate:
+        last_x, last_y, last_z = x[0], y[0], z[0]
+        result.append(last_x, last_y, last_z, bool(rapid[0]), feed_rate[0])
+
+        for i in range(1, num_moves):
+            current_x, current_y, current_z = x[i], y[i], z[i]
+            if (
+                    i == num_moves - 1 or
+                    rapid[i] != rapid[i + 1] or
+                    (current_x - last_x) ** 2 + (current_y - last_y) ** 2 + (current_z - last_z) ** 2 >
+                    tolerance_squared):
+                result.append(current_x, current_y, current_z, bool(rapid[i]), feed_rate[i])
+                last_x, last_y, last_z = current_x, current_y, current_z
+
+    return result
+
+
+@typechecked
+def levels_of_detail(moves: SimulatedMoves) -> typing.List[SimulatedMoves]:
+    """
+    Returns the levels of detail of a toolpath, from the coarsest - the last one being the toolpath itself.
+    """
+    return [decimate(moves, tolerance) for tolerance in level_of_detail_tolerances(moves)] + [moves]
@@ -0,0 +1,376 @@
+"""
+An emulator of the Arduino firmware (./main/main.ino) that is exposed via a pseudo-terminal, so that
+Arduino3AxisSerialMachine can be tested and benchmarked without actual hardware.
+
+To run it standalone, execute:
+
+    PYTHONPATH=.:src python -m machine.arduino.emulator
+
+and pass the printed port path as port_path_template to Arduino3AxisSerialMachine.
+"""
+import collections
+import fcntl
+import os
+import select
+import struct
+import termios
+import threading
+import time
+import tty
+import typing
+
+from machine.arduino import messages
+from machine.arduino.encoding import read_compact_moves
+from machine.arduino.machine import FIRMWARE_INITIAL_BAUD_RATE, FIRMWARE_SUPPORTED_BAUD_RATES
+from utils.typing import typechecked
+
+
+# Move types, as in main/message.h
+SET_DIR = 0
+THREE_PWM = 1
+THREE_PWM_WITH_DIR = 2
+THREE_PWM_RAMPED = 3
+
+
+class ArduinoEmulatorMove(typing.NamedTuple):
+    """
+    A move stored in the emulated firmware buffer.
+    """
+    type: int
+    dir_id: int = 0
+    dir_state: int = 0
+    time_microseconds: int = 0
+    num_x: int = 0
+    num_y: int = 0
+    num_z: int = 0
+    dir_bits: int = 0
+    entry_speed: int = 0
+    exit_speed: int = 0
+
+
+class ArduinoEmulator():
+    """
+    Emulates the firmware: the messages, the moves buffer (including the lookahead mode) and the timing
+    of both the serial link and move execution (ramped moves take their time as well, but the speed
+    changes within them aren't emulated).
+
+    The emulated machine state (axis positions in steps, directions) and statistics are available as attributes.
+    """
+    # How often the emulator thread checks if it should stop.
+    POLL_INTERVAL = 0.1
+
+    @typechecked
+    def __init__(
+            self,
+            baud_rate: int = FIRMWARE_INITIAL_BAUD_RATE,
+            time_scale: float = 1.0,
+            moves_buffer_max_size: int = 50,
+            serial_rx_buffer_size: int = 64,
+            capabilities: int = messages.CAPABILITY_COMPACT_MOVES_BATCH | messages.CAPABILITY_RAMPED_MOVES):
+        """
+        :param baud_rate: the initial emulated serial link speed (the host may change it using
+            MESSAGE_SET_BAUD_RATE) - transferring a byte takes 10 bits (with start and stop bits)
+        :param time_scale: how long (relative to the real time) executing a move takes, 0 means no delay
+        :param moves_buffer_max_size: MOVES_BUFFER_MAX_SIZE in main/main.ino
+        :param serial_rx_buffer_size: the serial receive buffer size - if more bytes arrive while the
+            firmware is executing moves, the excess is dropped (and counted in rx_overflows)
+        :param capabilities: the optional features (messages.CAPABILITY_*) to support - with none of them, an
+            older firmware without MESSAGE_GET_CAPABILITIES is emulated
+        """
+        self.baud_rate = baud_rate
+        self._time_scale = time_scale
+        self._moves_buffer_max_size = moves_buffer_max_size
+        self._serial_rx_buffer_size = serial_rx_buffer_size
+        self._capabilities = capabilities
+
+        self._moves_buffer = collections.deque()
+        self._lookahead = False
+        self._received = collections.deque()
+        self._link_time = 0
+        self._running = False
+        self._thread = None
+        self._master_fd = None
+        self._slave_fd = None
+
+        self.positions = [0, 0, 0]
+        self.directions = [0, 0, 0]
+        self.num_executed_moves = 0
+        self.num_executed_ramped_moves = 0
+        self.num_received_bytes = 0
+        self.num_sent_bytes = 0
+        self.rx_overflows = 0
+
+    @property
+    @typechecked
+    def port_path(self) -> str:
+        """
+        The path of the serial port (the pseudo-terminal slave) the host should connect to.
+        """
+        return os.ttyname(self._slave_fd)
+
+    @typechecked
+    def start(self) -> None:
+        self._master_fd, self._slave_fd = os.openpty()
+        tty.setraw(self._slave_fd)
+        tty.setraw(self._master_fd)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @typechecked
+    def stop(self) -> None:
+        self._running = False
+        self._thread.join()
+        os.close(self._master_fd)
+        os.close(self._slave_fd)
+
+    def __enter__(self) -> 'ArduinoEmulator':
+        self.start()
+        return self
+
+    def __exit__(self, *unused_exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                value = self._read_uint8()
+            except _EmulatorStopped:
+                return
+
+            self._handle_message(value)
+
+    def _handle_message(self, value: int) -> None:
+        if value == messages.MESSAGE_PING:
+            self._write_uint8(messages.MESSAGE_PONG)
+        elif value == messages.MESSAGE_SET_DIR:
+            dir_id = self._read_uint8()
+            dir_state = self._read_uint8()
+            self._allocate_move(ArduinoEmulatorMove(SET_DIR, dir_id=dir_id, dir_state=dir_state))
+            self._write_uint8(messages.MESSAGE_SET_DIR_SCHEDULED)
+        elif value == messages.MESSAGE_THREE_PWM:
+            self._allocate_move(ArduinoEmulatorMove(
+                THREE_PWM,
+                time_microseconds=self._read_uint32(),
+                num_x=self._read_uint32(),
+                num_y=self._read_uint32(),
+                num_z=self._read_uint32(),
+            ))
+            self._write_uint8(messages.MESSAGE_THREE_PWM_SCHEDULED)
+        elif value == messages.MESSAGE_MOVES_BATCH:
+            num_moves = self._read_uint8()
+            if num_moves > self._moves_buffer_max_size:
+                self._write_uint8(messages.MESSAGE_MOVES_BATCH_ERROR)
+                return
+
+            self._make_room(num_moves)
+            self._write_uint8(messages.MESSAGE_MOVES_BATCH_READY)
+
+            for unused_i in range(num_moves):
+                dir_bits = self._read_uint8()
+                self._allocate_move(ArduinoEmulatorMove(
+                    THREE_PWM_WITH_DIR,
+                    dir_bits=dir_bits,
+                    time_microseconds=self._read_uint32(),
+                    num_x=self._read_uint32(),
+                    num_y=self._read_uint32(),
+                    num_z=self._read_uint32(),
+                ))
+            self._write_uint8(messages.MESSAGE_MOVES_BATCH_SCHEDULED)
+        elif (value == messages.MESSAGE_COMPACT_MOVES_BATCH and
+                self._capabilities & messages.CAPABILITY_COMPACT_MOVES_BATCH):
+            num_moves = self._read_uint8()
+            if num_moves > self._moves_buffer_max_size:
+                self._write_uint8(messages.MESSAGE_MOVES_BATCH_ERROR)
+                return
+
+            self._make_room(num_moves)
+            self._write_uint8(messages.MESSAGE_MOVES_BATCH_READY)
+
+            for dir_bits, time_microseconds, num_x, num_y, num_z in read_compact_moves(self._read_uint8, num_moves):
+                self._allocate_move(ArduinoEmulatorMove(
+                    THREE_PWM_WITH_DIR,
+                    dir_bits=dir_bits,
+                    time_microseconds=time_microseconds,
+                    num_x=num_x,
+                    num_y=num_y,
+                    num_z=num_z,
+                ))
+            self._write_uint8(messages.MESSAGE_MOVES_BATCH_SCHEDULED)
+        elif (value == messages.MESSAGE_RAMPED_MOVES_BATCH and
+                self._capabilities & messages.CAPABILITY_RAMPED_MOVES):
+            num_moves = self._read_uint8()
+            if num_moves > self._moves_buffer_max_size:
+                self._write_uint8(messages.MESSAGE_MOVES_BATCH_ERROR)
+                return
+
+            self._make_room(num_moves)
+            self._write_uint8(messages.MESSAGE_MOVES_BATCH_READY)
+
+            for unused_i in range(num_moves):
+                self._allocate_move(ArduinoEmulatorMove(
+                    THREE_PWM_RAMPED,
+                    dir_bits=self._read_uint8(),
+                    time_microseconds=self._read_uint32(),
+                    num_x=self._read_uint32(),
+                    num_y=self._read_uint32(),
+                    num_z=self._read_uint32(),
+                    entry_speed=self._read_uint16(),
+                    exit_speed=self._read_uint16(),
+                ))
+            self._write_uint8(messages.MESSAGE_MOVES_BATCH_SCHEDULED)
+        elif value == messages.MESSAGE_GET_CAPABILITIES and self._capabilities:
+            self._write_uint8(messages.MESSAGE_CAPABILITIES)
+            self._write_uint8(self._capabilities)
+        elif value == messages.MESSAGE_FLUSH:
+            self._write_uint8(messages.MESSAGE_FLUSH_STARTED)
+            result = self._flush_moves_buffer()
+            if result == 0:
+                self._write_uint8(messages.MESSAGE_FLUSH_FINISHED)
+            else:
+                self._write_uint8(messages.MESSAGE_FLUSH_FAILED)
+                self._write_uint8(result)
+        elif value == messages.MESSAGE_SET_LOOKAHEAD:
+            self._lookahead = self._read_uint8() != 0
+            self._write_uint8(messages.MESSAGE_LOOKAHEAD_SET)
+        elif value == messages.MESSAGE_SET_BAUD_RATE:
+            baud_rate = self._read_uint32()
+            if baud_rate not in FIRMWARE_SUPPORTED_BAUD_RATES:
+                self._write_uint8(messages.MESSAGE_BAUD_RATE_ERROR)
+                return
+
+            self._write_uint8(messages.MESSAGE_BAUD_RATE_SET)
+            self.baud_rate = baud_rate
+        else:
+            self._write_uint8(messages.MESSAGE_UNKNOWN)
+
+    def _make_room(self, num_moves: int) -> None:
+        while self._moves_buffer_max_size - len(self._moves_buffer) < num_moves:
+            if self._lookahead:
+                self._execute_move(self._moves_buffer.popleft())
+            else:
+                self._flush_moves_buffer()
+
+    def _allocate_move(self, move: ArduinoEmulatorMove) -> None:
+        self._make_room(1)
+        self._moves_buffer.append(move)
+
+    def _flush_moves_buffer(self) -> int:
+        result = 0
+        while self._moves_buffer and result == 0:
+            result = self._execute_move(self._moves_buffer.popleft())
+        self._moves_buffer.clear()
+        return result
+
+    def _execute_move(self, move: ArduinoEmulatorMove) -> int:
+        if move.type == SET_DIR:
+            if 0 <= move.dir_id <= 2:
+                self.directions[move.dir_id] = 1 if move.dir_state else 0
+            return 0
+        elif move.type in (THREE_PWM, THREE_PWM_WITH_DIR, THREE_PWM_RAMPED):
+            if move.type in (THREE_PWM_WITH_DIR, THREE_PWM_RAMPED):
+                self.directions = [(move.dir_bits >> axis) & 1 for axis in range(3)]
+
+            if move.type == THREE_PWM_RAMPED:
+                if not self._ramp_spacings_valid(move):
+                    return 1
+            else:
+                for num_steps in (move.num_x, move.num_y, move.num_z):
+                    if move.time_microseconds // (num_steps * 2 + 1) == 0:
+                        return 1
+
+            for axis, num_steps in enumerate((move.num_x, move.num_y, move.num_z)):
+                self.positions[axis] += num_steps if self.directions[axis] else -num_steps
+
+            if self._time_scale:
+                time.sleep(self._time_scale * move.time_microseconds / 1_000_000)
+            self.num_executed_moves += 1
+            if move.type == THREE_PWM_RAMPED:
+                self.num_executed_ramped_moves += 1
+            self._emulate_rx_buffer_overflow()
+            return 0
+        else:
+            return 2
+
+    def _ramp_spacings_valid(self, move: ArduinoEmulatorMove) -> bool:
+        """
+        Checks the spacings between the signal changes of a ramped move, as execute_ramped_three_pwm does.
+        """
+        if move.entry_speed == 0 or move.exit_speed == 0:
+            return False
+
+        for num_steps in (move.num_x, move.num_y, move.num_z):
+            num_changes = num_steps * 2 + 1
+            for speed in (move.entry_speed, move.exit_speed):
+                spacing = 2 * move.time_microseconds * speed / (num_changes * (move.entry_speed + move.exit_speed))
+                if spacing < 1:
+                    return False
+
+        return True
+
+    def _emulate_rx_buffer_overflow(self) -> None:
+        """
+        The firmware doesn't read the serial port when executing moves - bytes that arrived in the meantime
+        and didn't fit in the receive buffer are lost.
+        """
+        pending = struct.unpack('i', fcntl.ioctl(self._master_fd, termios.FIONREAD, b'\0' * 4))[0]
+        free_space = self._serial_rx_buffer_size - len(self._received)
+
+        if pending > free_space:
+            data = os.read(self._master_fd, pending)
+            self._received.extend(data[:max(free_space, 0)])
+            self.rx_overflows += 1
+
+    def _wait_for_link(self, num_bytes: int) -> None:
+        """
+        Wait as long as transferring num_bytes would take at the emulated baud rate.
+        """
+        self._link_time = max(self._link_time, time.perf_counter()) + num_bytes * 10.0 / self.baud_rate
+        delay = self._link_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _read_uint8(self) -> int:
+        while not self._received:
+            if not self._running:
+                raise _EmulatorStopped()
+
+            readable, unused_writable, unused_exceptional = select.select(
+                [self._master_fd], [], [], self.POLL_INTERVAL)
+            if readable:
+                self._received.extend(os.read(self._master_fd, 4096))
+
+        self._wait_for_link(1)
+        self.num_received_bytes += 1
+        return self._received.popleft()
+
+    def _read_uint32(self) -> int:
+        return (
+            self._read_uint8() |
+            self._read_uint8() << 8 |
+            self._read_uint8() << 16 |
+            self._read_uint8() << 24
+        )
+
+    def _read_uint16(self) -> int:
+        return self._read_uint8() | self._read_uint8() << 8
+
+    def _write_uint8(self, value: int) -> None:
+        self._wait_for_link(1)
+        self.num_sent_bytes += 1
+        os.write(self._master_fd, bytes([value]))
+
+
+class _EmulatorStopped(Exception):
+    pass
+
+
+if __name__ == '__main__':
+    with ArduinoEmulator() as emulator:
+        print("Emulated Arduino listening on %s" % emulator.port_path)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
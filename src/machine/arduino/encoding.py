@@ -0,0 +1,199 @@
+"""
+Encodings of move batches sent to the firmware (please refer to MESSAGE_MOVES_BATCH, MESSAGE_COMPACT_MOVES_BATCH
+and MESSAGE_RAMPED_MOVES_BATCH in main/main.ino).
+
+A move is a tuple: (direction bits, time in microseconds, steps on X, steps on Y, steps on Z). A ramped move
+additionally ends with the speeds at its beginning and at its end.
+"""
+import struct
+import typing
+
+from machine.arduino import messages
+from utils.typing import typechecked
+
+
+Move = typing.Tuple[int, int, int, int, int]
+RampedMove = typing.Tuple[int, int, int, int, int, int, int]
+
+# One move in a MESSAGE_MOVES_BATCH body: direction bits and THREE_PWM parameters (time in microseconds
+# and the number of steps on each axis).
+BATCHED_MOVE_STRUCT = struct.Struct('<BIIII')
+
+# One move in a MESSAGE_RAMPED_MOVES_BATCH body: as in MESSAGE_MOVES_BATCH, followed by the entry and exit speeds
+# (only their ratio matters to the firmware - the host sends them in mm/min).
+RAMPED_MOVE_STRUCT = struct.Struct('<BIIIIHH')
+RAMPED_MOVE_MAX_SPEED = 0xffff
+
+# In MESSAGE_COMPACT_MOVES_BATCH, each record starts with a tag byte: the lower 3 bits are the direction bits.
+# If COMPACT_MOVE_REPEAT is set, the record repeats the previous move (with the direction bits from the tag)
+# a number of times, stored in the upper 4 bits (minus one). Otherwise the tag is followed by the differences
+# between the time and the numbers of steps of this move and the previous one in the batch (or zeros for
+# the first move), encoded as zigzag varints.
+COMPACT_MOVE_DIR_BITS_MASK = 0x07
+COMPACT_MOVE_REPEAT = 0x08
+COMPACT_MOVE_MAX_REPEAT = 16
+
+# The tag and four varints, each of them at most 5 bytes long.
+COMPACT_MOVE_MAX_SIZE = 1 + 4 * 5
+
+
+@typechecked
+def encode_varint(value: int) -> bytes:
+    """
+    Encodes a non-negative integer using 7 bits per byte, least significant group first, with the most
+    significant bit set in all bytes but the last one.
+    """
+    result = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7f) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+@typechecked
+def read_varint(read_uint8: typing.Callable[[], int]) -> int:
+    result = 0
+    shift = 0
+    while True:
+        value = read_uint8()
+        result |= (value & 0x7f) << shift
+        shift += 7
+        if not value & 0x80:
+            return result
+
+
+@typechecked
+def encode_delta(value: int, previous: int) -> bytes:
+    """
+    Encodes the difference between two uint32 values (modulo 2**32, as int32), so that small differences
+    (of any sign) take few bytes.
+    """
+    delta = (value - previous + 2 ** 31) % 2 ** 32 - 2 ** 31
+    return encode_varint((delta << 1) ^ (delta >> 31))
+
+
+@typechecked
+def read_delta(read_uint8: typing.Callable[[], int], previous: int) -> int:
+    zigzag = read_varint(read_uint8)
+    delta = (zigzag >> 1) ^ -(zigzag & 1)
+    return (previous + delta) % 2 ** 32
+
+
+class MovesEncoder():
+    """
+    Collects moves into a MESSAGE_MOVES_BATCH body.
+    """
+    MESSAGE = messages.MESSAGE_MOVES_BATCH
+
+    def __init__(self):
+        self.data = bytearray()
+        self.num_moves = 0
+
+    @typechecked
+    def size_of(self, move: Move) -> int:
+        """
+        How many bytes would adding the move append to the data.
+        """
+        return BATCHED_MOVE_STRUCT.size
+
+    @typechecked
+    def add(self, move: Move) -> None:
+        self.data += BATCHED_MOVE_STRUCT.pack(*move)
+        self.num_moves += 1
+
+
+class CompactMovesEncoder(MovesEncoder):
+    """
+    Collects moves into a MESSAGE_COMPACT_MOVES_BATCH body.
+    """
+    MESSAGE = messages.MESSAGE_COMPACT_MOVES_BATCH
+
+    def __init__(self):
+        super().__init__()
+        self._previous_move = (0, 0, 0, 0, 0)
+        self._repeat_tag_offset = None
+
+    @typechecked
+    def size_of(self, move: Move) -> int:
+        """
+        Please refer to the docstring in the base class.
+        """
+        if self.num_moves > 0 and move[1:] == self._previous_move[1:]:
+            return 0 if self._can_extend_repeat(move) else 1
+
+        return 1 + sum(
+            len(encode_delta(value, previous))
+            for value, previous in zip(move[1:], self._previous_move[1:])
+        )
+
+    @typechecked
+    def add(self, move: Move) -> None:
+        dir_bits = move[0] & COMPACT_MOVE_DIR_BITS_MASK
+
+        if self.num_moves > 0 and move[1:] == self._previous_move[1:]:
+            if self._can_extend_repeat(move):
+                self.data[self._repeat_tag_offset] += 1 << 4
+            else:
+                self._repeat_tag_offset = len(self.data)
+                self.data.append(dir_bits | COMPACT_MOVE_REPEAT)
+        else:
+            self._repeat_tag_offset = None
+            self.data.append(dir_bits)
+            for value, previous in zip(move[1:], self._previous_move[1:]):
+                self.data += encode_delta(value, previous)
+
+        self._previous_move = move
+        self.num_moves += 1
+
+    def _can_extend_repeat(self, move: Move) -> bool:
+        if self._repeat_tag_offset is None:
+            return False
+
+        tag = self.data[self._repeat_tag_offset]
+        return (
+            (tag & COMPACT_MOVE_DIR_BITS_MASK) == (move[0] & COMPACT_MOVE_DIR_BITS_MASK) and
+            (tag >> 4) + 1 < COMPACT_MOVE_MAX_REPEAT
+        )
+
+
+class RampedMovesEncoder(MovesEncoder):
+    """
+    Collects ramped moves into a MESSAGE_RAMPED_MOVES_BATCH body.
+    """
+    MESSAGE = messages.MESSAGE_RAMPED_MOVES_BATCH
+
+    @typechecked
+    def size_of(self, move: RampedMove) -> int:
+        """
+        Please refer to the docstring in the base class.
+        """
+        return RAMPED_MOVE_STRUCT.size
+
+    @typechecked
+    def add(self, move: RampedMove) -> None:
+        self.data += RAMPED_MOVE_STRUCT.pack(*move)
+        self.num_moves += 1
+
+
+@typechecked
+def read_compact_moves(read_uint8: typing.Callable[[], int], num_moves: int) -> typing.Iterator[Move]:
+    """
+    Decodes a MESSAGE_COMPACT_MOVES_BATCH body, as the firmware does.
+
+    :param read_uint8: a function returning the next byte of the body
+    :param num_moves: the number of moves from the message header
+    """
+    previous = [0, 0, 0, 0]
+    num_read_moves = 0
+    while num_read_moves < num_moves:
+        tag = read_uint8()
+        num_repeats = 1
+        if tag & COMPACT_MOVE_REPEAT:
+            num_repeats = (tag >> 4) + 1
+        else:
+            previous = [read_delta(read_uint8, value) for value in previous]
+
+        for unused_i in range(min(num_repeats, num_moves - num_read_moves)):
+            yield (tag & COMPACT_MOVE_DIR_BITS_MASK, *previous)
+            num_read_moves += 1
@@ -1,20 +1,48 @@
+import collections
 import logging
 import glob
 import serial
 import struct
+import threading
 import time
 import typing
 
-from typeguard import typechecked
-
 from machine.arduino import messages
-from machine.base import BaseMachine
+from machine.arduino.encoding import (
+    BATCHED_MOVE_STRUCT, COMPACT_MOVE_MAX_SIZE, RAMPED_MOVE_MAX_SPEED, RAMPED_MOVE_STRUCT, CompactMovesEncoder,
+    MovesEncoder, RampedMovesEncoder,
+)
+from machine.base import BaseMachine, DEFAULT_ARC_TOLERANCE
+from motion_planner import MotionPlanner, PlannedMove, split_into_ramps
 from exceptions import MachineCommunicationException
-from utils.typing import Numeric
+from utils.typing import MoveRows, Numeric, typechecked
 
 
 LOGGER = logging.getLogger('cnc')
 
+# How many moves the firmware is able to cache (MOVES_BUFFER_MAX_SIZE in main/main.ino).
+FIRMWARE_MOVES_BUFFER_SIZE = 50
+
+# The size of the serial port receive buffer of the Arduino (SERIAL_RX_BUFFER_SIZE in the Arduino core).
+# The firmware doesn't read the serial port when executing moves, so bytes that haven't been acknowledged
+# yet must fit in it - otherwise they would be lost.
+FIRMWARE_SERIAL_RX_BUFFER_SIZE = 64
+
+# The baud rate the firmware starts with (INITIAL_BAUD_RATE in main/main.ino).
+FIRMWARE_INITIAL_BAUD_RATE = 9600
+
+# The baud rates the firmware can switch to using MESSAGE_SET_BAUD_RATE (SUPPORTED_BAUD_RATES in main/main.ino).
+FIRMWARE_SUPPORTED_BAUD_RATES = (9600, 19200, 38400, 57600, 115200, 250000, 500000, 1000000)
+
+# The firmware changes the spacing between the steps within a ramped move linearly, which is close to a constant
+# acceleration only if the speed doesn't change much - so the planned moves are split into parts, in each of them
+# the speed changing by at most this ratio.
+RAMP_MAX_SPEED_RATIO = 2.0
+
+# The speed (in mm/s) the planned moves start and end with instead of zero, which would take infinite time.
+# Stepper motors are able to start and stop instantly at low speeds.
+RAMP_MIN_SPEED = 1.0
+
 
 class Arduino3AxisSerialMachineError(Exception):
     """
@@ -23,6 +51,134 @@ class Arduino3AxisSerialMachineError(Exception):
     pass
 
 
+class SerialCommandWindow():
+    """
+    Sends commands to the firmware without waiting for each of them to be acknowledged.
+
+    A background thread consumes the responses, while the sender keeps sending commands as long as the
+    commands in flight (i.e. not acknowledged yet) fit in the window: there are at most max_commands_in_flight
+    of them and they take at most window_size_bytes bytes. Thanks to that, the next commands are already
+    waiting in the firmware serial buffer when it finishes the previous one, and the host latency (e.g. USB
+    scheduling or Python overhead) doesn't stop the motors.
+    """
+    # How long a single serial port read should block, so that the reader thread notices it should stop.
+    READ_TIMEOUT = 0.1
+
+    class _CommandInFlight():
+        def __init__(self, description: str, expected_responses: typing.Tuple[int, ...], size: int):
+            self.description = description
+            self.expected_responses = collections.deque(expected_responses)
+            self.size = size
+
+    @typechecked
+    def __init__(self, ser: typing.Any, window_size_bytes: int, max_commands_in_flight: int):
+        self._ser = ser
+        self._window_size_bytes = window_size_bytes
+        self._max_commands_in_flight = max_commands_in_flight
+
+        self._condition = threading.Condition()
+        self._commands_in_flight = collections.deque()
+        self._bytes_in_flight = 0
+        self._error = None
+        self._running = False
+        self._reader_thread = None
+
+    @typechecked
+    def start(self) -> None:
+        self._ser.timeout = self.READ_TIMEOUT
+        self._running = True
+        self._reader_thread = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader_thread.start()
+
+    @typechecked
+    def stop(self) -> None:
+        self._running = False
+        if self._reader_thread:
+            self._reader_thread.join()
+
+    @typechecked
+    def send(self, data: bytes, expected_responses: typing.Tuple[int, ...], description: str) -> None:
+        """
+        Send a command, waiting only until it fits in the window.
+
+        :param data: the command
+        :param expected_responses: the responses that the firmware should send back, in order
+        :param description: the command description, used in error messages
+        """
+        if len(data) > self._window_size_bytes:
+            raise MachineCommunicationException(
+                "Command %s (%d bytes) doesn't fit in the window" % (description, len(data)))
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._error or (
+                len(self._commands_in_flight) < self._max_commands_in_flight and
+                self._bytes_in_flight + len(data) <= self._window_size_bytes
+            ))
+            self._raise_error_if_any()
+
+            # The command is registered before being written, so that the response can't arrive earlier.
+            self._commands_in_flight.append(self._CommandInFlight(description, expected_responses, len(data)))
+            self._bytes_in_flight += len(data)
+
+        self._ser.write(data)
+
+    @typechecked
+    def wait_until_acknowledged(self) -> None:
+        """
+        Wait until all commands in flight have been acknowledged.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._error or not self._commands_in_flight)
+            self._raise_error_if_any()
+
+    @property
+    @typechecked
+    def bytes_in_flight(self) -> int:
+        return self._bytes_in_flight
+
+    def _raise_error_if_any(self) -> None:
+        if self._error:
+            raise MachineCommunicationException(self._error)
+
+    def _read_responses(self) -> None:
+        while self._running:
+            try:
+                content = self._ser.read(1)
+            except Exception as e:
+                self._fail("Unable to read from serial port: %s" % repr(e))
+                return
+
+            if not content:
+                continue
+
+            response, = struct.unpack('B', content)
+            with self._condition:
+                if not self._commands_in_flight:
+                    self._fail("Unexpected response: %s" % response)
+                    continue
+
+                command = self._commands_in_flight[0]
+                expected_response = command.expected_responses.popleft()
+
+                if response != expected_response:
+                    if response == messages.MESSAGE_FLUSH_FAILED:
+                        self._fail("Failed flush: %s" % self._ser.read(1))
+                    else:
+                        self._fail("Invalid response: %s when trying to %s" % (response, command.description))
+                    continue
+
+                if not command.expected_responses:
+                    self._commands_in_flight.popleft()
+                    self._bytes_in_flight -= command.size
+                    self._condition.notify_all()
+
+    def _fail(self, error: str) -> None:
+        with self._condition:
+            if not self._error:
+                self._error = error
+            self._condition.notify_all()
+
+
 class Arduino3AxisSerialMachine(BaseMachine):
     """
     An implementation of a Machine that uses binary commands send via serial-port to an Arduino as a backend.
@@ -40,7 +196,15 @@ class Arduino3AxisSerialMachine(BaseMachine):
             invert_z: bool,
             default_feed_rate: Numeric,
             rapid_move_feed_rate: Numeric,
-            port_path_template: str = '/dev/ttyUSB*'):
+            port_path_template: str = '/dev/ttyUSB*',
+            lookahead: bool = False,
+            batch_size: int = 10,
+            window_size_bytes: int = FIRMWARE_SERIAL_RX_BUFFER_SIZE,
+            max_commands_in_flight: int = FIRMWARE_MOVES_BUFFER_SIZE,
+            baud_rate: int = FIRMWARE_INITIAL_BAUD_RATE,
+            compact_encoding: bool = True,
+            arc_tolerance: Numeric = DEFAULT_ARC_TOLERANCE,
+            motion_planner: typing.Optional[MotionPlanner] = None):
         """
         :param steps_per_mm_x: how many stepper motor pulses are needed for one millimeter move on the X axis
         :param steps_per_mm_y: how many stepper motor pulses are needed for one millimeter move on the Y axis
@@ -50,7 +214,37 @@ class Arduino3AxisSerialMachine(BaseMachine):
         :param invert_z: if the Z axis is inverted
         :param default_feed_rate: the default feed rate when milling
         :param rapid_move_feed_rate: the default feed rate when moving the tool
+        :param port_path_template: a glob pattern the serial port path should match
+        :param lookahead: if the firmware, when its buffer is full, should execute only the oldest move (instead
+            of all of them), so that the buffer stays full and the moves are executed without stops between
+            consecutive batches. Requires the firmware to support MESSAGE_SET_LOOKAHEAD.
+        :param batch_size: how many moves to send to the firmware in one MESSAGE_MOVES_BATCH message (if the
+            message fits in the window)
+        :param window_size_bytes: how many bytes may be sent to the firmware without being acknowledged
+            (please refer to SerialCommandWindow)
+        :param max_commands_in_flight: how many commands may be sent to the firmware without being acknowledged
+        :param baud_rate: the serial port baud rate. The connection is established using FIRMWARE_INITIAL_BAUD_RATE
+            and then both sides switch to this one. Baud rates other than the initial one require the firmware to
+            support MESSAGE_SET_BAUD_RATE.
+        :param compact_encoding: if the moves should be sent using MESSAGE_COMPACT_MOVES_BATCH (please refer
+            to machine.arduino.encoding) when the firmware supports it
+        :param arc_tolerance: please refer to BaseMachine.arc_tolerance
+        :param motion_planner: if given, the moves are accelerated and decelerated as planned by it (please refer
+            to motion_planner), instead of being executed at the full feed rate from start to end. The speed
+            changes within the moves if the firmware supports MESSAGE_RAMPED_MOVES_BATCH - otherwise, the moves
+            are split into parts executed at constant speeds.
         """
+        if not 1 <= batch_size <= FIRMWARE_MOVES_BUFFER_SIZE:
+            raise Arduino3AxisSerialMachineError(
+                "Batch size should be between 1 and %d, not %d" % (FIRMWARE_MOVES_BUFFER_SIZE, batch_size))
+
+        if window_size_bytes < max(BATCHED_MOVE_STRUCT.size, COMPACT_MOVE_MAX_SIZE, RAMPED_MOVE_STRUCT.size) + 2:
+            raise Arduino3AxisSerialMachineError("Window size too small to send a single move")
+
+        if baud_rate not in FIRMWARE_SUPPORTED_BAUD_RATES:
+            raise Arduino3AxisSerialMachineError(
+                "Unsupported baud rate: %d, supported ones: %s" % (baud_rate, FIRMWARE_SUPPORTED_BAUD_RATES))
+
         port = self._autodetect_port(port_path_template)
         if port:
             self._real_machine_connected = True
@@ -58,7 +252,7 @@ class Arduino3AxisSerialMachine(BaseMachine):
             LOGGER.error("Unable to detect serial port. To facilitate experiments, /dev/null will be used.")
             self._real_machine_connected = False
 
-        self._ser = serial.Serial(port)
+        self._ser = serial.Serial(port, baudrate=FIRMWARE_INITIAL_BAUD_RATE)
         self._initialized = False
         self._steps_per_mm_x = steps_per_mm_x
         self._steps_per_mm_y = steps_per_mm_y
@@ -68,7 +262,17 @@ class Arduino3AxisSerialMachine(BaseMachine):
         self._invert_z = invert_z
         self._default_feed_rate = default_feed_rate
         self._rapid_move_feed_rate = rapid_move_feed_rate
-        self._last_direction = {}
+        self._lookahead = lookahead
+        self._batch_size = batch_size
+        self._compact_encoding = compact_encoding
+        self._capabilities = 0
+        self._moves_encoder = MovesEncoder()
+        self._window_size_bytes = window_size_bytes
+        self._max_commands_in_flight = max_commands_in_flight
+        self._command_window = None
+        self._baud_rate = baud_rate
+        self._arc_tolerance = arc_tolerance
+        self._motion_planner = motion_planner
 
     def guard_that_a_real_machine_is_connected(self) -> None:
         if not self._real_machine_connected:
@@ -96,9 +300,44 @@ class Arduino3AxisSerialMachine(BaseMachine):
         """
         self.guard_that_a_real_machine_is_connected()
 
+        if self._command_window:
+            self._command_window.stop()
+            self._command_window = None
+
+        self._ser.timeout = None
         self._initialized = True
         self._ping_until_ok()
 
+        # When reinitializing, the firmware may already use the requested baud rate.
+        if self._ser.baudrate != self._baud_rate:
+            self._set_baud_rate(self._baud_rate)
+
+        if self._lookahead:
+            self._set_lookahead(True)
+
+        self._capabilities = self._get_capabilities()
+        self._moves_encoder = self._create_moves_encoder()
+
+        # From now on, all commands are sent via the window.
+        self._command_window = SerialCommandWindow(
+            self._ser,
+            self._window_size_bytes,
+            self._max_commands_in_flight,
+        )
+        self._command_window.start()
+
+    @typechecked
+    def close(self) -> None:
+        """
+        Stops the command window and closes the serial port.
+        """
+        if self._command_window:
+            self._command_window.stop()
+            self._command_window = None
+
+        self._initialized = False
+        self._ser.close()
+
     @typechecked
     def _ping_until_ok(self) -> None:
         while True:
@@ -113,90 +352,140 @@ class Arduino3AxisSerialMachine(BaseMachine):
                     break
 
     @typechecked
-    def flush(self) -> None:
+    def _set_baud_rate(self, baud_rate: int) -> None:
+        self._ser.write(struct.pack('<BI', messages.MESSAGE_SET_BAUD_RATE, baud_rate))
+        content = self._ser.read(1)
+        response, = struct.unpack('B', content)
+        if response != messages.MESSAGE_BAUD_RATE_SET:
+            raise MachineCommunicationException("Invalid response: %s when trying to SET_BAUD_RATE %d" % (
+                response,
+                baud_rate,
+            ))
+
+        # The response has been sent using the old baud rate, the firmware has switched to the new one afterwards.
+        self._ser.baudrate = baud_rate
+        self._ping_until_ok()
+
+    @typechecked
+    def _get_capabilities(self) -> int:
         """
-        Please refer to the docstring in the base class.
+        Returns the bits of optional features supported by the firmware (messages.CAPABILITY_*) - none, if the
+        firmware doesn't support MESSAGE_GET_CAPABILITIES.
         """
-        self.guard_that_a_real_machine_is_connected()
+        self._ser.write(struct.pack('B', messages.MESSAGE_GET_CAPABILITIES))
+        response, = struct.unpack('B', self._ser.read(1))
+        if response == messages.MESSAGE_UNKNOWN:
+            return 0
+        if response != messages.MESSAGE_CAPABILITIES:
+            raise MachineCommunicationException("Invalid response: %s when trying to GET_CAPABILITIES" % response)
 
-        self._ser.write(struct.pack('B', messages.MESSAGE_FLUSH))
-        content = self._ser.read(1)
-        response, = struct.unpack('B', content)
-        if response != messages.MESSAGE_FLUSH_STARTED:
-            raise MachineCommunicationException("Invalid response: %s when trying to FLUSH" % response)
-        content = self._ser.read(1)
-        response, = struct.unpack('B', content)
-        if response == messages.MESSAGE_FLUSH_FINISHED:
-            return
-        elif response == messages.MESSAGE_FLUSH_FAILED:
-            content = self._ser.read(1)
-            raise MachineCommunicationException("Failed flush: %s" % content)
-        else:
-            raise MachineCommunicationException("Invalid response: %s when trying to FLUSH" % response)
+        capabilities, = struct.unpack('B', self._ser.read(1))
+        return capabilities
 
     @typechecked
-    def _set_dir(self, axis_id: int, state: int) -> None:
-        if state == self._last_direction.get(axis_id, None):
-            return
-        self._last_direction[axis_id] = state
+    def _create_moves_encoder(self) -> MovesEncoder:
+        if self._motion_planner is not None and self._capabilities & messages.CAPABILITY_RAMPED_MOVES:
+            return RampedMovesEncoder()
+        elif self._compact_encoding and self._capabilities & messages.CAPABILITY_COMPACT_MOVES_BATCH:
+            return CompactMovesEncoder()
+        else:
+            return MovesEncoder()
 
-        self._ser.write(struct.pack('B', messages.MESSAGE_SET_DIR))
-        self._ser.write(struct.pack('B', axis_id))
-        self._ser.write(struct.pack('B', state))
+    @typechecked
+    def _set_lookahead(self, lookahead: bool) -> None:
+        self._ser.write(struct.pack('BB', messages.MESSAGE_SET_LOOKAHEAD, int(lookahead)))
         content = self._ser.read(1)
         response, = struct.unpack('B', content)
-        if response != messages.MESSAGE_SET_DIR_SCHEDULED:
-            raise MachineCommunicationException("Invalid response: %s when trying to SET_DIR %d %d" % (
+        if response != messages.MESSAGE_LOOKAHEAD_SET:
+            raise MachineCommunicationException("Invalid response: %s when trying to SET_LOOKAHEAD %d" % (
                 response,
-                axis_id,
-                state
+                lookahead,
             ))
 
     @typechecked
-    def _three_pwm(self, time_us: int, steps_x: int, steps_y: int, steps_z: int) -> None:
-        if steps_x == 0 and steps_y == 0 and steps_z == 0:
+    def flush(self) -> None:
+        """
+        Please refer to the docstring in the base class.
+        """
+        self.guard_that_a_real_machine_is_connected()
+
+        if not self._initialized:
+            raise MachineCommunicationException("Uninitialized machine")
+
+        if self._motion_planner is not None:
+            self._add_planned_moves(self._motion_planner.flush())
+
+        self._send_pending_moves()
+
+        self._command_window.send(
+            struct.pack('B', messages.MESSAGE_FLUSH),
+            (messages.MESSAGE_FLUSH_STARTED, messages.MESSAGE_FLUSH_FINISHED),
+            "FLUSH",
+        )
+        self._command_window.wait_until_acknowledged()
+
+    @typechecked
+    def _send_pending_moves(self) -> None:
+        encoder = self._moves_encoder
+        if encoder.num_moves == 0:
             return
 
-        self._ser.write(struct.pack('B', messages.MESSAGE_THREE_PWM))
-        self._ser.write(struct.pack('<I', time_us))
-        self._ser.write(struct.pack('<I', steps_x))
-        self._ser.write(struct.pack('<I', steps_y))
-        self._ser.write(struct.pack('<I', steps_z))
-        content = self._ser.read(1)
-        response, = struct.unpack('B', content)
-        if response != messages.MESSAGE_THREE_PWM_SCHEDULED:
-            raise MachineCommunicationException("Invalid response: %s when trying to THREE_PWM %d %d %d %d" % (
-                response,
-                time_us,
-                steps_x,
-                steps_y,
-                steps_z
-            ))
+        # As the whole message fits in the window (i.e. in the firmware serial buffer), it is sent at once - the
+        # body will wait in the buffer until the firmware makes room for the moves and sends MOVES_BATCH_READY.
+        # Please refer to the MESSAGE_MOVES_BATCH handler in main/main.ino.
+        self._command_window.send(
+            struct.pack('BB', encoder.MESSAGE, encoder.num_moves) + encoder.data,
+            (messages.MESSAGE_MOVES_BATCH_READY, messages.MESSAGE_MOVES_BATCH_SCHEDULED),
+            "MOVES_BATCH %d" % encoder.num_moves,
+        )
+
+        self._moves_encoder = self._create_moves_encoder()
 
     @typechecked
     def move_by(self, x: Numeric, y: Numeric, z: Numeric, feed_rate: Numeric) -> None:
         """
         Please refer to the docstring in the base class.
+
+        The moves are sent to the firmware in batches, when batch_size moves are collected (or the batch wouldn't
+        fit in the window) or on flush().
         """
         self.guard_that_a_real_machine_is_connected()
 
         if not self._initialized:
             raise MachineCommunicationException("Uninitialized machine")
 
-        if (x < 0) ^ self._invert_x:
-            self._set_dir(0, 0)
+        if self._motion_planner is not None:
+            self._add_planned_moves(self._motion_planner.add(x, y, z, feed_rate))
         else:
-            self._set_dir(0, 1)
+            self._add_move(x, y, z, feed_rate)
 
-        if (y < 0) ^ self._invert_y:
-            self._set_dir(1, 0)
-        else:
-            self._set_dir(1, 1)
+    @typechecked
+    def move_by_many(self, moves: MoveRows) -> None:
+        """
+        Please refer to the docstring in the base class.
+        """
+        self.guard_that_a_real_machine_is_connected()
 
-        if (z < 0) ^ self._invert_z:
-            self._set_dir(2, 0)
-        else:
-            self._set_dir(2, 1)
+        if not self._initialized:
+            raise MachineCommunicationException("Uninitialized machine")
+
+        if self._motion_planner is not None:
+            self._add_planned_moves(self._motion_planner.add_many(moves))
+            return
+
+        add_move = self._add_move
+        for x, y, z, feed_rate in moves:
+            add_move(x, y, z, feed_rate)
+
+    def _dir_bits(self, x: Numeric, y: Numeric, z: Numeric) -> int:
+        return (
+            (0 if (x < 0) ^ self._invert_x else 1) |
+            (0 if (y < 0) ^ self._invert_y else 2) |
+            (0 if (z < 0) ^ self._invert_z else 4)
+        )
+
+    def _add_move(self, x: Numeric, y: Numeric, z: Numeric, feed_rate: Numeric) -> None:
+        dir_bits = self._dir_bits(x, y, z)
 
         x = abs(x)
         y = abs(y)
@@ -204,12 +493,87 @@ class Arduino3AxisSerialMachine(BaseMachine):
 
         time_us = 1_000_000 * 60 * max(x, y, z) / feed_rate
 
-        self._three_pwm(
-            int(time_us),
-            int(x * self._steps_per_mm_x),
-            int(y * self._steps_per_mm_y),
-            int(z * self._steps_per_mm_z)
+        steps_x = int(x * self._steps_per_mm_x)
+        steps_y = int(y * self._steps_per_mm_y)
+        steps_z = int(z * self._steps_per_mm_z)
+
+        if steps_x == 0 and steps_y == 0 and steps_z == 0:
+            return
+
+        self._add_encoded_move((dir_bits, int(time_us), steps_x, steps_y, steps_z))
+
+    def _add_planned_moves(self, planned_moves: typing.List[PlannedMove]) -> None:
+        for planned_move in planned_moves:
+            self._add_planned_move(planned_move)
+
+    def _add_planned_move(self, planned_move: PlannedMove) -> None:
+        """
+        Adds a planned move, split into ramps (please refer to RAMP_MAX_SPEED_RATIO), each of them ramped
+        (i.e. with its entry and exit speeds) if the firmware supports it, or at constant speed otherwise.
+        """
+        dir_bits = self._dir_bits(planned_move.x, planned_move.y, planned_move.z)
+        total_steps = (
+            int(abs(planned_move.x) * self._steps_per_mm_x),
+            int(abs(planned_move.y) * self._steps_per_mm_y),
+            int(abs(planned_move.z) * self._steps_per_mm_z),
         )
+        if total_steps == (0, 0, 0):
+            return
+
+        ramped = isinstance(self._moves_encoder, RampedMovesEncoder)
+        ramps = split_into_ramps(planned_move, RAMP_MAX_SPEED_RATIO, RAMP_MIN_SPEED)
+
+        distance = 0.0
+        previous_steps = (0, 0, 0)
+        for i, (ramp_distance, entry_speed, exit_speed) in enumerate(ramps):
+            distance += ramp_distance
+            if i == len(ramps) - 1:
+                steps = total_steps
+            else:
+                steps = tuple(round(num_steps * distance / planned_move.length) for num_steps in total_steps)
+
+            steps_x, steps_y, steps_z = (current - previous for current, previous in zip(steps, previous_steps))
+            previous_steps = steps
+            # Parts shorter than a step are skipped - their time is negligible.
+            if steps_x == 0 and steps_y == 0 and steps_z == 0:
+                continue
+
+            # The time it takes to change the speed linearly with the step spacing, as the firmware does.
+            time_us = 1_000_000 * ramp_distance * (entry_speed + exit_speed) / (2 * entry_speed * exit_speed)
+
+            if ramped:
+                self._add_encoded_move((
+                    dir_bits, int(time_us), steps_x, steps_y, steps_z,
+                    min(RAMPED_MOVE_MAX_SPEED, round(60 * entry_speed)),
+                    min(RAMPED_MOVE_MAX_SPEED, round(60 * exit_speed)),
+                ))
+            else:
+                self._add_encoded_move((dir_bits, int(time_us), steps_x, steps_y, steps_z))
+
+    def _add_encoded_move(self, move: tuple) -> None:
+        if 2 + len(self._moves_encoder.data) + self._moves_encoder.size_of(move) > self._window_size_bytes:
+            self._send_pending_moves()
+
+        self._moves_encoder.add(move)
+
+        if self._moves_encoder.num_moves >= self._batch_size:
+            self._send_pending_moves()
+
+    @property
+    @typechecked
+    def buffer_size(self) -> int:
+        """
+        Please refer to the docstring in the base class.
+        """
+        return FIRMWARE_MOVES_BUFFER_SIZE
+
+    @property
+    @typechecked
+    def arc_tolerance(self) -> Numeric:
+        """
+        Please refer to the docstring in the base class.
+        """
+        return self._arc_tolerance
 
     @property
     @typechecked
@@ -26,6 +26,18 @@ uint32_t serial__read_unit32_t() {
   return result;
 }
 
+uint16_t serial__read_unit16_t() {
+  uint16_t result = 0;
+
+  serial__wait_for_data_available();
+  result += (uint16_t) Serial.read();
+
+  serial__wait_for_data_available();
+  result += (uint16_t) Serial.read() << 8;
+
+  return result;
+}
+
 
 uint8_t serial__read_unit8_t() {
   serial__wait_for_data_available();
@@ -33,12 +45,49 @@ uint8_t serial__read_unit8_t() {
   return Serial.read();
 }
 
+/* read an unsigned integer encoded using 7 bits per byte, least significant group first */
+uint32_t serial__read_varint() {
+  uint32_t result = 0;
+  uint8_t shift = 0;
+  uint8_t value;
+
+  do {
+    value = serial__read_unit8_t();
+    result |= (uint32_t) (value & 0x7f) << shift;
+    shift += 7;
+  } while (value & 0x80);
+
+  return result;
+}
+
+/* read a signed integer encoded as a zigzag varint: 0, -1, 1, -2, 2... are encoded as 0, 1, 2, 3, 4... */
+int32_t serial__read_zigzag_varint() {
+  uint32_t value = serial__read_varint();
+  return (int32_t) (value >> 1) ^ -(int32_t) (value & 1);
+}
+
 void serial__write_unit8_t(uint8_t value) {
     Serial.write(value);
 }
 
+/* the baud rate the firmware starts with - the host may switch to a faster one using MESSAGE_SET_BAUD_RATE */
+#define INITIAL_BAUD_RATE 9600
+
+/* the baud rates the host may switch to */
+const uint32_t SUPPORTED_BAUD_RATES[] = {9600, 19200, 38400, 57600, 115200, 250000, 500000, 1000000};
+#define NUM_SUPPORTED_BAUD_RATES (sizeof(SUPPORTED_BAUD_RATES) / sizeof(SUPPORTED_BAUD_RATES[0]))
+
+bool is_baud_rate_supported(uint32_t baud_rate) {
+  for (unsigned int i = 0; i < NUM_SUPPORTED_BAUD_RATES; i++) {
+    if (SUPPORTED_BAUD_RATES[i] == baud_rate) {
+      return true;
+    }
+  }
+  return false;
+}
+
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(INITIAL_BAUD_RATE);
 
   // Enable Direction and Pulse stepper motor pins as OUTPUT
   for (int i = 0; i < 3; i++) {
@@ -48,117 +97,260 @@ void setup() {
 }
 
 
-/* interpret an array of move structures and actually send them to output pins of the microcontroller */
-int flush_moves_buffer(struct move* moves_buffer, int moves_buffer_size) {
-    for (int i = 0; i < moves_buffer_size; i++) {
-        /* execute a single move: SET DIRECTION, an axis direction change */
-        if (moves_buffer[i].type == SET_DIR) {
-            if (moves_buffer[i].data.as_set_dir.dir_id >= 0 && moves_buffer[i].data.as_set_dir.dir_id <= 2) {
-                if (moves_buffer[i].data.as_set_dir.dir_state) {
-                    digitalWrite(PIN_DIR[moves_buffer[i].data.as_set_dir.dir_id], HIGH);
-                } else {
-                    digitalWrite(PIN_DIR[moves_buffer[i].data.as_set_dir.dir_id], LOW);
+/*
+ * execute a THREE PWM RAMPED move: as THREE PWM, but the spacing between the signal changes on each axis changes
+ * linearly, from the first one to the last one - inversely proportionally to the entry and the exit speed - so that
+ * the speed changes smoothly and the consecutive moves join without speed jumps; the move still takes
+ * time_microseconds
+ */
+int execute_ramped_three_pwm(struct move* current_move) {
+    uint32_t time_microseconds = current_move->data.as_three_pwm.time_microseconds;
+    uint32_t num_ticks[3] = {
+        current_move->data.as_three_pwm.num_x,
+        current_move->data.as_three_pwm.num_y,
+        current_move->data.as_three_pwm.num_z,
+    };
+    float entry_speed = current_move->data.as_three_pwm.entry_speed;
+    float exit_speed = current_move->data.as_three_pwm.exit_speed;
+
+    if (entry_speed == 0 || exit_speed == 0) {
+        return 1;
+    }
+
+    float spacing[3];
+    float spacing_delta[3];
+    float next[3];
+    uint32_t pul_state[3] = {0, 0, 0};
+    uint32_t ticks_made[3] = {0, 0, 0};
+
+    for (int axis = 0; axis < 3; axis++) {
+        /* the spacings of all the signal changes on the axis sum up to the move time */
+        float num_changes = num_ticks[axis] * 2.0 + 1.0;
+        float first_spacing = 2.0 * time_microseconds * exit_speed / (num_changes * (entry_speed + exit_speed));
+        float last_spacing = 2.0 * time_microseconds * entry_speed / (num_changes * (entry_speed + exit_speed));
+
+        if (first_spacing < 1 || last_spacing < 1) {
+            return 1;
+        }
+
+        spacing[axis] = first_spacing;
+        spacing_delta[axis] = num_changes > 1 ? (last_spacing - first_spacing) / (num_changes - 1) : 0;
+        next[axis] = first_spacing;
+    }
+
+    uint32_t time = 0;
+    while (time < time_microseconds) {
+        float next_iter = next[0];
+        for (int axis = 1; axis < 3; axis++) {
+            if (next[axis] < next_iter) {
+                next_iter = next[axis];
+            }
+        }
+
+        uint32_t next_iter_microseconds = (uint32_t) next_iter;
+        if (next_iter_microseconds > time) {
+            delayMicroseconds(next_iter_microseconds - time);
+            time = next_iter_microseconds;
+        }
+
+        for (int axis = 0; axis < 3; axis++) {
+            if (next[axis] <= next_iter) {
+                pul_state[axis] = 1 - pul_state[axis];
+
+                if (pul_state[axis] == 0) {
+                    ticks_made[axis] += 1;
+                }
+
+                if (ticks_made[axis] < num_ticks[axis]) {
+                    digitalWrite(PIN_PUL[axis], pul_state[axis]);
                 }
+
+                next[axis] += spacing[axis];
+                spacing[axis] += spacing_delta[axis];
             }
-        /* execute a single move: THREE PWM, synchronized series of up/down ticks on each axis */
-        } else if (moves_buffer[i].type == THREE_PWM) {
-            /* a separation between one signal change on X axis (UP to DOWN or DOWN to UP) */
-            uint32_t spacing_x =
-                moves_buffer[i].data.as_three_pwm.time_microseconds /
-                (moves_buffer[i].data.as_three_pwm.num_x * 2 + 1);
-            /* a separation between one signal change on Y axis (UP to DOWN or DOWN to UP) */
-            uint32_t spacing_y =
-                moves_buffer[i].data.as_three_pwm.time_microseconds /
-                (moves_buffer[i].data.as_three_pwm.num_y * 2 + 1);
-            /* a separation between one signal change on Z axis (UP to DOWN or DOWN to UP) */
-            uint32_t spacing_z =
-                moves_buffer[i].data.as_three_pwm.time_microseconds /
-                (moves_buffer[i].data.as_three_pwm.num_z * 2 + 1);
-
-            if (spacing_x == 0 || spacing_y == 0 || spacing_z == 0) {
-                return 1;
+        }
+    }
+
+    return 0;
+}
+
+/* interpret a single move structure and actually send it to output pins of the microcontroller */
+int execute_move(struct move* current_move) {
+    /* execute a single move: SET DIRECTION, an axis direction change */
+    if (current_move->type == SET_DIR) {
+        if (current_move->data.as_set_dir.dir_id >= 0 && current_move->data.as_set_dir.dir_id <= 2) {
+            if (current_move->data.as_set_dir.dir_state) {
+                digitalWrite(PIN_DIR[current_move->data.as_set_dir.dir_id], HIGH);
             } else {
-                uint32_t next_x = spacing_x;
-                uint32_t next_y = spacing_y;
-                uint32_t next_z = spacing_z;
+                digitalWrite(PIN_DIR[current_move->data.as_set_dir.dir_id], LOW);
+            }
+        }
+    /* execute a single move: THREE PWM, synchronized series of up/down ticks on each axis */
+    } else if (
+            current_move->type == THREE_PWM ||
+            current_move->type == THREE_PWM_WITH_DIR ||
+            current_move->type == THREE_PWM_RAMPED) {
+        if (current_move->type == THREE_PWM_WITH_DIR || current_move->type == THREE_PWM_RAMPED) {
+            for (int axis = 0; axis < 3; axis++) {
+                if ((current_move->data.as_three_pwm.dir_bits >> axis) & 1) {
+                    digitalWrite(PIN_DIR[axis], HIGH);
+                } else {
+                    digitalWrite(PIN_DIR[axis], LOW);
+                }
+            }
+        }
 
-                uint32_t pul_state_x = 0;
-                uint32_t pul_state_y = 0;
-                uint32_t pul_state_z = 0;
+        if (current_move->type == THREE_PWM_RAMPED) {
+            return execute_ramped_three_pwm(current_move);
+        }
 
-                uint32_t ticks_made_x = 0;
-                uint32_t ticks_made_y = 0;
-                uint32_t ticks_made_z = 0;
+        /* a separation between one signal change on X axis (UP to DOWN or DOWN to UP) */
+        uint32_t spacing_x =
+            current_move->data.as_three_pwm.time_microseconds /
+            (current_move->data.as_three_pwm.num_x * 2 + 1);
+        /* a separation between one signal change on Y axis (UP to DOWN or DOWN to UP) */
+        uint32_t spacing_y =
+            current_move->data.as_three_pwm.time_microseconds /
+            (current_move->data.as_three_pwm.num_y * 2 + 1);
+        /* a separation between one signal change on Z axis (UP to DOWN or DOWN to UP) */
+        uint32_t spacing_z =
+            current_move->data.as_three_pwm.time_microseconds /
+            (current_move->data.as_three_pwm.num_z * 2 + 1);
+
+        if (spacing_x == 0 || spacing_y == 0 || spacing_z == 0) {
+            return 1;
+        } else {
+            uint32_t next_x = spacing_x;
+            uint32_t next_y = spacing_y;
+            uint32_t next_z = spacing_z;
 
-                uint32_t time = 0;
+            uint32_t pul_state_x = 0;
+            uint32_t pul_state_y = 0;
+            uint32_t pul_state_z = 0;
 
-                while (time < moves_buffer[i].data.as_three_pwm.time_microseconds) {
-                    uint32_t next_iter = next_x;
-                    if (next_y < next_iter) {
-                        next_iter = next_y;
-                    }
+            uint32_t ticks_made_x = 0;
+            uint32_t ticks_made_y = 0;
+            uint32_t ticks_made_z = 0;
 
-                    if (next_z < next_iter) {
-                        next_iter = next_z;
-                    }
+            uint32_t time = 0;
+
+            while (time < current_move->data.as_three_pwm.time_microseconds) {
+                uint32_t next_iter = next_x;
+                if (next_y < next_iter) {
+                    next_iter = next_y;
+                }
 
-                    delayMicroseconds(next_iter - time);
-                    time = next_iter;
+                if (next_z < next_iter) {
+                    next_iter = next_z;
+                }
 
-                    if (time == next_x) {
-                        pul_state_x = 1 - pul_state_x;
+                delayMicroseconds(next_iter - time);
+                time = next_iter;
 
-                        if (pul_state_x == 0) {
-                            ticks_made_x += 1;
-                        }
+                if (time == next_x) {
+                    pul_state_x = 1 - pul_state_x;
 
-                        if (ticks_made_x < moves_buffer[i].data.as_three_pwm.num_x) {
-                            digitalWrite(PIN_PUL[0], pul_state_x);
-                        }
+                    if (pul_state_x == 0) {
+                        ticks_made_x += 1;
+                    }
 
-                        next_x += spacing_x;
+                    if (ticks_made_x < current_move->data.as_three_pwm.num_x) {
+                        digitalWrite(PIN_PUL[0], pul_state_x);
                     }
 
-                    if (time == next_y) {
-                        pul_state_y = 1 - pul_state_y;
+                    next_x += spacing_x;
+                }
 
-                        if (pul_state_y == 0) {
-                            ticks_made_y += 1;
-                        }
+                if (time == next_y) {
+                    pul_state_y = 1 - pul_state_y;
 
-                        if (ticks_made_y < moves_buffer[i].data.as_three_pwm.num_y) {
-                            digitalWrite(PIN_PUL[1], pul_state_y);
-                        }
+                    if (pul_state_y == 0) {
+                        ticks_made_y += 1;
+                    }
 
-                        next_y += spacing_y;
+                    if (ticks_made_y < current_move->data.as_three_pwm.num_y) {
+                        digitalWrite(PIN_PUL[1], pul_state_y);
                     }
 
-                    if (time == next_z) {
-                        pul_state_z = 1 - pul_state_z;
+                    next_y += spacing_y;
+                }
 
-                        if (pul_state_z == 0) {
-                            ticks_made_z += 1;
-                        }
+                if (time == next_z) {
+                    pul_state_z = 1 - pul_state_z;
 
-                        if (ticks_made_z < moves_buffer[i].data.as_three_pwm.num_z) {
-                            digitalWrite(PIN_PUL[2], pul_state_z);
-                        }
+                    if (pul_state_z == 0) {
+                        ticks_made_z += 1;
+                    }
 
-                        next_z += spacing_z;
+                    if (ticks_made_z < current_move->data.as_three_pwm.num_z) {
+                        digitalWrite(PIN_PUL[2], pul_state_z);
                     }
+
+                    next_z += spacing_z;
                 }
             }
-        } else {
-            return 2;
         }
+    } else {
+        return 2;
     }
     return 0;
 }
 
+/*
+ * The moves buffer is a ring buffer: moves_buffer_size moves, starting from moves_buffer_start, wrapping
+ * around at MOVES_BUFFER_MAX_SIZE.
+ */
 const int MOVES_BUFFER_MAX_SIZE = 50;
 move moves_buffer[MOVES_BUFFER_MAX_SIZE];
+int moves_buffer_start = 0;
 int moves_buffer_size = 0;
 
+/*
+ * If lookahead is enabled, when the buffer is full, only the oldest move is executed to make room for a new
+ * one, so that the host is able to keep the buffer full and the moves are executed continuously. Otherwise,
+ * the whole buffer is executed.
+ */
+bool lookahead = false;
+
+/* execute the oldest move in the buffer and remove it from the buffer */
+int execute_oldest_move() {
+    int result = execute_move(&moves_buffer[moves_buffer_start]);
+    moves_buffer_start = (moves_buffer_start + 1) % MOVES_BUFFER_MAX_SIZE;
+    moves_buffer_size--;
+    return result;
+}
+
+/* interpret all moves in the buffer, stopping at the first one that failed */
+int flush_moves_buffer() {
+    int result = 0;
+    while (moves_buffer_size > 0 && result == 0) {
+        result = execute_oldest_move();
+    }
+    moves_buffer_start = 0;
+    moves_buffer_size = 0;
+    return result;
+}
+
+/* execute moves until there is space in the buffer for num_moves more moves */
+void make_room_in_moves_buffer(int num_moves) {
+    while (MOVES_BUFFER_MAX_SIZE - moves_buffer_size < num_moves) {
+        if (lookahead) {
+            execute_oldest_move();
+        } else {
+            flush_moves_buffer();
+        }
+    }
+}
+
+/* make sure there is space in the buffer for one more move and return it */
+struct move* allocate_move() {
+    make_room_in_moves_buffer(1);
+
+    struct move* new_move = &moves_buffer[(moves_buffer_start + moves_buffer_size) % MOVES_BUFFER_MAX_SIZE];
+    moves_buffer_size++;
+    return new_move;
+}
+
 /* a loop that receives messages via serial port and interpretes them */
 void loop() {
   serial__wait_for_data_available();
@@ -185,15 +377,11 @@ void loop() {
       {
         uint32_t dir_id = serial__read_unit8_t();
         uint32_t dir_state = serial__read_unit8_t();
-        if (moves_buffer_size >= MOVES_BUFFER_MAX_SIZE) {
-            flush_moves_buffer(moves_buffer, moves_buffer_size);
-            moves_buffer_size = 0;
-        }
+        struct move* new_move = allocate_move();
 
-        moves_buffer[moves_buffer_size].type = SET_DIR;
-        moves_buffer[moves_buffer_size].data.as_set_dir.dir_id = dir_id;
-        moves_buffer[moves_buffer_size].data.as_set_dir.dir_state = dir_state;
-        moves_buffer_size++;
+        new_move->type = SET_DIR;
+        new_move->data.as_set_dir.dir_id = dir_id;
+        new_move->data.as_set_dir.dir_state = dir_state;
 
         serial__write_unit8_t(MESSAGE_SET_DIR_SCHEDULED);
       }
@@ -206,17 +394,13 @@ void loop() {
        * for a FLUSH message, or end of buffer space, whichever comes first.
        */
       {
-        if (moves_buffer_size >= MOVES_BUFFER_MAX_SIZE) {
-            flush_moves_buffer(moves_buffer, moves_buffer_size);
-            moves_buffer_size = 0;
-        }
+        struct move* new_move = allocate_move();
 
-        moves_buffer[moves_buffer_size].type = THREE_PWM;
-        moves_buffer[moves_buffer_size].data.as_three_pwm.time_microseconds = serial__read_unit32_t();
-        moves_buffer[moves_buffer_size].data.as_three_pwm.num_x = serial__read_unit32_t();
-        moves_buffer[moves_buffer_size].data.as_three_pwm.num_y = serial__read_unit32_t();
-        moves_buffer[moves_buffer_size].data.as_three_pwm.num_z = serial__read_unit32_t();
-        moves_buffer_size++;
+        new_move->type = THREE_PWM;
+        new_move->data.as_three_pwm.time_microseconds = serial__read_unit32_t();
+        new_move->data.as_three_pwm.num_x = serial__read_unit32_t();
+        new_move->data.as_three_pwm.num_y = serial__read_unit32_t();
+        new_move->data.as_three_pwm.num_z = serial__read_unit32_t();
 
         serial__write_unit8_t(MESSAGE_THREE_PWM_SCHEDULED);
       }
@@ -228,8 +412,7 @@ void loop() {
        */
 
       serial__write_unit8_t(MESSAGE_FLUSH_STARTED);
-      result = flush_moves_buffer(moves_buffer, moves_buffer_size);
-      moves_buffer_size = 0;
+      result = flush_moves_buffer();
 
       if (result == 0) {
         serial__write_unit8_t(MESSAGE_FLUSH_FINISHED);
@@ -238,6 +421,158 @@ void loop() {
         serial__write_unit8_t(result & 0xff);
       }
 
+      break;
+    case MESSAGE_MOVES_BATCH:
+      /*
+       * A MOVES BATCH message that schedules a number of moves with their directions.
+       *
+       * The message consists of a header (the number of moves) and a body: for each move, the direction
+       * bits and the THREE PWM parameters. The firmware responds to the header with MOVES BATCH READY only
+       * after making room in the buffer for all the moves, and only then the host sends the body - so that
+       * no moves are executed (and the serial port is not read) while the body is being received, which
+       * would overflow the serial receive buffer.
+       */
+      {
+        uint8_t num_moves = serial__read_unit8_t();
+        if (num_moves > MOVES_BUFFER_MAX_SIZE) {
+          serial__write_unit8_t(MESSAGE_MOVES_BATCH_ERROR);
+          break;
+        }
+
+        make_room_in_moves_buffer(num_moves);
+        serial__write_unit8_t(MESSAGE_MOVES_BATCH_READY);
+
+        for (int i = 0; i < num_moves; i++) {
+          struct move* new_move = allocate_move();
+
+          new_move->type = THREE_PWM_WITH_DIR;
+          new_move->data.as_three_pwm.dir_bits = serial__read_unit8_t();
+          new_move->data.as_three_pwm.time_microseconds = serial__read_unit32_t();
+          new_move->data.as_three_pwm.num_x = serial__read_unit32_t();
+          new_move->data.as_three_pwm.num_y = serial__read_unit32_t();
+          new_move->data.as_three_pwm.num_z = serial__read_unit32_t();
+        }
+
+        serial__write_unit8_t(MESSAGE_MOVES_BATCH_SCHEDULED);
+      }
+      break;
+    case MESSAGE_COMPACT_MOVES_BATCH:
+      /*
+       * A COMPACT MOVES BATCH message that schedules the same moves as MOVES BATCH, but encoded using
+       * fewer bytes.
+       *
+       * Each record in the body starts with a tag byte, with the direction bits in the lower 3 bits. If
+       * COMPACT_MOVE_REPEAT is set, the record repeats the previous move ((tag >> 4) + 1) times. Otherwise,
+       * the tag is followed by the differences between the THREE PWM parameters of this move and the
+       * previous one in the batch (zeros for the first move), encoded as zigzag varints.
+       */
+      {
+        uint8_t num_moves = serial__read_unit8_t();
+        if (num_moves > MOVES_BUFFER_MAX_SIZE) {
+          serial__write_unit8_t(MESSAGE_MOVES_BATCH_ERROR);
+          break;
+        }
+
+        make_room_in_moves_buffer(num_moves);
+        serial__write_unit8_t(MESSAGE_MOVES_BATCH_READY);
+
+        uint32_t previous[4] = {0, 0, 0, 0};
+        int num_read_moves = 0;
+        while (num_read_moves < num_moves) {
+          uint8_t tag = serial__read_unit8_t();
+          int num_repeats = 1;
+
+          if (tag & COMPACT_MOVE_REPEAT) {
+            num_repeats = (tag >> 4) + 1;
+          } else {
+            for (int i = 0; i < 4; i++) {
+              previous[i] += (uint32_t) serial__read_zigzag_varint();
+            }
+          }
+
+          for (; num_repeats > 0 && num_read_moves < num_moves; num_repeats--, num_read_moves++) {
+            struct move* new_move = allocate_move();
+
+            new_move->type = THREE_PWM_WITH_DIR;
+            new_move->data.as_three_pwm.dir_bits = tag & COMPACT_MOVE_DIR_BITS_MASK;
+            new_move->data.as_three_pwm.time_microseconds = previous[0];
+            new_move->data.as_three_pwm.num_x = previous[1];
+            new_move->data.as_three_pwm.num_y = previous[2];
+            new_move->data.as_three_pwm.num_z = previous[3];
+          }
+        }
+
+        serial__write_unit8_t(MESSAGE_MOVES_BATCH_SCHEDULED);
+      }
+      break;
+    case MESSAGE_RAMPED_MOVES_BATCH:
+      /*
+       * A RAMPED MOVES BATCH message that schedules the same moves as MOVES BATCH, but each of them followed by
+       * its entry and exit speed (two uint16_t values, only their ratio matters): the speed changes between them
+       * during the move, so that the host can plan the acceleration (please refer to execute_ramped_three_pwm).
+       */
+      {
+        uint8_t num_moves = serial__read_unit8_t();
+        if (num_moves > MOVES_BUFFER_MAX_SIZE) {
+          serial__write_unit8_t(MESSAGE_MOVES_BATCH_ERROR);
+          break;
+        }
+
+        make_room_in_moves_buffer(num_moves);
+        serial__write_unit8_t(MESSAGE_MOVES_BATCH_READY);
+
+        for (int i = 0; i < num_moves; i++) {
+          struct move* new_move = allocate_move();
+
+          new_move->type = THREE_PWM_RAMPED;
+          new_move->data.as_three_pwm.dir_bits = serial__read_unit8_t();
+          new_move->data.as_three_pwm.time_microseconds = serial__read_unit32_t();
+          new_move->data.as_three_pwm.num_x = serial__read_unit32_t();
+          new_move->data.as_three_pwm.num_y = serial__read_unit32_t();
+          new_move->data.as_three_pwm.num_z = serial__read_unit32_t();
+          new_move->data.as_three_pwm.entry_speed = serial__read_unit16_t();
+          new_move->data.as_three_pwm.exit_speed = serial__read_unit16_t();
+        }
+
+        serial__write_unit8_t(MESSAGE_MOVES_BATCH_SCHEDULED);
+      }
+      break;
+    case MESSAGE_GET_CAPABILITIES:
+      /* a GET CAPABILITIES message, that is responded to with the bits of supported optional features */
+
+      serial__write_unit8_t(MESSAGE_CAPABILITIES);
+      serial__write_unit8_t(CAPABILITY_COMPACT_MOVES_BATCH | CAPABILITY_RAMPED_MOVES);
+
+      break;
+    case MESSAGE_SET_LOOKAHEAD:
+      /*
+       * A SET LOOKAHEAD message that enables (1) or disables (0) the lookahead mode (see the `lookahead`
+       * variable).
+       */
+
+      lookahead = serial__read_unit8_t() != 0;
+      serial__write_unit8_t(MESSAGE_LOOKAHEAD_SET);
+
+      break;
+    case MESSAGE_SET_BAUD_RATE:
+      /*
+       * A SET BAUD RATE message that switches the serial port to a different baud rate.
+       *
+       * The response is sent using the old baud rate, and after it has been transmitted, the port is
+       * reopened with the new one. The host should then switch as well and PING until a PONG is received.
+       */
+      {
+        uint32_t baud_rate = serial__read_unit32_t();
+        if (!is_baud_rate_supported(baud_rate)) {
+          serial__write_unit8_t(MESSAGE_BAUD_RATE_ERROR);
+          break;
+        }
+
+        serial__write_unit8_t(MESSAGE_BAUD_RATE_SET);
+        Serial.flush();
+        Serial.end();
+        Serial.begin(baud_rate);
+      }
       break;
     default:
       {
@@ -10,10 +10,33 @@
 #define MESSAGE_FLUSH_STARTED 0x3a
 #define MESSAGE_FLUSH_FINISHED 0x3b
 #define MESSAGE_FLUSH_FAILED 0x3c
+#define MESSAGE_SET_LOOKAHEAD 0x3d
+#define MESSAGE_LOOKAHEAD_SET 0x3e
+#define MESSAGE_MOVES_BATCH 0x3f
+#define MESSAGE_MOVES_BATCH_READY 0x40
+#define MESSAGE_MOVES_BATCH_SCHEDULED 0x41
+#define MESSAGE_MOVES_BATCH_ERROR 0x42
+#define MESSAGE_SET_BAUD_RATE 0x43
+#define MESSAGE_BAUD_RATE_SET 0x44
+#define MESSAGE_BAUD_RATE_ERROR 0x45
+#define MESSAGE_GET_CAPABILITIES 0x46
+#define MESSAGE_CAPABILITIES 0x47
+#define MESSAGE_COMPACT_MOVES_BATCH 0x48
+#define MESSAGE_RAMPED_MOVES_BATCH 0x49
+
+/* bits in the MESSAGE_CAPABILITIES response */
+#define CAPABILITY_COMPACT_MOVES_BATCH 0x01
+#define CAPABILITY_RAMPED_MOVES 0x02
+
+/* the tag byte of a MESSAGE_COMPACT_MOVES_BATCH record */
+#define COMPACT_MOVE_DIR_BITS_MASK 0x07
+#define COMPACT_MOVE_REPEAT 0x08
 
 typedef uint8_t move_type;
 const int SET_DIR = 0;  /* set the move direction */
 const int THREE_PWM = 1;  /* send a consistent, synchronized PWM signal on all three axes */
+const int THREE_PWM_WITH_DIR = 2;  /* set the directions of all three axes, then behave as THREE_PWM */
+const int THREE_PWM_RAMPED = 3;  /* as THREE_PWM_WITH_DIR, but changing the speed from entry_speed to exit_speed */
 
 union move_data {
     struct {
@@ -26,6 +49,9 @@ union move_data {
         uint32_t num_x;  /* how many up/down ticks on X axis */
         uint32_t num_y;  /* how many up/down ticks on Y axis */
         uint32_t num_z;  /* how many up/down ticks on Z axis */
+        uint8_t dir_bits;  /* THREE_PWM_WITH_DIR and THREE_PWM_RAMPED only: bit i is the direction state of axis i */
+        uint16_t entry_speed;  /* THREE_PWM_RAMPED only: the speed at the beginning of the move (in any unit) */
+        uint16_t exit_speed;  /* THREE_PWM_RAMPED only: the speed at the end of the move (in the same unit) */
     } as_three_pwm;
 };
 
@@ -1,4 +1,5 @@
 # The message codes that are used by the Arduino backend.
+MESSAGE_UNKNOWN = 0x30
 MESSAGE_PING = 0x31
 MESSAGE_PONG = 0x32
 MESSAGE_THREE_PWM = 0x33
@@ -9,3 +10,21 @@ MESSAGE_THREE_PWM_ERROR = 0x38
 MESSAGE_FLUSH = 0x39
 MESSAGE_FLUSH_STARTED = 0x3a
 MESSAGE_FLUSH_FINISHED = 0x3b
+MESSAGE_FLUSH_FAILED = 0x3c
+MESSAGE_SET_LOOKAHEAD = 0x3d
+MESSAGE_LOOKAHEAD_SET = 0x3e
+MESSAGE_MOVES_BATCH = 0x3f
+MESSAGE_MOVES_BATCH_READY = 0x40
+MESSAGE_MOVES_BATCH_SCHEDULED = 0x41
+MESSAGE_MOVES_BATCH_ERROR = 0x42
+MESSAGE_SET_BAUD_RATE = 0x43
+MESSAGE_BAUD_RATE_SET = 0x44
+MESSAGE_BAUD_RATE_ERROR = 0x45
+MESSAGE_GET_CAPABILITIES = 0x46
+MESSAGE_CAPABILITIES = 0x47
+MESSAGE_COMPACT_MOVES_BATCH = 0x48
+MESSAGE_RAMPED_MOVES_BATCH = 0x49
+
+# Bits in the MESSAGE_CAPABILITIES response
+CAPABILITY_COMPACT_MOVES_BATCH = 0x01
+CAPABILITY_RAMPED_MOVES = 0x02
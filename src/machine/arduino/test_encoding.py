@@ -0,0 +1,65 @@
+import random
+
+from unittest import TestCase
+
+from machine.arduino.encoding import (
+    BATCHED_MOVE_STRUCT,
+    COMPACT_MOVE_MAX_SIZE,
+    CompactMovesEncoder,
+    encode_delta,
+    encode_varint,
+    read_compact_moves,
+    read_delta,
+)
+
+
+class CompactMovesEncoderTestCase(TestCase):
+    def _encode_and_decode(self, moves):
+        encoder = CompactMovesEncoder()
+        for move in moves:
+            size = encoder.size_of(move)
+            size_before = len(encoder.data)
+            encoder.add(move)
+            self.assertEqual(len(encoder.data) - size_before, size)
+
+        self.assertEqual(encoder.num_moves, len(moves))
+        read_uint8 = iter(encoder.data).__next__
+        self.assertEqual(list(read_compact_moves(read_uint8, encoder.num_moves)), moves)
+        return encoder.data
+
+    def test_varint(self):
+        self.assertEqual(encode_varint(0), b'\x00')
+        self.assertEqual(encode_varint(127), b'\x7f')
+        self.assertEqual(encode_varint(300), b'\xac\x02')
+        self.assertEqual(len(encode_varint(2 ** 32 - 1)), 5)
+
+    def test_delta(self):
+        for value, previous in [(0, 0), (5, 10), (10, 5), (0, 2 ** 32 - 1), (2 ** 32 - 1, 0), (123456789, 7)]:
+            data = encode_delta(value, previous)
+            self.assertLessEqual(len(data), 5)
+            self.assertEqual(read_delta(iter(data).__next__, previous), value)
+
+        self.assertEqual(len(encode_delta(5, 10)), 1)
+
+    def test_random_moves(self):
+        generator = random.Random(0)
+        moves = [
+            (
+                generator.randrange(8),
+                generator.randrange(2 ** 32),
+                generator.randrange(2 ** 32),
+                generator.randrange(100),
+                generator.randrange(2),
+            )
+            for i in range(100)
+        ]
+        data = self._encode_and_decode(moves)
+        self.assertLessEqual(len(data), COMPACT_MOVE_MAX_SIZE * len(moves))
+
+    def test_repeated_moves(self):
+        moves = [(7, 3000, 10, 5, 0)] * 40 + [(6, 3000, 10, 5, 0)] * 3 + [(6, 3001, 10, 6, 0)]
+        data = self._encode_and_decode(moves)
+
+        # The first move, repeats: 15 + 15 + 9 of the first move, 3 of the second one, then the last move.
+        self.assertEqual(len(data), 6 + 3 + 1 + 5)
+        self.assertLess(len(data), BATCHED_MOVE_STRUCT.size * len(moves) / 10)
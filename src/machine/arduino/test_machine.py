@@ -0,0 +1,201 @@
+import queue
+import serial
+import struct
+import threading
+import time
+
+from unittest import TestCase
+
+from exceptions import MachineCommunicationException
+from machine.arduino import messages
+from machine.arduino.emulator import ArduinoEmulator
+from machine.arduino.machine import Arduino3AxisSerialMachine, Arduino3AxisSerialMachineError, SerialCommandWindow
+from motion_planner import MotionPlanner
+
+
+class FakeSerial():
+    """
+    A serial port, that acknowledges each written command after a delay with given response.
+    """
+    def __init__(self, response: int, delay: float):
+        self.timeout = None
+        self.max_unread_bytes = 0
+        self._response = response
+        self._delay = delay
+        self._unread_bytes = 0
+        self._lock = threading.Lock()
+        self._responses = queue.Queue()
+
+    def write(self, data):
+        with self._lock:
+            self._unread_bytes += len(data)
+            self.max_unread_bytes = max(self.max_unread_bytes, self._unread_bytes)
+
+        def acknowledge():
+            time.sleep(self._delay)
+            with self._lock:
+                self._unread_bytes -= len(data)
+            self._responses.put(bytes([self._response]))
+
+        threading.Thread(target=acknowledge).start()
+
+    def read(self, size):
+        try:
+            return self._responses.get(timeout=self.timeout)
+        except queue.Empty:
+            return b''
+
+
+class SerialCommandWindowTestCase(TestCase):
+    def test_window_is_respected(self):
+        ser = FakeSerial(response=0x41, delay=0.01)
+        window = SerialCommandWindow(ser, window_size_bytes=64, max_commands_in_flight=10)
+        window.start()
+        try:
+            for i in range(20):
+                window.send(b'x' * 20, (0x41,), "TEST")
+            window.wait_until_acknowledged()
+
+            self.assertEqual(window.bytes_in_flight, 0)
+            self.assertEqual(ser.max_unread_bytes, 60)
+        finally:
+            window.stop()
+
+    def test_invalid_response(self):
+        ser = FakeSerial(response=0x30, delay=0)
+        window = SerialCommandWindow(ser, window_size_bytes=64, max_commands_in_flight=10)
+        window.start()
+        try:
+            window.send(b'x', (0x41,), "TEST")
+            with self.assertRaises(MachineCommunicationException):
+                window.wait_until_acknowledged()
+        finally:
+            window.stop()
+
+
+class Arduino3AxisSerialMachineEmulatorTestCase(TestCase):
+    def _create_machine(self, initial_baud_rate=1_000_000, capabilities=messages.CAPABILITY_COMPACT_MOVES_BATCH,
+                        **kwargs):
+        emulator = ArduinoEmulator(baud_rate=initial_baud_rate, time_scale=0, capabilities=capabilities)
+        emulator.start()
+        self.addCleanup(emulator.stop)
+
+        machine = Arduino3AxisSerialMachine(
+            steps_per_mm_x=10,
+            steps_per_mm_y=10,
+            steps_per_mm_z=10,
+            invert_x=False,
+            invert_y=False,
+            invert_z=True,
+            default_feed_rate=100,
+            rapid_move_feed_rate=200,
+            port_path_template=emulator.port_path,
+            **kwargs
+        )
+        self.addCleanup(machine.close)
+        machine.initialize()
+        return emulator, machine
+
+    def test_moves(self):
+        emulator, machine = self._create_machine()
+        machine.move_by(1, -2, 3, 100)
+        machine.move_by(0.5, 0, -1, 100)
+        machine.flush()
+
+        self.assertEqual(emulator.positions, [15, -20, -20])
+        self.assertEqual(emulator.num_executed_moves, 2)
+
+    def test_move_by_many(self):
+        emulator, machine = self._create_machine()
+        machine.move_by_many([(1, -2, 3, 100), (0.5, 0, -1, 100)] * 20)
+        machine.flush()
+
+        self.assertEqual(emulator.positions, [300, -400, -400])
+        self.assertEqual(emulator.num_executed_moves, 40)
+
+    def test_many_moves_in_lookahead_mode(self):
+        emulator, machine = self._create_machine(lookahead=True, batch_size=3)
+        for i in range(200):
+            machine.move_by(0.1, -0.1 if i % 2 else 0.1, 0, 100)
+        machine.flush()
+
+        self.assertEqual(emulator.positions, [200, 0, 0])
+        self.assertEqual(emulator.num_executed_moves, 200)
+        self.assertEqual(emulator.rx_overflows, 0)
+
+    def test_compact_encoding(self):
+        num_received_bytes = []
+        for capabilities in [0, messages.CAPABILITY_COMPACT_MOVES_BATCH]:
+            emulator, machine = self._create_machine(capabilities=capabilities)
+            for i in range(100):
+                machine.move_by(0.1, 0.1 if i < 50 else 0.2, -0.1, 100)
+            machine.flush()
+
+            # The Z axis is inverted
+            self.assertEqual(emulator.positions, [100, 150, 100])
+            num_received_bytes.append(emulator.num_received_bytes)
+
+        self.assertLess(num_received_bytes[1], num_received_bytes[0] / 3)
+
+    def test_planned_moves(self):
+        for capabilities, num_ramped_moves in [
+                (messages.CAPABILITY_COMPACT_MOVES_BATCH, 0),
+                (messages.CAPABILITY_COMPACT_MOVES_BATCH | messages.CAPABILITY_RAMPED_MOVES, None)]:
+            emulator, machine = self._create_machine(
+                capabilities=capabilities, lookahead=True, motion_planner=MotionPlanner(acceleration=100))
+            for i in range(50):
+                machine.move_by(0.5, 0.1 if i < 25 else -0.1, -0.1, 600)
+            machine.flush()
+
+            # The Z axis is inverted
+            self.assertEqual(emulator.positions, [250, 0, 50])
+            self.assertEqual(emulator.rx_overflows, 0)
+            # The moves are split into ramps.
+            self.assertGreater(emulator.num_executed_moves, 50)
+            if num_ramped_moves is None:
+                self.assertEqual(emulator.num_executed_ramped_moves, emulator.num_executed_moves)
+            else:
+                self.assertEqual(emulator.num_executed_ramped_moves, num_ramped_moves)
+
+    def test_failed_flush(self):
+        emulator, machine = self._create_machine()
+        # Too short to make a step on the X axis
+        machine.move_by(1000, 0, 0, 1_000_000_000)
+        with self.assertRaises(MachineCommunicationException):
+            machine.flush()
+
+    def test_baud_rate_negotiation(self):
+        emulator, machine = self._create_machine(initial_baud_rate=9600, baud_rate=115200)
+        self.assertEqual(emulator.baud_rate, 115200)
+
+        machine.move_by(1, 0, 0, 100)
+        machine.flush()
+        self.assertEqual(emulator.positions, [10, 0, 0])
+
+        machine.initialize()
+        self.assertEqual(emulator.baud_rate, 115200)
+
+    def test_unsupported_baud_rate(self):
+        with self.assertRaises(Arduino3AxisSerialMachineError):
+            Arduino3AxisSerialMachine(10, 10, 10, False, False, False, 100, 200, baud_rate=12345)
+
+
+class ArduinoEmulatorTestCase(TestCase):
+    def test_rx_buffer_overflow(self):
+        with ArduinoEmulator(baud_rate=1_000_000) as emulator:
+            ser = serial.Serial(emulator.port_path, timeout=1)
+            try:
+                ser.write(struct.pack('<BIIII', messages.MESSAGE_THREE_PWM, 200_000, 1, 0, 0))
+                ser.write(struct.pack('B', messages.MESSAGE_FLUSH))
+                self.assertEqual(ser.read(2), bytes([
+                    messages.MESSAGE_THREE_PWM_SCHEDULED,
+                    messages.MESSAGE_FLUSH_STARTED,
+                ]))
+
+                # The firmware is executing the move now, so the pings don't fit in its receive buffer.
+                ser.write(struct.pack('B', messages.MESSAGE_PING) * 100)
+                self.assertEqual(ser.read(1), bytes([messages.MESSAGE_FLUSH_FINISHED]))
+                self.assertEqual(ser.read(100), bytes([messages.MESSAGE_PONG]) * 64)
+                self.assertEqual(emulator.rx_overflows, 1)
+            finally:
+                ser.close()
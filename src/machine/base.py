@@ -2,8 +2,14 @@ from abc import (
     ABC,
     abstractmethod,
 )
+import time
 
-from utils.typing import Numeric
+from utils.typing import MoveRows, Numeric
+
+
+# The default maximum deviation (in millimeters) of the segments that arcs are approximated with from the
+# actual arcs.
+DEFAULT_ARC_TOLERANCE = 0.01
 
 
 class BaseMachine(ABC):
@@ -33,10 +39,49 @@ class BaseMachine(ABC):
     @abstractmethod
     def move_by(self, x: Numeric, y: Numeric, z: Numeric, feed_rate: Numeric) -> None:
         """
-        Move the tool by a vector with given feed rate (mm/s).
+        Move the tool by a vector with given feed rate (mm/min).
         """
         raise NotImplementedError
 
+    def move_by_many(self, moves: MoveRows) -> None:
+        """
+        Move the tool by a sequence of vectors, each with its own feed rate (mm/min): (x, y, z, feed rate) rows.
+
+        The default implementation calls move_by() for each move - machines may override it to avoid the
+        per-move overhead.
+        """
+        for x, y, z, feed_rate in moves:
+            self.move_by(x, y, z, feed_rate)
+
+    def set_rapid_moves(self, is_rapid: bool) -> None:
+        """
+        Called before moves, whether they are rapid moves (G0, going home) or milling - until it's called again.
+
+        Machines that don't tell the rapid moves apart by anything else than their feed rates may ignore it.
+        """
+        pass
+
+    @property
+    def buffer_size(self) -> int:
+        """
+        How many moves the machine is able to cache before it needs to be flushed.
+        """
+        return 1
+
+    @property
+    def arc_tolerance(self) -> Numeric:
+        """
+        The maximum deviation (in millimeters) of the segments that arcs are approximated with from the actual arcs.
+        """
+        return DEFAULT_ARC_TOLERANCE
+
+    def dwell(self, seconds: Numeric) -> None:
+        """
+        Wait given number of seconds after all cached commands have been executed.
+        """
+        self.flush()
+        time.sleep(seconds)
+
     @property
     @abstractmethod
     def default_feed_rate(self) -> Numeric:
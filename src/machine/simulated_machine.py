@@ -1,9 +1,101 @@
+from array import array
+import collections.abc
+import math
 import typing
 
-from typeguard import typechecked
+from machine.base import BaseMachine, DEFAULT_ARC_TOLERANCE
+from utils.typing import MoveRows, Numeric, typechecked
 
-from machine.base import BaseMachine
-from utils.typing import Numeric
+
+# The feed rate of the milling moves the program doesn't set the feed rate for: NaN, as it's up to the machine
+# that runs the program (please refer to is_default_feed_rate()).
+SIMULATED_DEFAULT_FEED_RATE = math.nan
+# The feed rate of the rapid moves. It's only a placeholder - the rapid moves are told apart from milling
+# by the interpreter (please refer to BaseMachine.set_rapid_moves), not by their feed rates.
+SIMULATED_RAPID_MOVE_FEED_RATE = 10
+
+
+def is_default_feed_rate(feed_rate: float) -> bool:
+    """
+    Returns whether a simulated move has the default feed rate, i.e. the program hasn't set the feed rate for it.
+    """
+    return math.isnan(feed_rate)
+
+
+class SimulatedMoves(collections.abc.Sequence):
+    """
+    A log of simulated moves, stored in columns (arrays of doubles and bytes) instead of a tuple per move,
+    so that a million moves take about 33 MB and appending a move doesn't allocate a Python object.
+
+    Indexing it returns (x, y, z, if the move was a rapid move (i.e. not milling)) tuples, as the lists
+    of tuples that used to be returned.
+
+    The total time (in seconds) of the dwells (G4) between the moves is kept in dwell_time.
+    """
+    def __init__(self):
+        self._x = array('d')
+        self._y = array('d')
+        self._z = array('d')
+        self._rapid = array('B')
+        self._feed_rate = array('d')
+        self.dwell_time = 0.0
+
+    def append(self, x: Numeric, y: Numeric, z: Numeric, is_rapid: bool, feed_rate: Numeric) -> None:
+        self._x.append(x)
+        self._y.append(y)
+        self._z.append(z)
+        self._rapid.append(is_rapid)
+        self._feed_rate.append(feed_rate)
+
+    def extend(self, moves: typing.Iterable[typing.Tuple[Numeric, Numeric, Numeric, bool, Numeric]]) -> None:
+        """
+        Appends many moves: (x, y, z, is_rapid, feed_rate) rows, as the arguments of append().
+        """
+        append_x = self._x.append
+        append_y = self._y.append
+        append_z = self._z.append
+        append_rapid = self._rapid.append
+        append_feed_rate = self._feed_rate.append
+
+        for x, y, z, is_rapid, feed_rate in moves:
+            append_x(x)
+            append_y(y)
+            append_z(z)
+            append_rapid(is_rapid)
+            append_feed_rate(feed_rate)
+
+    def __len__(self) -> int:
+        return len(self._x)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return (self._x[index], self._y[index], self._z[index], bool(self._rapid[index]))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, collections.abc.Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(move == other_move for move, other_move in zip(self, other))
+
+    def __repr__(self) -> str:
+        return 'SimulatedMoves(%r)' % list(self)
+
+    @property
+    def columns(self) -> typing.Tuple[memoryview, memoryview, memoryview, memoryview, memoryview]:
+        """
+        Returns the x, y, z, rapid move flag and feed rate columns, without copying them.
+
+        The columns can't grow while the returned views exist, so they should be released before more moves
+        are simulated.
+        """
+        return (
+            memoryview(self._x),
+            memoryview(self._y),
+            memoryview(self._z),
+            memoryview(self._rapid),
+            memoryview(self._feed_rate),
+        )
 
 
 class SimulatedMachine(BaseMachine):
@@ -12,10 +104,17 @@ class SimulatedMachine(BaseMachine):
     so that they may be collected, and, for example, rendered as SVG.
     """
 
-    def __init__(self):
-        self._simulated_moves = [(0, 0, 0, False)]
-        self._default_feed_rate = 1
-        self._rapid_move_feed_rate = 10
+    @typechecked
+    def __init__(self, arc_tolerance: Numeric = DEFAULT_ARC_TOLERANCE):
+        """
+        :param arc_tolerance: please refer to BaseMachine.arc_tolerance
+        """
+        self._arc_tolerance = arc_tolerance
+        self._simulated_moves = SimulatedMoves()
+        self._simulated_moves.append(0, 0, 0, False, 0)
+        self._default_feed_rate = SIMULATED_DEFAULT_FEED_RATE
+        self._rapid_move_feed_rate = SIMULATED_RAPID_MOVE_FEED_RATE
+        self._rapid_moves = False
         self._tool_position_x = 0
         self._tool_position_y = 0
         self._tool_position_z = 0
@@ -35,17 +134,27 @@ class SimulatedMachine(BaseMachine):
         pass
 
     @typechecked
-    def move_by(self, x: Numeric, y: Numeric, z: Numeric, feed_rate: Numeric) -> None:
+    def dwell(self, seconds: Numeric) -> None:
         """
         Please refer to the docstring in the base class.
+
+        Simulated moves take no time, so there is nothing to wait for - the time is only added up (please refer
+        to SimulatedMoves).
         """
-        if feed_rate == self._default_feed_rate:
-            is_rapid = False
-        elif feed_rate == self._rapid_move_feed_rate:
-            is_rapid = True
-        else:
-            is_rapid = False
+        self._simulated_moves.dwell_time += seconds
 
+    @typechecked
+    def set_rapid_moves(self, is_rapid: bool) -> None:
+        """
+        Please refer to the docstring in the base class.
+        """
+        self._rapid_moves = is_rapid
+
+    @typechecked
+    def move_by(self, x: Numeric, y: Numeric, z: Numeric, feed_rate: Numeric) -> None:
+        """
+        Please refer to the docstring in the base class.
+        """
         # We don't use the tool position from GCodeInterpreter, because we want to be
         # more realistic: the machine has its own tool position, and the interpreter role
         # is just to model it.
@@ -53,23 +162,60 @@ class SimulatedMachine(BaseMachine):
         self._tool_position_y += y
         self._tool_position_z += z
 
-        self._simulated_moves.append((
+        self._simulated_moves.append(
             self._tool_position_x,
             self._tool_position_y,
             self._tool_position_z,
-            is_rapid
-        ))
+            self._rapid_moves,
+            feed_rate,
+        )
 
-    @property
     @typechecked
-    def simulated_moves(self) -> typing.List[typing.Tuple[Numeric, Numeric, Numeric, bool]]:
+    def move_by_many(self, moves: MoveRows) -> None:
         """
-        Returns the collected simulated moves.
+        Please refer to the docstring in the base class.
+        """
+        self._simulated_moves.extend(self._positions_after_moves(moves))
+
+    def _positions_after_moves(self, moves: MoveRows):
+        is_rapid = self._rapid_moves
+        tool_position_x = self._tool_position_x
+        tool_position_y = self._tool_position_y
+        tool_position_z = self._tool_position_z
+
+        for x, y, z, feed_rate in moves:
+            tool_position_x += x
+            tool_position_y += y
+            tool_position_z += z
+            yield (
+                tool_position_x,
+                tool_position_y,
+                tool_position_z,
+                is_rapid,
+                feed_rate,
+            )
+
+        self._tool_position_x = tool_position_x
+        self._tool_position_y = tool_position_y
+        self._tool_position_z = tool_position_z
+
+    @property
+    def simulated_moves(self) -> SimulatedMoves:
+        """
+        Returns the collected simulated moves. This is a view, not a copy - it includes the moves simulated later.
 
-        :return: a list of tuples (x, y, z, if the move was a rapid move (i.e. not milling)).
+        :return: a sequence of tuples (x, y, z, if the move was a rapid move (i.e. not milling)).
         """
         return self._simulated_moves
 
+    @property
+    @typechecked
+    def arc_tolerance(self) -> Numeric:
+        """
+        Please refer to the docstring in the base class.
+        """
+        return self._arc_tolerance
+
     @property
     @typechecked
     def default_feed_rate(self) -> Numeric:
@@ -0,0 +1,172 @@
+"""
+Executing stepper motor steps at precise times.
+
+Sleeping for the step time after each step (as BaseMotorDriver.step does) makes every step take longer than
+requested - by the sleep granularity and by the time the code between the sleeps takes - so the errors add up
+and the actual feed rate is lower than the configured one. Instead, each step is scheduled at an absolute
+deadline, measured from the beginning of the move: the executor sleeps until shortly before the deadline and
+busy-waits for the rest, so the errors don't accumulate.
+"""
+import math
+import time
+import typing
+
+from motor_driver.base import BaseMotorDriver
+from utils.typing import Numeric, typechecked
+
+
+# How long before a deadline the executor stops sleeping and starts busy-waiting (sleeping may take longer
+# than requested, by up to the scheduler granularity).
+DEFAULT_BUSY_WAIT_TIME = 0.002
+
+# How long the pulse signal is held up. Stepper motor drivers typically require a few microseconds.
+DEFAULT_PULSE_WIDTH = 0.000005
+
+
+class StepTimingStatistics(typing.NamedTuple):
+    """
+    How precisely the steps have been executed.
+
+    Lateness is how long after its deadline a step has been executed - its mean, standard deviation (jitter)
+    and maximum are in seconds.
+    """
+    num_steps: int
+    requested_time: float
+    actual_time: float
+    mean_lateness: float
+    lateness_stddev: float
+    max_lateness: float
+
+    @property
+    def requested_step_rate(self) -> float:
+        """
+        Steps per second, as requested.
+        """
+        return self.num_steps / self.requested_time if self.requested_time > 0 else 0.0
+
+    @property
+    def achieved_step_rate(self) -> float:
+        """
+        Steps per second, as executed.
+        """
+        return self.num_steps / self.actual_time if self.actual_time > 0 else 0.0
+
+
+class StepExecutor():
+    """
+    Executes sequences of steps (please refer to utils.steps_sequence) against absolute deadlines and collects
+    timing statistics over all the executed moves.
+    """
+    @typechecked
+    def __init__(
+            self,
+            busy_wait_time: Numeric = DEFAULT_BUSY_WAIT_TIME,
+            pulse_width: Numeric = DEFAULT_PULSE_WIDTH,
+            clock: typing.Callable[[], float] = time.perf_counter,
+            sleep: typing.Callable[[float], None] = time.sleep):
+        """
+        :param busy_wait_time: please refer to DEFAULT_BUSY_WAIT_TIME
+        :param pulse_width: please refer to DEFAULT_PULSE_WIDTH
+        :param clock: a monotonic clock, returning the time in seconds
+        :param sleep: a function sleeping for given number of seconds
+        """
+        self._busy_wait_time = busy_wait_time
+        self._pulse_width = pulse_width
+        self._clock = clock
+        self._sleep = sleep
+        self.reset_statistics()
+
+    @typechecked
+    def reset_statistics(self) -> None:
+        self._num_steps = 0
+        self._requested_time = 0.0
+        self._actual_time = 0.0
+        self._lateness_sum = 0.0
+        self._lateness_squares_sum = 0.0
+        self._max_lateness = 0.0
+
+    @property
+    @typechecked
+    def statistics(self) -> StepTimingStatistics:
+        """
+        The timing statistics of the steps executed since creation or since the last reset_statistics() call.
+        """
+        if self._num_steps == 0:
+            return StepTimingStatistics(0, self._requested_time, self._actual_time, 0.0, 0.0, 0.0)
+
+        mean_lateness = self._lateness_sum / self._num_steps
+        variance = max(0.0, self._lateness_squares_sum / self._num_steps - mean_lateness ** 2)
+        return StepTimingStatistics(
+            num_steps=self._num_steps,
+            requested_time=self._requested_time,
+            actual_time=self._actual_time,
+            mean_lateness=mean_lateness,
+            lateness_stddev=math.sqrt(variance),
+            max_lateness=self._max_lateness,
+        )
+
+    @typechecked
+    def execute(
+            self,
+            steps: typing.Iterable[typing.Any],
+            total_time: Numeric,
+            motors: typing.Dict[str, BaseMotorDriver],
+            time_at: typing.Optional[typing.Callable[[float], float]] = None) -> None:
+        """
+        Executes a move: the steps, and then waits until the move time passes.
+
+        :param steps: (time, axis) tuples, ordered by time, the time being a fraction of the move time
+            (please refer to utils.steps_sequence.iterate_xyz_steps)
+        :param total_time: how long the move should take, in seconds
+        :param motors: the motor drivers of the axes
+        :param time_at: maps the step times to seconds from the beginning of the move, if the move isn't
+            executed at a constant speed (please refer to motion_planner.PlannedMove.time_at) - by default,
+            the step times are multiplied by total_time
+        """
+        clock = self._clock
+        pulse_width = self._pulse_width
+        wait_until = self._wait_until
+
+        lateness_sum = 0.0
+        lateness_squares_sum = 0.0
+        max_lateness = self._max_lateness
+        num_steps = 0
+
+        start_time = clock()
+        for event_time, axis in steps:
+            if time_at is None:
+                deadline = start_time + event_time * total_time
+            else:
+                deadline = start_time + time_at(event_time)
+            wait_until(deadline)
+
+            lateness = clock() - deadline
+            lateness_sum += lateness
+            lateness_squares_sum += lateness * lateness
+            if lateness > max_lateness:
+                max_lateness = lateness
+            num_steps += 1
+
+            motor = motors[axis]
+            motor.signal_pul_up()
+            pulse_end = clock() + pulse_width
+            while clock() < pulse_end:
+                pass
+            motor.signal_pul_down()
+
+        wait_until(start_time + total_time)
+
+        self._num_steps += num_steps
+        self._requested_time += total_time
+        self._actual_time += clock() - start_time
+        self._lateness_sum += lateness_sum
+        self._lateness_squares_sum += lateness_squares_sum
+        self._max_lateness = max_lateness
+
+    def _wait_until(self, deadline: float) -> None:
+        remaining = deadline - self._clock()
+        if remaining > self._busy_wait_time:
+            self._sleep(remaining - self._busy_wait_time)
+
+        while self._clock() < deadline:
+            pass
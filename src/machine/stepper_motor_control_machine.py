@@ -1,11 +1,13 @@
 import math
+import typing
 
-from machine.base import BaseMachine
+from machine.base import BaseMachine, DEFAULT_ARC_TOLERANCE
+from machine.step_executor import StepExecutor, StepTimingStatistics
+from motion_planner import MotionPlanner, PlannedMove
 from motor_driver.base import BaseMotorDriver
-from utils.steps_sequence import create_xyz_steps_sequence
-from utils.typing import Numeric
+from utils.steps_sequence import iterate_xyz_steps
+from utils.typing import MoveRows, Numeric, typechecked
 from exceptions import MachineCommunicationException
-from typeguard import typechecked
 
 
 class MachineAxis:
@@ -120,13 +122,26 @@ class StepperMotorControlMachine(BaseMachine):
             y_axis: MachineAxis,
             z_axis: MachineAxis,
             default_feed_rate: Numeric,
-            rapid_move_feed_rate: Numeric):
+            rapid_move_feed_rate: Numeric,
+            arc_tolerance: Numeric = DEFAULT_ARC_TOLERANCE,
+            step_executor: typing.Optional[StepExecutor] = None,
+            motion_planner: typing.Optional[MotionPlanner] = None):
+        """
+        :param step_executor: executes the steps of the moves at the right times (please refer to
+            StepExecutor) - by default, a StepExecutor with the default parameters
+        :param motion_planner: if given, the moves are accelerated and decelerated as planned by it, instead of
+            being executed at the full feed rate from start to end. The moves are then executed as they are
+            finalized by the planner, and the rest of them on flush()
+        """
         self._x_axis = x_axis
         self._y_axis = y_axis
         self._z_axis = z_axis
         self._initialized = False
         self._default_feed_rate = default_feed_rate
         self._rapid_move_feed_rate = rapid_move_feed_rate
+        self._arc_tolerance = arc_tolerance
+        self._step_executor = StepExecutor() if step_executor is None else step_executor
+        self._motion_planner = motion_planner
 
     @typechecked
     def initialize(self) -> None:
@@ -137,13 +152,41 @@ class StepperMotorControlMachine(BaseMachine):
 
     @typechecked
     def flush(self) -> None:
-        pass
+        if self._motion_planner is not None:
+            self._execute_planned_moves(self._motion_planner.flush())
 
     @typechecked
     def move_by(self, x: Numeric, y: Numeric, z: Numeric, feed_rate: Numeric) -> None:
         if not self._initialized:
             raise MachineCommunicationException("Uninitialized machine")
 
+        if self._motion_planner is not None:
+            self._execute_planned_moves(self._motion_planner.add(x, y, z, feed_rate))
+        else:
+            self._move_by(x, y, z, feed_rate)
+
+    @typechecked
+    def move_by_many(self, moves: MoveRows) -> None:
+        if not self._initialized:
+            raise MachineCommunicationException("Uninitialized machine")
+
+        if self._motion_planner is not None:
+            self._execute_planned_moves(self._motion_planner.add_many(moves))
+        else:
+            for x, y, z, feed_rate in moves:
+                self._move_by(x, y, z, feed_rate)
+
+    def _execute_planned_moves(self, planned_moves: typing.List[PlannedMove]) -> None:
+        for planned_move in planned_moves:
+            self._move_by(planned_move.x, planned_move.y, planned_move.z, planned_move.feed_rate, planned_move)
+
+    def _move_by(
+            self,
+            x: Numeric,
+            y: Numeric,
+            z: Numeric,
+            feed_rate: Numeric,
+            planned_move: typing.Optional[PlannedMove] = None) -> None:
         self._compensate_for_backlash(x, y, z)
 
         x_steps = self._x_axis.steps_needed_to_move_by(x)
@@ -157,7 +200,12 @@ class StepperMotorControlMachine(BaseMachine):
             (x_steps / self._x_axis.steps_per_mm(1)) ** 2 +
             (y_steps / self._y_axis.steps_per_mm(1)) ** 2 +
             (z_steps / self._z_axis.steps_per_mm(1)) ** 2)  # move length in mm
-        total_time = 60.0 * length / feed_rate  # speed is in mm/min
+        if planned_move is None:
+            total_time = 60.0 * length / feed_rate  # speed is in mm/min
+            time_at = None
+        else:
+            total_time = planned_move.duration
+            time_at = planned_move.time_at
 
         if x_steps < 0:
             x_steps = abs(x_steps)
@@ -180,25 +228,29 @@ class StepperMotorControlMachine(BaseMachine):
         assert self._x_axis.step_time == self._y_axis.step_time
         assert self._y_axis.step_time == self._z_axis.step_time
 
-        steps_sequence = create_xyz_steps_sequence(
-            x_steps,
-            y_steps,
-            z_steps,
+        self._step_executor.execute(
+            iterate_xyz_steps(x_steps, y_steps, z_steps),
+            total_time,
+            {
+                'X': self._x_axis.motor,
+                'Y': self._y_axis.motor,
+                'Z': self._z_axis.motor,
+            },
+            time_at,
         )
-        step_time = total_time / len(steps_sequence)
-
-        for event_time, axis in steps_sequence:
-            motor = None
-            if axis == 'X':
-                motor = self._x_axis.motor
-            elif axis == 'Y':
-                motor = self._y_axis.motor
-            elif axis == 'Z':
-                motor = self._z_axis.motor
-            else:
-                assert(False)
-
-            motor.step(step_time)
+
+    @property
+    @typechecked
+    def step_timing_statistics(self) -> StepTimingStatistics:
+        """
+        How precisely the steps of the moves have been executed (please refer to StepExecutor).
+        """
+        return self._step_executor.statistics
+
+    @property
+    @typechecked
+    def arc_tolerance(self) -> Numeric:
+        return self._arc_tolerance
 
     @property
     @typechecked
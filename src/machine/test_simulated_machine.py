@@ -0,0 +1,94 @@
+from unittest import TestCase
+
+from machine.simulated_machine import SimulatedMachine, SimulatedMoves, is_default_feed_rate
+
+
+class SimulatedMachineTestCase(TestCase):
+    MOVES = [
+        (1, 2, 3, 1),
+        (-1, 0.5, 0, 10),
+        (0, 0, -3, 5),
+    ]
+
+    def test_move_by_many(self):
+        reference_machine = SimulatedMachine()
+        for move in self.MOVES:
+            reference_machine.move_by(*move)
+
+        machine = SimulatedMachine()
+        machine.move_by_many(self.MOVES)
+
+        self.assertEqual(machine.simulated_moves, reference_machine.simulated_moves)
+        self.assertEqual(
+            machine.simulated_moves,
+            [(0, 0, 0, False), (1, 2, 3, False), (0, 2.5, 3, False), (0, 2.5, 0, False)],
+        )
+
+    def test_rapid_moves(self):
+        # The feed rates equal to the simulated default and rapid move feed rates don't make the moves rapid.
+        machine = SimulatedMachine()
+        machine.set_rapid_moves(True)
+        machine.move_by(1, 0, 0, 5)
+        machine.move_by_many([(0, 1, 0, 5)])
+        machine.set_rapid_moves(False)
+        machine.move_by(0, 0, 1, machine.rapid_move_feed_rate)
+        machine.move_by_many([(1, 0, 0, 1)])
+
+        self.assertEqual(
+            machine.simulated_moves,
+            [(0, 0, 0, False), (1, 0, 0, True), (1, 1, 0, True), (1, 1, 1, False), (2, 1, 1, False)],
+        )
+
+    def test_default_feed_rate(self):
+        machine = SimulatedMachine()
+        machine.move_by(1, 0, 0, machine.default_feed_rate)
+        machine.move_by(1, 0, 0, 1)
+
+        x, y, z, rapid, feed_rate = machine.simulated_moves.columns
+        with x, y, z, rapid, feed_rate:
+            self.assertEqual([is_default_feed_rate(value) for value in feed_rate], [False, True, False])
+
+    def test_simulated_moves_is_a_view(self):
+        machine = SimulatedMachine()
+        simulated_moves = machine.simulated_moves
+        machine.set_rapid_moves(True)
+        machine.move_by(1, 2, 3, 10)
+
+        self.assertEqual(len(simulated_moves), 2)
+        self.assertEqual(simulated_moves[-1], (1, 2, 3, True))
+        self.assertEqual(simulated_moves[:1], [(0, 0, 0, False)])
+
+    def test_columns(self):
+        machine = SimulatedMachine()
+        machine.move_by_many(self.MOVES)
+
+        x, y, z, rapid, feed_rate = machine.simulated_moves.columns
+        self.assertEqual(x.tolist(), [0, 1, 0, 0])
+        self.assertEqual(y.tolist(), [0, 2, 2.5, 2.5])
+        self.assertEqual(z.tolist(), [0, 3, 3, 0])
+        self.assertEqual(rapid.tolist(), [0, 0, 0, 0])
+        self.assertEqual(feed_rate.tolist(), [0, 1, 10, 5])
+
+    def test_dwell_time(self):
+        machine = SimulatedMachine()
+        machine.dwell(1.5)
+        machine.dwell(2)
+
+        self.assertEqual(machine.simulated_moves.dwell_time, 3.5)
+
+
+class SimulatedMovesTestCase(TestCase):
+    def test_extend(self):
+        rows = [(1, 2, 3, False, 100), (4, 5, 6, True, 200)]
+
+        reference_moves = SimulatedMoves()
+        for row in rows:
+            reference_moves.append(*row)
+
+        moves = SimulatedMoves()
+        moves.extend(iter(rows))
+
+        self.assertEqual(moves, reference_moves)
+        self.assertEqual([column.tolist() for column in moves.columns], [
+            [1, 4], [2, 5], [3, 6], [0, 1], [100, 200],
+        ])
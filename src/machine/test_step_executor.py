@@ -0,0 +1,80 @@
+import math
+from unittest import TestCase
+
+from machine.step_executor import StepExecutor
+from motor_driver.base import BaseMotorDriver
+
+
+class FakeClock():
+    """
+    A clock that advances by a microsecond on each reading, and by the requested time when sleeping.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        self.now += 0.000001
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RecordingMotorDriver(BaseMotorDriver):
+    def __init__(self, name, clock, events):
+        self._name = name
+        self._clock = clock
+        self._events = events
+
+    def signal_pul_up(self):
+        self._events.append((self._clock.now, self._name, 'up'))
+
+    def signal_pul_down(self):
+        self._events.append((self._clock.now, self._name, 'down'))
+
+
+class StepExecutorTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.events = []
+        self.motors = {axis: RecordingMotorDriver(axis, self.clock, self.events) for axis in 'XY'}
+        self.executor = StepExecutor(
+            busy_wait_time=0.002, pulse_width=0.00001, clock=self.clock.clock, sleep=self.clock.sleep)
+
+    def test_steps_at_deadlines(self):
+        self.executor.execute([(0.0, 'X'), (0.0, 'Y'), (0.5, 'X')], 0.1, self.motors)
+
+        self.assertEqual([(axis, kind) for unused_time, axis, kind in self.events], [
+            ('X', 'up'), ('X', 'down'), ('Y', 'up'), ('Y', 'down'), ('X', 'up'), ('X', 'down')])
+
+        # The step at 0.05 s is executed on time, after sleeping until shortly before it.
+        self.assertAlmostEqual(self.events[4][0], 0.05, delta=0.00001)
+        self.assertTrue(any(sleep > 0.04 for sleep in self.clock.sleeps))
+
+        # The pulses are held up for the pulse width.
+        self.assertGreaterEqual(self.events[1][0] - self.events[0][0], 0.00001)
+
+    def test_statistics(self):
+        self.executor.execute([(0.0, 'X'), (0.5, 'X')], 0.1, self.motors)
+        self.executor.execute([(0.0, 'Y')], 0.1, self.motors)
+
+        statistics = self.executor.statistics
+        self.assertEqual(statistics.num_steps, 3)
+        self.assertAlmostEqual(statistics.requested_time, 0.2)
+        self.assertAlmostEqual(statistics.actual_time, 0.2, delta=0.0001)
+        self.assertAlmostEqual(statistics.requested_step_rate, 15)
+        self.assertAlmostEqual(statistics.achieved_step_rate, 15, delta=0.01)
+        self.assertLess(statistics.max_lateness, 0.0001)
+        self.assertLessEqual(statistics.lateness_stddev, statistics.max_lateness)
+
+        self.executor.reset_statistics()
+        self.assertEqual(self.executor.statistics.num_steps, 0)
+
+    def test_variable_speed(self):
+        # The move accelerates, so the second half of it takes less time than the first one.
+        self.executor.execute([(0.0, 'X'), (0.5, 'X')], 0.1, self.motors, lambda fraction: 0.1 * math.sqrt(fraction))
+
+        self.assertAlmostEqual(self.events[2][0], 0.1 * math.sqrt(0.5), delta=0.00001)
+        self.assertAlmostEqual(self.executor.statistics.actual_time, 0.1, delta=0.0001)
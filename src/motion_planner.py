@@ -0,0 +1,327 @@
+"""
+A motion planner, that limits the acceleration of the tool.
+
+Without it, every move starts and ends at its full feed rate, which requires infinite acceleration - so the
+feed rates have to be low enough for the motors not to lose steps. The planner computes, for each move,
+the speed it should be entered and exited with, so that:
+
+- the acceleration never exceeds given limit - the speed changes linearly within a move (a trapezoidal profile:
+  accelerating, cruising at the feed rate and decelerating),
+- at the junctions between moves, the speed is limited depending on the angle between them (junction deviation,
+  as in grbl: the speed at which the tool could follow a circle with the given deviation from the corner),
+  so that collinear moves are executed without slowing down and sharp corners slowly,
+- the machine is able to stop at the end of the moves it knows about - as the moves arrive one by one,
+  the planner looks ahead over a window of the most recent moves and finalizes only the older ones.
+
+Feed rates are in mm/min (as passed to BaseMachine.move_by), speeds in mm/s and accelerations in mm/s^2.
+"""
+import math
+import typing
+
+from utils.typing import MoveRows, Numeric, typechecked
+
+
+# The default maximum deviation (in millimeters) of the path the tool would take through a junction at the
+# junction speed from the actual corner.
+DEFAULT_JUNCTION_DEVIATION = 0.01
+
+# Moves with a smaller angle between them (in terms of the cosine of the angle between the directions) are
+# considered collinear, as the formula for the junction speed is numerically unstable for such angles.
+COLLINEAR_COSINE_THRESHOLD = 0.999999
+
+
+class PlannedMove(typing.NamedTuple):
+    """
+    A move, with its speed profile planned: the speed changes linearly (with the acceleration the planner
+    has been configured with) from entry_speed to cruise_speed, stays at cruise_speed and then changes
+    linearly to exit_speed.
+    """
+    x: float
+    y: float
+    z: float
+    feed_rate: float
+    length: float
+    acceleration: float
+    entry_speed: float
+    cruise_speed: float
+    exit_speed: float
+
+    @property
+    def acceleration_distance(self) -> float:
+        return (self.cruise_speed ** 2 - self.entry_speed ** 2) / (2 * self.acceleration)
+
+    @property
+    def deceleration_distance(self) -> float:
+        return (self.cruise_speed ** 2 - self.exit_speed ** 2) / (2 * self.acceleration)
+
+    @property
+    def cruise_distance(self) -> float:
+        return max(0.0, self.length - self.acceleration_distance - self.deceleration_distance)
+
+    @property
+    def duration(self) -> float:
+        """
+        How long the move takes, in seconds.
+        """
+        if self.cruise_speed <= 0:
+            return 0.0
+
+        return (
+            (self.cruise_speed - self.entry_speed) / self.acceleration +
+            self.cruise_distance / self.cruise_speed +
+            (self.cruise_speed - self.exit_speed) / self.acceleration
+        )
+
+    def time_at(self, fraction: float) -> float:
+        """
+        Returns when (in seconds from the beginning of the move) given fraction of the move length is reached.
+        """
+        distance = fraction * self.length
+        acceleration_distance = self.acceleration_distance
+        cruise_end_distance = self.length - self.deceleration_distance
+
+        if distance <= acceleration_distance:
+            speed = math.sqrt(self.entry_speed ** 2 + 2 * self.acceleration * distance)
+            return (speed - self.entry_speed) / self.acceleration
+
+        acceleration_time = (self.cruise_speed - self.entry_speed) / self.acceleration
+        if distance <= cruise_end_distance:
+            return acceleration_time + (distance - acceleration_distance) / self.cruise_speed
+
+        cruise_time = self.cruise_distance / self.cruise_speed
+        speed = math.sqrt(max(0.0, self.cruise_speed ** 2 - 2 * self.acceleration * (distance - cruise_end_distance)))
+        return acceleration_time + cruise_time + (self.cruise_speed - speed) / self.acceleration
+
+
+@typechecked
+def split_into_ramps(
+        planned_move: PlannedMove,
+        max_speed_ratio: Numeric,
+        min_speed: Numeric) -> typing.List[typing.Tuple[float, float, float]]:
+    """
+    Splits a planned move into consecutive parts, in each of them the speed changing monotonically from its entry
+    speed to its exit speed - by at most max_speed_ratio times - so that a machine that is only able to change
+    the speed within a part in a simple way (e.g. linearly) follows the planned profile closely.
+
+    :param min_speed: the lowest speed (in mm/s) a machine is able to move with - lower planned speeds are raised
+        to it, e.g. the moves start and end at it instead of zero
+    :return: (distance in millimeters, entry speed, exit speed) tuples
+    """
+    if max_speed_ratio <= 1:
+        raise ValueError("Maximum speed ratio should be greater than 1, not %s" % max_speed_ratio)
+    if min_speed <= 0:
+        raise ValueError("Minimum speed should be positive, not %s" % min_speed)
+
+    phases = [
+        (planned_move.acceleration_distance, planned_move.entry_speed, planned_move.cruise_speed),
+        (planned_move.cruise_distance, planned_move.cruise_speed, planned_move.cruise_speed),
+        (planned_move.deceleration_distance, planned_move.cruise_speed, planned_move.exit_speed),
+    ]
+
+    ramps = []
+    for distance, entry_speed, exit_speed in phases:
+        if distance <= 0:
+            continue
+
+        entry_speed = max(entry_speed, min_speed)
+        exit_speed = max(exit_speed, min_speed)
+        if entry_speed == exit_speed:
+            ramps.append((distance, entry_speed, exit_speed))
+            continue
+
+        # The speeds at the boundaries of the parts grow (or fall) geometrically, and the distances are
+        # those that the constant acceleration takes to change the speed.
+        speed_ratio = max(entry_speed, exit_speed) / min(entry_speed, exit_speed)
+        num_parts = max(1, math.ceil(math.log(speed_ratio) / math.log(max_speed_ratio) - 1e-9))
+        speeds = [entry_speed * (exit_speed / entry_speed) ** (i / num_parts) for i in range(num_parts)]
+        speeds.append(exit_speed)
+
+        for part_entry_speed, part_exit_speed in zip(speeds, speeds[1:]):
+            part_distance = distance * (part_exit_speed ** 2 - part_entry_speed ** 2) / (
+                exit_speed ** 2 - entry_speed ** 2)
+            ramps.append((part_distance, part_entry_speed, part_exit_speed))
+
+    return ramps
+
+
+class _PlannerMove():
+    """
+    A move in the lookahead window, whose speeds may still change.
+    """
+    __slots__ = ['x', 'y', 'z', 'feed_rate', 'length', 'unit_vector', 'nominal_speed', 'max_entry_speed',
+                 'entry_speed']
+
+    def __init__(self, x, y, z, feed_rate, length):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.feed_rate = feed_rate
+        self.length = length
+        self.unit_vector = (x / length, y / length, z / length)
+        self.nominal_speed = feed_rate / 60.0
+        self.max_entry_speed = 0.0
+        self.entry_speed = 0.0
+
+
+class MotionPlanner():
+    """
+    Plans the speed profiles of a stream of moves (please refer to the module docstring).
+
+    The moves are added with add() or add_many(), that return the moves that have been finalized - so that they
+    can be sent to a machine - and flush() finalizes the rest, with the last one ending at zero speed.
+    """
+    @typechecked
+    def __init__(
+            self,
+            acceleration: Numeric,
+            junction_deviation: Numeric = DEFAULT_JUNCTION_DEVIATION,
+            lookahead_window: int = 32):
+        """
+        :param acceleration: the maximum acceleration, in mm/s^2
+        :param junction_deviation: please refer to DEFAULT_JUNCTION_DEVIATION
+        :param lookahead_window: how many most recent moves are kept to be planned, before being finalized
+        """
+        if acceleration <= 0:
+            raise ValueError("Acceleration should be positive, not %s" % acceleration)
+        if lookahead_window < 1:
+            raise ValueError("Lookahead window should be positive, not %d" % lookahead_window)
+
+        self._acceleration = acceleration
+        self._junction_deviation = junction_deviation
+        self._lookahead_window = lookahead_window
+        self._moves = []
+        # The unit vector and the nominal speed of the last move that has been finalized, to limit the speed
+        # at its junction with the first move in the window (whose entry speed is already fixed).
+        self._previous_unit_vector = None
+        self._previous_nominal_speed = 0.0
+
+    @property
+    @typechecked
+    def acceleration(self) -> Numeric:
+        return self._acceleration
+
+    @typechecked
+    def add(self, x: Numeric, y: Numeric, z: Numeric, feed_rate: Numeric) -> typing.List[PlannedMove]:
+        """
+        Adds a move (a vector in millimeters and a feed rate in mm/min) and returns the moves that have been
+        finalized. Moves of zero length are ignored.
+        """
+        return self.add_many([(x, y, z, feed_rate)])
+
+    @typechecked
+    def add_many(self, moves: MoveRows) -> typing.List[PlannedMove]:
+        """
+        Adds (x, y, z, feed rate) moves and returns the moves that have been finalized.
+        """
+        for x, y, z, feed_rate in moves:
+            length = math.sqrt(x * x + y * y + z * z)
+            if length == 0 or feed_rate <= 0:
+                continue
+
+            move = _PlannerMove(x, y, z, feed_rate, length)
+            if self._moves:
+                previous = self._moves[-1]
+                move.max_entry_speed = self._junction_speed(
+                    previous.unit_vector, previous.nominal_speed, move.unit_vector, move.nominal_speed)
+            elif self._previous_unit_vector is not None:
+                move.max_entry_speed = self._junction_speed(
+                    self._previous_unit_vector, self._previous_nominal_speed, move.unit_vector, move.nominal_speed)
+            self._moves.append(move)
+
+        if len(self._moves) <= self._lookahead_window:
+            return []
+
+        self._plan()
+        return self._finalize(len(self._moves) - self._lookahead_window)
+
+    @typechecked
+    def flush(self) -> typing.List[PlannedMove]:
+        """
+        Finalizes all the moves, so that the last one ends at zero speed, and returns them.
+        """
+        self._plan()
+        moves = self._finalize(len(self._moves))
+        self._previous_unit_vector = None
+        self._previous_nominal_speed = 0.0
+        return moves
+
+    def _junction_speed(
+            self,
+            previous_unit_vector: typing.Tuple[float, float, float],
+            previous_nominal_speed: float,
+            unit_vector: typing.Tuple[float, float, float],
+            nominal_speed: float) -> float:
+        """
+        The maximum speed at the junction between two moves.
+        """
+        max_speed = min(previous_nominal_speed, nominal_speed)
+
+        # The cosine of the angle between the moves, not between the directions (so -1 means straight line).
+        cos_theta = -sum(a * b for a, b in zip(previous_unit_vector, unit_vector))
+        if cos_theta <= -COLLINEAR_COSINE_THRESHOLD:
+            return max_speed
+        if cos_theta >= COLLINEAR_COSINE_THRESHOLD:
+            # The tool turns back.
+            return 0.0
+
+        sin_theta_d2 = math.sqrt(0.5 * (1.0 - cos_theta))
+        junction_speed_squared = self._acceleration * self._junction_deviation * sin_theta_d2 / (1.0 - sin_theta_d2)
+        return min(max_speed, math.sqrt(junction_speed_squared))
+
+    def _plan(self) -> None:
+        """
+        Computes the entry speeds of the moves in the window: the backward pass makes sure that each move can
+        decelerate to the entry speed of the next one (and the last one - to zero), and the forward pass that
+        each move can accelerate to the entry speed of the next one.
+        """
+        moves = self._moves
+        acceleration = self._acceleration
+        if not moves:
+            return
+
+        next_entry_speed = 0.0
+        for move in reversed(moves[1:]):
+            move.entry_speed = min(
+                move.max_entry_speed,
+                math.sqrt(next_entry_speed ** 2 + 2 * acceleration * move.length),
+            )
+            next_entry_speed = move.entry_speed
+
+        # The entry speed of the first move has been fixed when the previous move was finalized.
+        for move, next_move in zip(moves, moves[1:]):
+            next_move.entry_speed = min(
+                next_move.entry_speed,
+                math.sqrt(move.entry_speed ** 2 + 2 * acceleration * move.length),
+            )
+
+    def _finalize(self, num_moves: int) -> typing.List[PlannedMove]:
+        acceleration = self._acceleration
+        finalized = []
+        for i in range(num_moves):
+            move = self._moves[i]
+            exit_speed = self._moves[i + 1].entry_speed if i + 1 < len(self._moves) else 0.0
+            cruise_speed = min(
+                move.nominal_speed,
+                math.sqrt((2 * acceleration * move.length + move.entry_speed ** 2 + exit_speed ** 2) / 2),
+            )
+            # Rounding errors may make the cruise speed slightly lower than one of the boundary speeds.
+            cruise_speed = max(cruise_speed, move.entry_speed, exit_speed)
+
+            finalized.append(PlannedMove(
+                x=move.x,
+                y=move.y,
+                z=move.z,
+                feed_rate=move.feed_rate,
+                length=move.length,
+                acceleration=acceleration,
+                entry_speed=move.entry_speed,
+                cruise_speed=cruise_speed,
+                exit_speed=exit_speed,
+            ))
+
+        if num_moves > 0:
+            last = self._moves[num_moves - 1]
+            self._previous_unit_vector = last.unit_vector
+            self._previous_nominal_speed = last.nominal_speed
+        del self._moves[:num_moves]
+        return finalized
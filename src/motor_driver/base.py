@@ -1,9 +1,7 @@
 from abc import ABC
 import time
 
-from typeguard import typechecked
-
-from utils.typing import Numeric
+from utils.typing import Numeric, typechecked
 
 
 class BaseMotorDriver(ABC):
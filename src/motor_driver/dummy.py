@@ -1,6 +1,4 @@
-from typeguard import typechecked
-
-from utils.typing import Numeric
+from utils.typing import Numeric, typechecked
 from motor_driver.base import BaseMotorDriver
 
 
@@ -1,9 +1,9 @@
 import typing
 
 import RPi.GPIO
-from typeguard import typechecked
 
 from src.motor_driver.base import BaseMotorDriver
+from utils.typing import typechecked
 
 
 class RaspberryPiGPIOMotorDriver(BaseMotorDriver):
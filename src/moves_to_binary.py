@@ -0,0 +1,48 @@
+"""
+A binary encoding of simulated moves, that can be loaded by the front-end directly into a three.js BufferGeometry,
+without parsing JSON.
+
+The payload consists of:
+
+- a header: MOVES_BINARY_MAGIC, the format version and the number of moves (MOVES_BINARY_HEADER_STRUCT),
+- the positions: three little-endian float32 values (x, y, z) per move,
+- the rapid move flags: one byte per move (1 if the move was a rapid move, 0 if milling).
+
+The header size is a multiple of 4, so that the positions may be viewed as a Float32Array without copying.
+"""
+from array import array
+import struct
+import sys
+
+from machine.simulated_machine import SimulatedMoves
+from utils.typing import typechecked
+
+
+MOVES_BINARY_MAGIC = b'CNCM'
+MOVES_BINARY_VERSION = 1
+MOVES_BINARY_HEADER_STRUCT = struct.Struct('<4sII')
+MOVES_BINARY_CONTENT_TYPE = 'application/octet-stream'
+
+
+@typechecked
+def moves_to_binary(moves: SimulatedMoves) -> bytes:
+    """
+    Encodes simulated moves (e.g. SimulatedMachine.simulated_moves) in the format described in the module docstring.
+    """
+    num_moves = len(moves)
+    x, y, z, rapid, unused_feed_rate = moves.columns
+    with x, y, z, rapid, unused_feed_rate:
+        positions = array('f', bytes(3 * 4 * num_moves))
+        positions[0::3] = array('f', x)
+        positions[1::3] = array('f', y)
+        positions[2::3] = array('f', z)
+        rapid_flags = rapid.tobytes()
+
+    if sys.byteorder != 'little':
+        positions.byteswap()
+
+    return b''.join([
+        MOVES_BINARY_HEADER_STRUCT.pack(MOVES_BINARY_MAGIC, MOVES_BINARY_VERSION, num_moves),
+        positions.tobytes(),
+        rapid_flags,
+    ])
@@ -1,106 +1,127 @@
+import io
 import math
-import svgwrite
 import typing
 
-from typeguard import typechecked
+from utils.typing import Numeric, typechecked
 
-from utils.random import random_token
-from utils.typing import Numeric
+
+# How many moves are converted to the path data at once, before being written to the stream.
+PATH_DATA_CHUNK_NUM_MOVES = 1024
 
 
 @typechecked
-def line_id_to_stroke(line_id: int) -> svgwrite.rgb:
+def line_id_to_stroke(line_id: int) -> str:
     """
     Depending on the line identifier, use red or gray color. This allows us to have a grid,
     where every tenth line is red.
     """
     if line_id % 10 == 0:
-        return svgwrite.rgb(50, 0, 0, '%')
+        return 'rgb(50%,0%,0%)'
     else:
-        return svgwrite.rgb(70, 70, 70, '%')
+        return 'rgb(70%,70%,70%)'
 
 
 @typechecked
-def moves_to_svg(
-        moves: typing.List[typing.Tuple[Numeric, Numeric, Numeric]],
+def write_svg(
+        moves: typing.Sequence[typing.Any],
+        stream: typing.TextIO,
         tool_diameter: Numeric,
-        pixels_per_mm: Numeric = 20) -> str:
+        pixels_per_mm: Numeric = 20) -> None:
     """
-    Renders a list of tool moves (a sequence of (x, y, z) positions) as a SVG file and returns its path.
+    Renders a sequence of tool moves as SVG, writing it to a text stream incrementally.
 
-    :param moves: moves to be rendered
+    The tool path is drawn as a single path (with round joins and caps, so that the turning points are
+    drawn as circles with the tool diameter), and the move direction as another one on top of it.
+
+    :param moves: moves to be rendered - (x, y, z, ...) positions, e.g. SimulatedMachine.simulated_moves
+    :param stream: the stream to write to
     :param tool_diameter: the tool diameter is used as the line width when rendering
     :param pixels_per_mm: the scale of the image (how many pixels should one millimeter take)
-
-    :return: SVG file path
     """
-    # hide Z axis
-    moves = [(x, y) for (x, y, _) in moves]
-
-    @typechecked
-    def scale_position(position: typing.Tuple[Numeric, Numeric]) -> typing.Tuple[Numeric, Numeric]:
-        x, y = position
-        return (pixels_per_mm * x, pixels_per_mm * y)
+    # The Z axis is hidden, so only the X and Y coordinates are needed.
+    min_x = max_x = moves[0][0] * pixels_per_mm
+    min_y = max_y = moves[0][1] * pixels_per_mm
+    for move in moves:
+        x = move[0] * pixels_per_mm
+        y = move[1] * pixels_per_mm
+        if x < min_x:
+            min_x = x
+        elif x > max_x:
+            max_x = x
+        if y < min_y:
+            min_y = y
+        elif y > max_y:
+            max_y = y
 
     margin = pixels_per_mm * 2 * tool_diameter
 
-    moves = list(map(scale_position, moves))
-
-    min_x = min([x for (x, _) in moves])
-    max_x = max([x for (x, _) in moves])
-    min_y = min([y for (_, y) in moves])
-    max_y = max([y for (_, y) in moves])
-
-    last = moves[0]
-    token = random_token()
-    file_path = 'static/%s.svg' % token
-    dwg = svgwrite.Drawing(
-        file_path,
-        profile='tiny',
-    )
-
-    dwg.viewbox(
-        min_x - margin,
-        min_y - margin,
-        (max_x - min_x) + 2 * margin,
-        (max_y - min_y) + 2 * margin,
-    )
-
-    tool_move_fill_stroke = svgwrite.rgb(0, 0, 0, '%')
-    tool_move_direction_stroke = svgwrite.rgb(0, 0, 100, '%')
-
-    for turning_point in moves:
-        dwg.add(
-            dwg.circle(
-                center=turning_point,
-                r=tool_diameter * pixels_per_mm / 2.0,
-                fill=tool_move_fill_stroke))
-
-    for current in moves[1:]:
-        dwg.add(dwg.line(last, current, stroke=tool_move_fill_stroke, stroke_width=tool_diameter * pixels_per_mm))
-        dwg.add(dwg.line(last, current, stroke=tool_move_direction_stroke, stroke_width=3))
-        last = current
+    stream.write(
+        '<?xml version="1.0" encoding="utf-8" ?>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" width="100%%" height="100%%" '
+        'viewBox="%s,%s,%s,%s">' % (
+            _format(min_x - margin),
+            _format(min_y - margin),
+            _format((max_x - min_x) + 2 * margin),
+            _format((max_y - min_y) + 2 * margin),
+        ))
+
+    for stroke, stroke_width in [
+            ('rgb(0%,0%,0%)', tool_diameter * pixels_per_mm),
+            ('rgb(0%,0%,100%)', 3)]:
+        stream.write(
+            '<path fill="none" stroke="%s" stroke-width="%s" stroke-linecap="round" stroke-linejoin="round" d="' % (
+                stroke, _format(stroke_width)))
+        # The first point is repeated, so that a single move is drawn as a circle, too.
+        stream.write('M%s,%s L' % (_format(moves[0][0] * pixels_per_mm), _format(moves[0][1] * pixels_per_mm)))
+        for chunk_start in range(0, len(moves), PATH_DATA_CHUNK_NUM_MOVES):
+            stream.write(''.join([
+                ' %s,%s' % (_format(move[0] * pixels_per_mm), _format(move[1] * pixels_per_mm))
+                for move in moves[chunk_start:chunk_start + PATH_DATA_CHUNK_NUM_MOVES]
+            ]))
+        stream.write('" />')
 
     for line_id in range(math.floor(min_x / pixels_per_mm), math.ceil(max_x / pixels_per_mm) + 1):
-        stroke = line_id_to_stroke(line_id)
-
-        dwg.add(
-            dwg.line(
-                (line_id * pixels_per_mm, min_y),
-                (line_id * pixels_per_mm, max_y),
-                stroke=stroke))
+        stream.write('<line stroke="%s" x1="%s" x2="%s" y1="%s" y2="%s" />' % (
+            line_id_to_stroke(line_id),
+            _format(line_id * pixels_per_mm),
+            _format(line_id * pixels_per_mm),
+            _format(min_y),
+            _format(max_y),
+        ))
 
     for line_id in range(math.floor(min_y / pixels_per_mm), math.ceil(max_y / pixels_per_mm) + 1):
-        stroke = line_id_to_stroke(line_id)
+        stream.write('<line stroke="%s" x1="%s" x2="%s" y1="%s" y2="%s" />' % (
+            line_id_to_stroke(line_id),
+            _format(min_x),
+            _format(max_x),
+            _format(line_id * pixels_per_mm),
+            _format(line_id * pixels_per_mm),
+        ))
 
-        dwg.add(
-            dwg.line(
-                (min_x, line_id * pixels_per_mm),
-                (max_x, line_id * pixels_per_mm),
-                stroke=stroke))
+    stream.write('<circle cx="0" cy="0" fill="red" r="%s" />' % _format(0.5 * pixels_per_mm))
+    stream.write('</svg>\n')
 
-    dwg.add(dwg.circle(center=(0, 0), r=0.5 * pixels_per_mm, fill='red'))
 
-    dwg.save()
+@typechecked
+def moves_to_svg(
+        moves: typing.Sequence[typing.Any],
+        tool_diameter: Numeric,
+        pixels_per_mm: Numeric = 20) -> str:
+    """
+    Renders a sequence of tool moves as SVG and returns it.
 
-    return file_path
+    :param moves: moves to be rendered - (x, y, z, ...) positions, e.g. SimulatedMachine.simulated_moves
+    :param tool_diameter: the tool diameter is used as the line width when rendering
+    :param pixels_per_mm: the scale of the image (how many pixels should one millimeter take)
+    """
+    stream = io.StringIO()
+    write_svg(moves, stream, tool_diameter, pixels_per_mm)
+    return stream.getvalue()
+
+
+def _format(value: Numeric) -> str:
+    """
+    Formats a coordinate (in pixels) with a precision that is enough for the rendering.
+    """
+    result = ('%.2f' % value).rstrip('0').rstrip('.')
+    return '0' if result == '-0' else result
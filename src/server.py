@@ -1,25 +1,53 @@
 import os
+import threading
+import time
 import traceback
 
 from flask import (
     Flask,
+    Response,
 
+    abort,
     jsonify,
     render_template,
     request,
     send_from_directory,
 )
-from typeguard import typechecked
 
-import gcode_interpreter
-import machine.simulated_machine
+import config
+import cycle_time_estimator
 import worker_process
+import moves_to_binary
 import moves_to_svg
+import simulation_cache
+import svg_store
 
 from utils import python_to_gcode
+from utils.typing import typechecked
 
 app = Flask(__name__, static_url_path='')
 machine_worker_process = worker_process.WorkerProcess.create_and_start()
+# Shared by all the simulation endpoints, so that e.g. rendering a program as SVG after simulating it
+# doesn't simulate it again.
+simulated_moves_cache = simulation_cache.SimulationCache(
+    max_entries=config.SIMULATION_CACHE_SIZE,
+    directory=config.SIMULATION_CACHE_DIRECTORY,
+)
+rendered_svg_store = svg_store.SvgStore(max_bytes=config.SVG_STORE_MAX_BYTES, ttl=config.SVG_STORE_TTL)
+
+
+def remove_stale_svg_files_periodically():
+    """
+    Older versions rendered the SVGs to files in the static directory and never removed them - remove them
+    when they get old.
+    """
+    while True:
+        for directory in {'static', app.static_folder}:
+            svg_store.remove_stale_svg_files(directory, config.STALE_SVG_FILES_MAX_AGE)
+        time.sleep(config.STALE_SVG_FILES_CHECK_INTERVAL)
+
+
+threading.Thread(target=remove_stale_svg_files_periodically, daemon=True).start()
 
 
 @app.route("/")
@@ -72,40 +100,148 @@ def endpoint_api_simulate_moves_json():
     input_text = request.json['pygcode']
 
     try:
-        simulated_machine = machine.simulated_machine.SimulatedMachine()
-        interpreter = gcode_interpreter.GCodeInterpreter(simulated_machine)
-        interpreter.run_gcode_string(python_to_gcode.python_to_gcode(input_text))
-        moves = simulated_machine.simulated_moves
+        moves = simulated_moves_cache.get_or_simulate(
+            input_text, simplification_tolerance=config.GCODE_SIMPLIFICATION_TOLERANCE)
 
         return jsonify({
             'status': "OK",
-            'moves': moves,
+            'moves': list(moves),
         })
     except Exception as e:
         traceback.print_exc()
         return jsonify({'status': "ERROR", 'message': repr(e)})
 
 
+@app.route("/api/simulate/binary/", methods=["POST"])
+def endpoint_api_simulate_moves_binary():
+    """
+    Serves an API endpoint, simulating G-code moves to the binary format described in moves_to_binary.
+
+    If the 'level' parameter is set, the given level of detail (please refer to level_of_detail) is returned,
+    0 being the coarsest one. The number of levels is returned in the X-Levels-Of-Detail header, the last level
+    being the full toolpath - so that the client can fetch the coarse levels first and then refine them.
+    A level out of that range is rejected with 400.
+
+    Errors are returned as JSON, as in the other endpoints.
+    """
+    input_text = request.json['pygcode']
+    level = request.json.get('level')
+
+    try:
+        levels = simulated_moves_cache.get_or_simulate_levels_of_detail(
+            input_text, simplification_tolerance=config.GCODE_SIMPLIFICATION_TOLERANCE)
+
+        if level is None:
+            level = len(levels) - 1
+        elif isinstance(level, bool) or not isinstance(level, int) or not 0 <= level < len(levels):
+            return jsonify({
+                'status': "ERROR",
+                'message': "Invalid level of detail: %r (there are %d levels)" % (level, len(levels)),
+            }), 400
+
+        response = Response(
+            moves_to_binary.moves_to_binary(levels[level]),
+            mimetype=moves_to_binary.MOVES_BINARY_CONTENT_TYPE,
+        )
+        response.headers['X-Levels-Of-Detail'] = str(len(levels))
+        return response
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'status': "ERROR", 'message': repr(e)})
+
+
 @app.route("/api/simulate/svg/", methods=["POST"])
 def endpoint_api_simulate_moves_svg():
     """
     Serves an API endpoint, simulating G-code moves to SVG.
+
+    The SVG is returned in the response if the 'inline' parameter is set. Otherwise, it's kept in memory
+    for a while (please refer to SvgStore) and its path is returned.
     """
     input_text = request.json['pygcode']
 
     try:
-        simulated_machine = machine.simulated_machine.SimulatedMachine()
-        interpreter = gcode_interpreter.GCodeInterpreter(simulated_machine)
-        interpreter.run_gcode_string(python_to_gcode.python_to_gcode(input_text))
-        moves = simulated_machine.simulated_moves
+        moves = simulated_moves_cache.get_or_simulate(
+            input_text, simplification_tolerance=config.GCODE_SIMPLIFICATION_TOLERANCE)
 
-        return jsonify({
+        svg = moves_to_svg.moves_to_svg(moves, float(request.json['tool_diameter']))
+
+        if request.json.get('inline'):
+            return jsonify({
+                'status': "OK",
+                'svg': svg,
+            })
+        else:
+            return jsonify({
+                'status': "OK",
+                'result': 'svg/%s.svg' % rendered_svg_store.put(svg),
+            })
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'status': "ERROR", 'message': repr(e)})
+
+
+@app.route("/svg/<key>.svg")
+def endpoint_svg(key):
+    """
+    Serves a SVG rendered by /api/simulate/svg/.
+    """
+    svg = rendered_svg_store.get(key)
+    if svg is None:
+        abort(404)
+    return Response(svg, mimetype='image/svg+xml')
+
+
+@app.route("/api/simulate/cache_stats/", methods=["GET"])
+def endpoint_api_simulate_cache_stats():
+    """
+    Serves an API endpoint, returning the simulation cache statistics.
+    """
+    return jsonify({
+        'status': "OK",
+        'stats': simulated_moves_cache.stats,
+    })
+
+
+@app.route("/api/estimate/", methods=["POST"])
+def endpoint_api_estimate():
+    """
+    Serves an API endpoint, estimating how long running a program on the configured machine would take
+    (please refer to cycle_time_estimator), in seconds: in total and split into milling, rapid moves and dwells.
+
+    If the 'move_times' parameter is set, the times of the individual moves are returned as well.
+    """
+    input_text = request.json['pygcode']
+
+    try:
+        moves = simulated_moves_cache.get_or_simulate(
+            input_text, simplification_tolerance=config.GCODE_SIMPLIFICATION_TOLERANCE)
+        estimate = cycle_time_estimator.estimate_cycle_time(
+            moves,
+            config.MACHINE.default_feed_rate,
+            config.MACHINE.rapid_move_feed_rate,
+            config.MOTION_PLANNER_ACCELERATION,
+        )
+
+        result = {
             'status': "OK",
-            'result': moves_to_svg.moves_to_svg(
-                moves,
-                float(request.json['tool_diameter'])
-            )
-        })
+            'total_time': estimate.total_time,
+            'phases': {
+                'milling': estimate.milling_time,
+                'rapid': estimate.rapid_time,
+                'dwell': estimate.dwell_time,
+            },
+            'acceleration_overhead': estimate.acceleration_overhead,
+            'distances': {
+                'milling': estimate.milling_distance,
+                'rapid': estimate.rapid_distance,
+            },
+            'num_moves': estimate.num_moves,
+        }
+        if request.json.get('move_times'):
+            result['move_times'] = estimate.move_times.tolist()
+
+        return jsonify(result)
     except Exception as e:
         traceback.print_exc()
         return jsonify({'status': "ERROR", 'message': repr(e)})
@@ -0,0 +1,236 @@
+"""
+A cache of simulation results, so that simulating the same program again (e.g. to render it both in 3D and
+as SVG, or after clicking "simulate" twice) doesn't require running the Python code and the interpreter again.
+
+The results are kept in memory (the least recently used ones are evicted first) and, optionally, on disk,
+so that they survive restarts.
+"""
+import collections
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import typing
+
+import gcode_interpreter
+from level_of_detail import levels_of_detail
+from machine.base import DEFAULT_ARC_TOLERANCE
+from machine.simulated_machine import SimulatedMachine, SimulatedMoves
+from utils import python_to_gcode
+from utils.typing import Numeric, typechecked
+
+
+# Should be changed whenever the simulation results for the same program may change (e.g. when the way
+# the arcs are interpolated changes), so that the results stored on disk by older versions aren't used.
+SIMULATION_CACHE_VERSION = 3
+
+SIMULATION_CACHE_FILE_SUFFIX = '.pickle'
+
+
+@typechecked
+def simulate(
+        pygcode: str,
+        arc_tolerance: Numeric = DEFAULT_ARC_TOLERANCE,
+        simplification_tolerance: typing.Optional[Numeric] = None) -> SimulatedMoves:
+    """
+    Executes Python code that emits G-code (please refer to utils.python_to_gcode) and simulates the moves.
+
+    :param simplification_tolerance: please refer to GCodeInterpreter
+    """
+    simulated_machine = SimulatedMachine(arc_tolerance=arc_tolerance)
+    interpreter = gcode_interpreter.GCodeInterpreter(
+        simulated_machine, simplification_tolerance=simplification_tolerance)
+    interpreter.run_gcode_string(python_to_gcode.python_to_gcode(pygcode))
+    return simulated_machine.simulated_moves
+
+
+@typechecked
+def simulation_key(
+        pygcode: str,
+        arc_tolerance: Numeric,
+        simplification_tolerance: typing.Optional[Numeric] = None) -> str:
+    """
+    Returns the key the simulation results are stored under: a hash of the program and all the parameters
+    that influence the results.
+    """
+    key_data = json.dumps([SIMULATION_CACHE_VERSION, pygcode, arc_tolerance, simplification_tolerance])
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+
+class SimulationCache():
+    """
+    A bounded LRU cache of simulated moves, with an optional on-disk tier.
+
+    The levels of detail of the cached results (please refer to level_of_detail) are kept along with them
+    in memory, so that refining a preview doesn't decimate the toolpath again.
+
+    The cached SimulatedMoves are shared between the callers, so they must not be modified.
+    """
+    @typechecked
+    def __init__(
+            self,
+            max_entries: int = 16,
+            directory: typing.Optional[str] = None,
+            max_disk_entries: int = 256):
+        """
+        :param max_entries: how many results should be kept in memory
+        :param directory: where to store the results on disk, or None if they should be kept only in memory.
+            The files in it are unpickled, so it must be writable only by trusted users.
+        :param max_disk_entries: how many results should be kept on disk (the least recently stored ones
+            are removed first)
+        """
+        self._max_entries = max_entries
+        self._directory = directory
+        self._max_disk_entries = max_disk_entries
+        self._entries = collections.OrderedDict()
+        self._levels_of_detail = {}
+        self._lock = threading.Lock()
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @typechecked
+    def get_or_simulate(
+            self,
+            pygcode: str,
+            arc_tolerance: Numeric = DEFAULT_ARC_TOLERANCE,
+            simplification_tolerance: typing.Optional[Numeric] = None) -> SimulatedMoves:
+        """
+        Returns the simulated moves of a program (please refer to simulate()), simulating it only if it's
+        not in the cache.
+
+        Exceptions raised during the simulation are propagated and nothing is cached.
+        """
+        key = simulation_key(pygcode, arc_tolerance, simplification_tolerance)
+
+        with self._lock:
+            moves = self._entries.get(key)
+            if moves is not None:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return moves
+
+        moves = self._load_from_disk(key)
+        if moves is not None:
+            with self._lock:
+                self._disk_hits += 1
+                self._add_to_memory(key, moves)
+            return moves
+
+        moves = simulate(pygcode, arc_tolerance, simplification_tolerance)
+        with self._lock:
+            self._misses += 1
+            self._add_to_memory(key, moves)
+        self._store_on_disk(key, moves)
+        return moves
+
+    @typechecked
+    def get_or_simulate_levels_of_detail(
+            self,
+            pygcode: str,
+            arc_tolerance: Numeric = DEFAULT_ARC_TOLERANCE,
+            simplification_tolerance: typing.Optional[Numeric] = None) -> typing.List[SimulatedMoves]:
+        """
+        Returns the levels of detail (please refer to level_of_detail.levels_of_detail()) of the simulated moves
+        of a program, simulating it only if it's not in the cache.
+        """
+        key = simulation_key(pygcode, arc_tolerance, simplification_tolerance)
+
+        with self._lock:
+            levels = self._levels_of_detail.get(key)
+        if levels is not None:
+            return levels
+
+        levels = levels_of_detail(self.get_or_simulate(pygcode, arc_tolerance, simplification_tolerance))
+        with self._lock:
+            # The levels are kept only as long as the moves they have been computed from.
+            if key in self._entries:
+                self._levels_of_detail[key] = levels
+        return levels
+
+    @typechecked
+    def clear(self) -> None:
+        """
+        Removes all the results kept in memory. The results stored on disk are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._levels_of_detail.clear()
+
+    @property
+    @typechecked
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the cache statistics: the numbers of hits (in memory and on disk), misses and cached results.
+        """
+        with self._lock:
+            return {
+                'memory_hits': self._memory_hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'entries': len(self._entries),
+            }
+
+    def _add_to_memory(self, key: str, moves: SimulatedMoves) -> None:
+        self._entries[key] = moves
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            evicted_key, unused_moves = self._entries.popitem(last=False)
+            self._levels_of_detail.pop(evicted_key, None)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + SIMULATION_CACHE_FILE_SUFFIX)
+
+    def _load_from_disk(self, key: str) -> typing.Optional[SimulatedMoves]:
+        if self._directory is None:
+            return None
+
+        # pickle.load() may run arbitrary code, so the cache directory must be trusted (please refer to __init__).
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # A truncated file (e.g. when the disk got full) or one stored by an older version with a different
+            # SimulatedMoves layout - it's removed, so that the program is simulated and stored again.
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+
+    def _store_on_disk(self, key: str, moves: SimulatedMoves) -> None:
+        if self._directory is None:
+            return
+
+        # The file is renamed only when it's complete, so that a concurrent reader never sees a partial one.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self._directory)
+        with os.fdopen(file_descriptor, 'wb') as f:
+            pickle.dump(moves, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self._path(key))
+
+        self._remove_oldest_disk_entries()
+
+    def _remove_oldest_disk_entries(self) -> None:
+        paths = [
+            os.path.join(self._directory, name)
+            for name in os.listdir(self._directory)
+            if name.endswith(SIMULATION_CACHE_FILE_SUFFIX)
+        ]
+        if len(paths) <= self._max_disk_entries:
+            return
+
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self._max_disk_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
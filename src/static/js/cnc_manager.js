@@ -85,29 +85,51 @@ cnc_manager.initializeRunButton = function(button, editor, loggingHandler) {
 }
 
 
+cnc_manager.lastSimulationId = 0;
+
+
 cnc_manager.initializeSimulateButton = function(button, editor, loggingHandler, visualizationContainer) {
     /*
      * Initializes the "simulate" button.
      */
     button.bind('click', function() {
-        logging.callAjaxAndLogErrors(
-            '/api/simulate/json/',
-            {
-                data: JSON.stringify({
-                    'pygcode': editor.getValue(),
+        var pygcode = editor.getValue();
+        var simulationId = ++ cnc_manager.lastSimulationId;
+        var view = null;
+
+        /*
+         * The moves are fetched in a binary format, so that large toolpaths don't have to be parsed from JSON,
+         * starting with the coarsest level of detail, that is then refined - so that the preview is
+         * interactive also while the details of a large toolpath are being loaded.
+         */
+        function loadLevelOfDetail(level) {
+            logging.callBinaryApiAndLogErrors(
+                '/api/simulate/binary/',
+                JSON.stringify({
+                    'pygcode': pygcode,
+                    'level': level,
                 }),
-                contentType: 'application/json',
-                type: 'POST',
-                success: function(data) {
-                    milling_3d_view.visualizeMoves(
-                        visualizationContainer,
-                        data.moves,
-                        parseFloat($('input.tool-diameter').val())
-                    );
+                function(buffer, xhr) {
+                    /* the simulate button has been clicked again in the meantime */
+                    if (simulationId != cnc_manager.lastSimulationId) {
+                        return;
+                    }
+
+                    if (view === null) {
+                        view = milling_3d_view.visualizeBinaryMoves(visualizationContainer, buffer);
+                    } else {
+                        view.replaceMoves(buffer);
+                    }
+
+                    if (level + 1 < parseInt(xhr.getResponseHeader('X-Levels-Of-Detail'))) {
+                        loadLevelOfDetail(level + 1);
+                    }
                 },
-            },
-            loggingHandler
-        );
+                loggingHandler
+            );
+        }
+
+        loadLevelOfDetail(0);
     });
 }
 
@@ -33,3 +33,37 @@ logging.callAjaxAndLogErrors = function(url, parameters, errorLogger) {
 
     $.ajax(url, parameters);
 }
+
+
+logging.callBinaryApiAndLogErrors = function(url, data, success, errorLogger) {
+    /*
+     * POSTs JSON data to an API endpoint that returns binary data (e.g. /api/simulate/binary/) and calls
+     * the success callback with an ArrayBuffer and the XMLHttpRequest (e.g. to read the response headers).
+     * The errors are returned by such endpoints as JSON - they are logged as in callAjaxAndLogErrors.
+     */
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', url);
+    xhr.setRequestHeader('Content-Type', 'application/json');
+    xhr.responseType = 'arraybuffer';
+
+    xhr.onload = function() {
+        var contentType = xhr.getResponseHeader('Content-Type') || '';
+        var text;
+
+        if (xhr.status != 200) {
+            text = new TextDecoder().decode(xhr.response);
+            if (text) {
+                errorLogger(text + '\n');
+            }
+        } else if (contentType.indexOf('application/json') === 0) {
+            text = new TextDecoder().decode(xhr.response);
+            var response = JSON.parse(text);
+            alert(response.message);
+            errorLogger(response.message + '\n');
+        } else {
+            success(xhr.response, xhr);
+        }
+    }
+
+    xhr.send(data);
+}
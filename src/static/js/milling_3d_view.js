@@ -138,6 +138,89 @@ milling_3d_view.drawMovesOnScene = function(moves, oneMillimeterInThreejsUnits,
 }
 
 
+milling_3d_view.BINARY_MOVES_MAGIC = 'CNCM';
+milling_3d_view.BINARY_MOVES_VERSION = 1;
+milling_3d_view.BINARY_MOVES_HEADER_SIZE = 12;
+
+
+milling_3d_view.parseBinaryMoves = function(buffer) {
+    /*
+     * Parses moves in the binary format returned by /api/simulate/binary/ (please refer to moves_to_binary.py).
+     * The returned arrays are views of the buffer - the data is not copied.
+     *
+     * Returns an object with the following attributes:
+     *   numMoves: the number of moves
+     *   positions: a Float32Array with three coordinates (x, y, z) per move
+     *   rapid: a Uint8Array with one flag per move: 1 if it's rapid move, 0 if milling
+     */
+    var header = new DataView(buffer, 0, milling_3d_view.BINARY_MOVES_HEADER_SIZE);
+    var magic = String.fromCharCode(
+        header.getUint8(0), header.getUint8(1), header.getUint8(2), header.getUint8(3));
+
+    if (magic != milling_3d_view.BINARY_MOVES_MAGIC) {
+        throw new Error('Invalid binary moves magic: ' + magic);
+    }
+    if (header.getUint32(4, true) != milling_3d_view.BINARY_MOVES_VERSION) {
+        throw new Error('Unsupported binary moves version: ' + header.getUint32(4, true));
+    }
+
+    var numMoves = header.getUint32(8, true);
+    var positionsOffset = milling_3d_view.BINARY_MOVES_HEADER_SIZE;
+    var rapidOffset = positionsOffset + numMoves * 3 * Float32Array.BYTES_PER_ELEMENT;
+
+    return {
+        numMoves: numMoves,
+        /* the positions are little-endian, as is the byte order of practically all browser platforms */
+        positions: new Float32Array(buffer, positionsOffset, numMoves * 3),
+        rapid: new Uint8Array(buffer, rapidOffset, numMoves),
+    };
+}
+
+
+milling_3d_view.drawBinaryMovesOnScene = function(moves, oneMillimeterInThreejsUnits, scene) {
+    /*
+     * Draws milling tool moves parsed by parseBinaryMoves as a single line, backed by a BufferGeometry
+     * that uses the positions without copying them.
+     *
+     * Parameters:
+     *   moves: moves returned by parseBinaryMoves
+     *   oneMillimeterInThreejsUnits: scaling factor, converting one millimeter to three.js units
+     *   scene: the THREE.Scene object to draw on
+     *
+     * Returns the THREE.Line object that has been added to the scene.
+     */
+    var geometry = new THREE.BufferGeometry();
+    geometry.addAttribute('position', new THREE.BufferAttribute(moves.positions, 3));
+
+    /*
+     * The segment ending at i-th position is drawn with the material of i-th move: runs of segments
+     * of the same kind are drawn as groups, red color represents rapid moves, blue - actual milling.
+     */
+    var groupStart = 0;
+    for (var i = 2; i <= moves.numMoves; i ++) {
+        if (i == moves.numMoves || moves.rapid[i] != moves.rapid[i - 1]) {
+            geometry.addGroup(groupStart, i - groupStart, moves.rapid[i - 1] ? 1 : 0);
+            groupStart = i - 1;
+        }
+    }
+
+    var line = new THREE.Line(geometry, [
+        new THREE.LineBasicMaterial({color: 'blue'}),
+        new THREE.LineBasicMaterial({color: 'red'}),
+    ]);
+
+    /*
+     * 1/ the axes should be changed: mill Z axis is visualization Y axis and vice versa
+     * 2/ the (machine) Y axis should be inverted (positive is UP)
+     */
+    line.rotation.x = - Math.PI / 2;
+    line.scale.set(oneMillimeterInThreejsUnits, oneMillimeterInThreejsUnits, oneMillimeterInThreejsUnits);
+
+    scene.add(line);
+    return line;
+}
+
+
 milling_3d_view.drawTool = function(scene) {
     /*
      * Draws the milling tool.
@@ -241,6 +324,51 @@ milling_3d_view.visualizeMoves = function(container, moves, toolWidth) {
      *   moves: a list of tuples: (x, y, z, if it's rapid move or milling)
      *   toolWidth: the width of the tool that will be used to draw moves
      */
+    milling_3d_view.visualize(container, function(scene, oneMillimeterInThreejsUnits) {
+        milling_3d_view.drawMovesOnScene(moves, oneMillimeterInThreejsUnits, scene, toolWidth);
+    });
+}
+
+
+milling_3d_view.visualizeBinaryMoves = function(container, buffer) {
+    /*
+     * Visualize milling tool moves, returned by /api/simulate/binary/, in a HTML container.
+     *
+     * Parameters:
+     *   container: a HTML container the 3d visualization will be shown in
+     *   buffer: an ArrayBuffer with the moves
+     *
+     * Returns an object with a replaceMoves(buffer) method, that replaces the visualized moves (e.g. with
+     * a more detailed version of them) without resetting the view.
+     */
+    var moves = milling_3d_view.parseBinaryMoves(buffer);
+    var line = null;
+    var scene = null;
+    var oneMillimeterInThreejsUnits = null;
+
+    milling_3d_view.visualize(container, function(visualizationScene, visualizationOneMillimeterInThreejsUnits) {
+        scene = visualizationScene;
+        oneMillimeterInThreejsUnits = visualizationOneMillimeterInThreejsUnits;
+        line = milling_3d_view.drawBinaryMovesOnScene(moves, oneMillimeterInThreejsUnits, scene);
+    });
+
+    return {
+        replaceMoves: function(buffer) {
+            var moves = milling_3d_view.parseBinaryMoves(buffer);
+
+            scene.remove(line);
+            line.geometry.dispose();
+            line = milling_3d_view.drawBinaryMovesOnScene(moves, oneMillimeterInThreejsUnits, scene);
+        }
+    };
+}
+
+
+milling_3d_view.visualize = function(container, drawMoves) {
+    /*
+     * Create a 3d visualization in a HTML container, with the moves drawn by drawMoves(scene,
+     * oneMillimeterInThreejsUnits).
+     */
     var oneMillimeterInThreejsUnits = 10;
 
     if (WEBGL.isWebGLAvailable() === false) {
@@ -258,7 +386,7 @@ milling_3d_view.visualizeMoves = function(container, moves, toolWidth) {
     container.innerHTML = '';
     container.appendChild(renderer.domElement);
 
-    milling_3d_view.drawMovesOnScene(moves, oneMillimeterInThreejsUnits, scene, toolWidth);
+    drawMoves(scene, oneMillimeterInThreejsUnits);
     milling_3d_view.drawTool(scene);
     milling_3d_view.drawAxesHelper(scene);
     milling_3d_view.drawGrids(scene, oneMillimeterInThreejsUnits);
@@ -0,0 +1,118 @@
+"""
+An in-memory store of rendered SVG previews, so that they can be served without writing them to disk.
+
+The SVGs are content-addressed (stored under the hash of their content), so rendering the same moves again
+doesn't take additional memory, and are evicted when they expire or when the store grows too large.
+"""
+import collections
+import hashlib
+import os
+import re
+import threading
+import time
+import typing
+
+from utils.typing import Numeric, typechecked
+
+
+# The files that older versions wrote to static/ (named with utils.random.random_token()).
+STALE_SVG_FILE_NAME_REGEX = re.compile(r'^[0-9a-f]{40}\.svg$')
+
+
+class SvgStore():
+    """
+    A bounded store of SVG documents, with the least recently stored ones evicted first.
+    """
+    @typechecked
+    def __init__(
+            self,
+            max_bytes: int = 64 * 1024 * 1024,
+            ttl: Numeric = 3600,
+            clock: typing.Callable[[], float] = time.monotonic):
+        """
+        :param max_bytes: the maximum total size of the stored SVGs
+        :param ttl: how many seconds a SVG should be kept after it has been stored
+        :param clock: a function returning the current time in seconds
+        """
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._clock = clock
+        # key -> (expiration time, SVG encoded as UTF-8)
+        self._entries = collections.OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+
+    @typechecked
+    def put(self, svg: str) -> str:
+        """
+        Stores a SVG document and returns the key it may be retrieved with.
+        """
+        data = svg.encode('utf-8')
+        key = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            if key in self._entries:
+                self._num_bytes -= len(self._entries.pop(key)[1])
+
+            self._entries[key] = (self._clock() + self._ttl, data)
+            self._num_bytes += len(data)
+            self._evict()
+
+        return key
+
+    @typechecked
+    def get(self, key: str) -> typing.Optional[bytes]:
+        """
+        Returns the stored SVG (encoded as UTF-8) or None if it doesn't exist or has expired.
+        """
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    @property
+    @typechecked
+    def num_bytes(self) -> int:
+        """
+        The total size of the stored SVGs.
+        """
+        return self._num_bytes
+
+    def _evict(self) -> None:
+        now = self._clock()
+        # As all the entries have the same TTL, the oldest ones are at the beginning.
+        while self._entries:
+            key, (expiration_time, data) = next(iter(self._entries.items()))
+            if expiration_time > now and self._num_bytes <= self._max_bytes:
+                break
+
+            del self._entries[key]
+            self._num_bytes -= len(data)
+
+
+@typechecked
+def remove_stale_svg_files(directory: str, max_age: Numeric) -> int:
+    """
+    Removes the SVG files older than max_age seconds that older versions have rendered to a directory
+    (and never deleted). Other files are left untouched.
+
+    :return: the number of removed files
+    """
+    if not os.path.isdir(directory):
+        return 0
+
+    now = time.time()
+    num_removed_files = 0
+    for name in os.listdir(directory):
+        if not STALE_SVG_FILE_NAME_REGEX.match(name):
+            continue
+
+        path = os.path.join(directory, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+                num_removed_files += 1
+        except FileNotFoundError:
+            pass
+
+    return num_removed_files
@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from cycle_time_estimator import estimate_cycle_time
+from exceptions import InvalidGCodeException
+from simulation_cache import simulate
+
+PROGRAM = '''
+for line in ["G90", "G0 X10", "G1 X20", "F600", "G1 Y10", "G1 Y10", "G1 Y20", "G4 P2"]:
+    emit(line + "\\n")
+'''
+
+
+class EstimateCycleTimeTestCase(TestCase):
+    def test_constant_feed_rates(self):
+        estimate = estimate_cycle_time(simulate(PROGRAM), default_feed_rate=500, rapid_move_feed_rate=1200)
+
+        self.assertAlmostEqual(estimate.rapid_time, 0.5)
+        # The first milling move is executed at the default feed rate.
+        self.assertAlmostEqual(estimate.milling_time, 1.2 + 1 + 1)
+        self.assertAlmostEqual(estimate.dwell_time, 2)
+        self.assertAlmostEqual(estimate.total_time, 5.7)
+        self.assertEqual(estimate.acceleration_overhead, 0)
+        self.assertAlmostEqual(estimate.rapid_distance, 10)
+        self.assertAlmostEqual(estimate.milling_distance, 30)
+
+        # The move that doesn't move the tool takes no time.
+        self.assertEqual(estimate.num_moves, 5)
+        self.assertEqual(list(estimate.move_times), [0, 0.5, 1.2, 1, 0, 1])
+
+    def test_default_feed_rate(self):
+        estimate = estimate_cycle_time(simulate('emit("G91 G1 X5")'), default_feed_rate=500, rapid_move_feed_rate=1200)
+
+        self.assertAlmostEqual(estimate.milling_time, 0.6)
+
+    def test_feed_rates_equal_to_simulated_ones(self):
+        # The moves are simulated with placeholder feed rates, which mustn't be mistaken for the ones set
+        # by the program.
+        for feed_rate, expected_time in ((10, 60), (1, 600)):
+            moves = simulate('emit("G91\\nF%d\\nG1 X10\\n")' % feed_rate)
+            estimate = estimate_cycle_time(moves, default_feed_rate=500, rapid_move_feed_rate=1200)
+
+            self.assertAlmostEqual(estimate.milling_time, expected_time)
+            self.assertEqual(estimate.rapid_time, 0)
+
+    def test_going_home_is_rapid(self):
+        estimate = estimate_cycle_time(
+            simulate('emit("G91\\nG1 X10\\nG28\\n")'), default_feed_rate=500, rapid_move_feed_rate=1200)
+
+        self.assertAlmostEqual(estimate.milling_time, 1.2)
+        self.assertAlmostEqual(estimate.rapid_time, 0.5)
+
+    def test_acceleration(self):
+        moves = simulate(PROGRAM)
+        without_acceleration = estimate_cycle_time(moves, default_feed_rate=500, rapid_move_feed_rate=1200)
+        estimate = estimate_cycle_time(moves, default_feed_rate=500, rapid_move_feed_rate=1200, acceleration=10)
+
+        self.assertGreater(estimate.acceleration_overhead, 0)
+        self.assertAlmostEqual(
+            estimate.total_time, without_acceleration.total_time + estimate.acceleration_overhead)
+        self.assertAlmostEqual(sum(estimate.move_times), estimate.milling_time + estimate.rapid_time)
+        self.assertEqual(estimate.move_times[4], 0)
+
+        # The straight line milled in two moves is planned as one: the second move starts at the full speed
+        # (10 mm/s) and decelerates over its second half.
+        self.assertAlmostEqual(estimate.move_times[5], 0.5 + 1)
+
+    def test_zero_feed_rate(self):
+        with self.assertRaises(InvalidGCodeException):
+            simulate('emit("G91\\nF0\\nG1 X10\\n")')
+
+        with self.assertRaises(ValueError):
+            estimate_cycle_time(simulate(PROGRAM), default_feed_rate=0, rapid_move_feed_rate=1200)
+
+    def test_empty_program(self):
+        estimate = estimate_cycle_time(simulate(''), default_feed_rate=500, rapid_move_feed_rate=1200)
+
+        self.assertEqual(estimate.total_time, 0)
+        self.assertEqual(estimate.num_moves, 0)
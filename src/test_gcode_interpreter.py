@@ -0,0 +1,199 @@
+import io
+import math
+
+from unittest import TestCase, mock
+
+import pygcode
+
+from exceptions import InvalidGCodeException
+from gcode_interpreter import (
+    FlushPolicy,
+    GCodeInterpreter,
+)
+from machine.simulated_machine import SimulatedMachine
+from utils.math_utils import arc_num_segments
+
+
+class GCodeInterpreterTestCase(TestCase):
+    def test_stream(self):
+        gcode = "G90\nG0 X1 Y1\nG1 X3\nG3 X5 Y1 I1 J0\nG91\nG1 Y-1\n"
+
+        reference_machine = SimulatedMachine()
+        GCodeInterpreter(reference_machine).run_gcode_string(gcode)
+
+        machine = SimulatedMachine()
+        GCodeInterpreter(machine).run_gcode_stream(io.StringIO(gcode))
+        self.assertEqual(machine.simulated_moves, reference_machine.simulated_moves)
+
+    def test_inches(self):
+        machine = SimulatedMachine()
+        GCodeInterpreter(machine).run_gcode_string("G90\nG20 G1 X1 Y2\nG21 G1 X1")
+        self.assertEqual(
+            machine.simulated_moves,
+            [(0, 0, 0, False), (25.4, 50.8, 0, False), (1, 50.8, 0, False)],
+        )
+
+    def test_go_home(self):
+        machine = SimulatedMachine()
+        GCodeInterpreter(machine).run_gcode_string("G91\nG1 X1 Y2 Z3\nG28")
+        self.assertEqual(
+            machine.simulated_moves,
+            [(0, 0, 0, False), (1, 2, 3, False), (0, 0, 0, True)],
+        )
+
+    def test_go_home_through_intermediate_point(self):
+        machine = SimulatedMachine()
+        GCodeInterpreter(machine).run_gcode_string("G90\nG1 X5 Y5 Z-1\nG28 Z5")
+        self.assertEqual(
+            machine.simulated_moves,
+            [(0, 0, 0, False), (5, 5, -1, False), (5, 5, 5, True), (0, 0, 0, True)],
+        )
+
+    def test_go_home_through_incremental_intermediate_point(self):
+        machine = SimulatedMachine()
+        GCodeInterpreter(machine).run_gcode_string("G91\nG1 X5 Y5 Z-1\nG28 X1 Z6")
+        self.assertEqual(
+            machine.simulated_moves,
+            [(0, 0, 0, False), (5, 5, -1, False), (6, 5, 5, True), (0, 0, 0, True)],
+        )
+
+    def test_go_home_command_through_intermediate_point(self):
+        machine = SimulatedMachine()
+        interpreter = GCodeInterpreter(machine)
+        interpreter.run_gcode_string("G90\nG1 X5 Y5 Z-1")
+
+        block = pygcode.Line("G28 Z5").block
+        for gcode in block.gcodes:
+            interpreter.run_gcode_command(gcode, block.modal_params)
+
+        self.assertEqual(
+            machine.simulated_moves,
+            [(0, 0, 0, False), (5, 5, -1, False), (5, 5, 5, True), (0, 0, 0, True)],
+        )
+
+    def test_dwell(self):
+        machine = mock.MagicMock()
+        GCodeInterpreter(machine).run_gcode_string("G4 P1.5")
+        machine.dwell.assert_called_once_with(1.5)
+
+
+class ArcTestCase(TestCase):
+    def _run(self, gcode, arc_tolerance=0.01):
+        machine = SimulatedMachine(arc_tolerance=arc_tolerance)
+        GCodeInterpreter(machine).run_gcode_string(gcode)
+        return [move[:3] for move in machine.simulated_moves]
+
+    def _assert_on_circle(self, points, center, radius, axes=(0, 1)):
+        a, b = axes
+        for point in points:
+            self.assertAlmostEqual(math.hypot(point[a] - center[0], point[b] - center[1]), radius)
+
+    def _assert_points_equal(self, point1, point2):
+        for coordinate1, coordinate2 in zip(point1, point2):
+            self.assertAlmostEqual(coordinate1, coordinate2)
+
+    def test_tolerance(self):
+        for arc_tolerance in [0.001, 0.01, 0.1]:
+            points = self._run("G90 G3 X10 Y10 I0 J10", arc_tolerance=arc_tolerance)
+
+            self.assertEqual(len(points) - 1, arc_num_segments(10, math.pi / 2, arc_tolerance))
+            self._assert_on_circle(points, (0, 10), 10)
+            self._assert_points_equal(points[-1], (10, 10, 0))
+
+            # The deviation is the largest in the middle of a segment.
+            for point1, point2 in zip(points, points[1:]):
+                middle = ((point1[0] + point2[0]) / 2, (point1[1] + point2[1]) / 2)
+                self.assertLessEqual(10 - math.hypot(middle[0], middle[1] - 10), arc_tolerance)
+
+    def test_small_arcs_use_less_segments(self):
+        self.assertLess(len(self._run("G90 G3 X1 Y1 I0 J1")), len(self._run("G90 G3 X100 Y100 I0 J100")))
+
+    def test_full_circle(self):
+        points = self._run("G90 G1 X1 Y1\nG2 X1 Y1 I5 J0")
+
+        self._assert_on_circle(points[1:], (6, 1), 5)
+        self._assert_points_equal(points[-1], (1, 1, 0))
+        self.assertAlmostEqual(max(point[0] for point in points), 11, places=1)
+        self.assertAlmostEqual(max(point[1] for point in points), 6, places=1)
+
+    def test_radius_format(self):
+        # Clockwise, shorter than half of a circle
+        points = self._run("G90 G2 X5 Y5 R5")
+        self._assert_on_circle(points, (5, 0), 5)
+        self.assertTrue(all(point[0] <= 5 + 1e-9 for point in points))
+
+        # Clockwise, longer than half of a circle
+        points = self._run("G90 G2 X5 Y5 R-5")
+        self._assert_on_circle(points, (0, 5), 5)
+        self.assertAlmostEqual(max(point[0] for point in points), 5, places=1)
+        self.assertAlmostEqual(min(point[1] for point in points), 0, places=1)
+
+        # Counterclockwise, shorter than half of a circle
+        points = self._run("G90 G3 X5 Y5 R5")
+        self._assert_on_circle(points, (0, 5), 5)
+        self._assert_points_equal(points[-1], (5, 5, 0))
+
+        with self.assertRaises(InvalidGCodeException):
+            self._run("G90 G2 X5 Y5 R1")
+
+    def test_planes(self):
+        points = self._run("G90 G18 G3 X5 Z5 I0 K5")
+        self._assert_on_circle(points, (5, 0), 5, axes=(2, 0))
+        self.assertTrue(all(point[1] == 0 for point in points))
+        self._assert_points_equal(points[-1], (5, 0, 5))
+
+        points = self._run("G90 G19 G2 Y5 Z5 J5 K0")
+        self._assert_on_circle(points, (5, 0), 5, axes=(1, 2))
+        self.assertTrue(all(point[0] == 0 for point in points))
+        self._assert_points_equal(points[-1], (0, 5, 5))
+
+    def test_helical_move(self):
+        points = self._run("G90 G17 G3 X0 Y0 Z-3 I5 J0")
+
+        self._assert_on_circle(points, (5, 0), 5)
+        self._assert_points_equal(points[-1], (0, 0, -3))
+        for point1, point2 in zip(points, points[1:]):
+            self.assertLess(point2[2], point1[2])
+
+    def test_missing_axes_in_absolute_mode(self):
+        points = self._run("G90 G1 X1 Y1\nG2 X3 I1")
+
+        self._assert_on_circle(points[1:], (2, 1), 1)
+        self._assert_points_equal(points[-1], (3, 1, 0))
+
+
+class FlushPolicyTestCase(TestCase):
+    GCODE = "G91\nG1 X1\nG1 X1\nF100\nG1 X1\nG1 X1\nG1 X1"
+
+    def _count_flushes(self, **kwargs):
+        machine = mock.MagicMock()
+        machine.buffer_size = 2
+        machine.default_feed_rate = 10
+        GCodeInterpreter(machine, **kwargs).run_gcode_string(self.GCODE)
+        self.assertEqual(machine.move_by.call_count, 5)
+        return machine.flush.call_count
+
+    def test_every_gcode(self):
+        self.assertEqual(self._count_flushes(flush_policy=FlushPolicy.EVERY_GCODE), 7)
+
+    def test_every_n_moves(self):
+        self.assertEqual(self._count_flushes(flush_policy=FlushPolicy.EVERY_N_MOVES, flush_every_n_moves=3), 2)
+
+    def test_on_buffer_full(self):
+        self.assertEqual(self._count_flushes(flush_policy=FlushPolicy.ON_BUFFER_FULL), 3)
+
+    def test_end_of_program(self):
+        self.assertEqual(self._count_flushes(flush_policy=FlushPolicy.END_OF_PROGRAM), 1)
+
+    def test_arc_segments_are_counted(self):
+        machine = mock.MagicMock()
+        machine.default_feed_rate = 10
+        machine.arc_tolerance = 0.01
+        GCodeInterpreter(machine, flush_policy=FlushPolicy.EVERY_N_MOVES, flush_every_n_moves=4).run_gcode_string(
+            "G91 G3 X10 Y10 I0 J10")
+
+        blocks = [call[0][0] for call in machine.move_by_many.call_args_list]
+        num_moves = sum(len(block) for block in blocks)
+        self.assertEqual(num_moves, arc_num_segments(10, math.pi / 2, 0.01))
+        self.assertEqual([len(block) for block in blocks[:-1]], [4] * (len(blocks) - 1))
+        self.assertEqual(machine.flush.call_count, num_moves // 4 + 1)
@@ -0,0 +1,84 @@
+from unittest import TestCase
+
+from exceptions import InvalidGCodeException
+from gcode_interpreter import GCodeInterpreter
+from gcode_program import (
+    Instruction,
+    Opcode,
+    _CompiledProgramsCache,
+    compile_gcode_string,
+)
+from machine.simulated_machine import SimulatedMachine
+
+
+class CompileGCodeStringTestCase(TestCase):
+    def test_compilation(self):
+        self.assertEqual(
+            compile_gcode_string("N10 G91 G17 G0 X1 Y2\nG21 F100\nG1 Z-1\nG2 X2 Y0 I1 J0").instructions,
+            (
+                Instruction(Opcode.SET_INCREMENTAL_MODE, {}),
+                Instruction(Opcode.SELECT_XY_PLANE, {}),
+                Instruction(Opcode.RAPID_MOVE, {'X': 1.0, 'Y': 2.0}),
+                Instruction(Opcode.USE_MILLIMETERS, {}),
+                Instruction(Opcode.SET_FEED_RATE, {'F': 100.0}),
+                Instruction(Opcode.LINEAR_MOVE, {'Z': -1.0}),
+                Instruction(Opcode.ARC_MOVE_CW, {'X': 2.0, 'Y': 0.0, 'I': 1.0, 'J': 0.0}),
+            )
+        )
+
+    def test_unknown_axes(self):
+        with self.assertRaises(InvalidGCodeException):
+            compile_gcode_string("G1 X1 A2")
+
+    def test_unknown_gcode(self):
+        with self.assertRaises(InvalidGCodeException):
+            compile_gcode_string("M3")
+
+    def test_non_positive_feed_rate(self):
+        for gcode in ("F0", "G1 X1 F0", "F-100"):
+            with self.assertRaises(InvalidGCodeException):
+                compile_gcode_string(gcode)
+
+    def test_go_home(self):
+        self.assertEqual(
+            compile_gcode_string("G28\nG28 X10 Z5").instructions,
+            (
+                Instruction(Opcode.GO_HOME, {}),
+                Instruction(Opcode.GO_HOME, {'X': 10.0, 'Z': 5.0}),
+            )
+        )
+
+    def test_go_home_unknown_axes(self):
+        with self.assertRaises(InvalidGCodeException):
+            compile_gcode_string("G28 X10 A5")
+
+    def test_predefined_position_other_than_home(self):
+        with self.assertRaises(InvalidGCodeException):
+            compile_gcode_string("G30")
+
+    def test_cache(self):
+        self.assertIs(compile_gcode_string("G90\nG0 X1"), compile_gcode_string("G90\nG0 X1"))
+
+    def test_cache_is_bounded_by_instructions(self):
+        cache = _CompiledProgramsCache(max_instructions=3)
+
+        first = cache.get_or_compile("G90\nG0 X1")
+        self.assertIs(cache.get_or_compile("G90\nG0 X1"), first)
+        cache.get_or_compile("G91\nG0 X2")
+        self.assertEqual(len(cache), 1)
+        self.assertIsNot(cache.get_or_compile("G90\nG0 X1"), first)
+
+        long_program = "\n".join(["G0 X1"] * 4)
+        self.assertIsNot(cache.get_or_compile(long_program), cache.get_or_compile(long_program))
+
+    def test_compiled_program_rerun(self):
+        gcode = "G90\nG0 X1 Y1\nG1 X3\nG3 X5 Y1 I1 J0\nG91\nG1 Y-1"
+
+        reference_machine = SimulatedMachine()
+        GCodeInterpreter(reference_machine).run_gcode_string(gcode)
+
+        program = compile_gcode_string(gcode)
+        for unused_i in range(2):
+            machine = SimulatedMachine()
+            GCodeInterpreter(machine).run_program(program)
+            self.assertEqual(machine.simulated_moves, reference_machine.simulated_moves)
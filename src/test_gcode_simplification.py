@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+from gcode_interpreter import GCodeInterpreter
+from gcode_program import Instruction, Opcode, compile_gcode_string
+from gcode_simplification import PolylineSimplifier, point_to_segment_distance, simplify_polyline
+from machine.simulated_machine import SimulatedMachine
+from pygcode_modules import heart
+
+
+class PointToSegmentDistanceTestCase(TestCase):
+    def test_distance(self):
+        self.assertAlmostEqual(point_to_segment_distance((1, 1, 1), (0, 0, 0), (2, 0, 0)), 2 ** 0.5)
+        self.assertAlmostEqual(point_to_segment_distance((3, 0, 4), (0, 0, 0), (2, 0, 0)), 17 ** 0.5)
+        self.assertAlmostEqual(point_to_segment_distance((0, 3, 4), (1, 1, 1), (1, 1, 1)), 14 ** 0.5)
+
+
+class SimplifyPolylineTestCase(TestCase):
+    def test_collinear(self):
+        points = [(0, 0, 0), (1, 0, 0), (2, 0, 0), (2, 1, 0), (2, 2, 1e-3)]
+        self.assertEqual(simplify_polyline(points, 0), [0, 2, 3, 4])
+        self.assertEqual(simplify_polyline(points, 0.01), [0, 2, 4])
+
+    def test_going_back(self):
+        # The point where the path turns back lies on the line through the endpoints, but not on the segment.
+        self.assertEqual(simplify_polyline([(0, 0, 0), (2, 0, 0), (1, 0, 0)], 0.1), [0, 1, 2])
+
+
+class PolylineSimplifierTestCase(TestCase):
+    def _simplify(self, gcode, tolerance=0.01):
+        simplifier = PolylineSimplifier(tolerance)
+        instructions = list(simplifier.simplify(compile_gcode_string(gcode)))
+        return instructions, simplifier.num_removed_moves
+
+    def test_absolute(self):
+        instructions, num_removed_moves = self._simplify("G90\nG1 X1\nG1 X2 Y0.001\nG1 X3\nG0 Y5\nG1 Y6\nG1 Y7")
+
+        self.assertEqual(num_removed_moves, 3)
+        self.assertEqual(instructions, [
+            Instruction(Opcode.SET_ABSOLUTE_MODE, {}),
+            Instruction(Opcode.LINEAR_MOVE, {'X': 3, 'Y': 0.001, 'Z': 0}),
+            Instruction(Opcode.RAPID_MOVE, {'Y': 5}),
+            Instruction(Opcode.LINEAR_MOVE, {'X': 3, 'Y': 7, 'Z': 0}),
+        ])
+
+    def test_incremental_in_inches(self):
+        instructions, num_removed_moves = self._simplify("G91 G20\nG1 X1\nG1 X1 Y0.001\nG1 Y1", tolerance=0.01)
+
+        # The tolerance is in millimeters, 0.001 inch is more than that.
+        self.assertEqual(num_removed_moves, 0)
+
+        instructions, num_removed_moves = self._simplify("G91 G20\nG1 X1\nG1 X1 Y0.0001\nG1 Y1", tolerance=0.01)
+        self.assertEqual(num_removed_moves, 1)
+        # The moves are converted to millimeters and back, so they are only almost equal.
+        self.assertEqual([opcode for opcode, params in instructions[2:]], [Opcode.LINEAR_MOVE] * 2)
+        for (opcode, params), expected_params in zip(instructions[2:], [(2, 0.0001, 0), (0, 1, 0)]):
+            for axis, expected_value in zip(('X', 'Y', 'Z'), expected_params):
+                self.assertAlmostEqual(params[axis], expected_value)
+
+    def test_switching_units(self):
+        # The run after G21 starts where the move in inches ended, so the two moves in millimeters are collinear.
+        instructions, num_removed_moves = self._simplify("G90 G20\nG1 X1 Y1\nG21\nG1 X30 Y25.4\nG1 X34.6 Y25.4")
+
+        self.assertEqual(num_removed_moves, 1)
+        self.assertEqual(instructions[-1], Instruction(Opcode.LINEAR_MOVE, {'X': 34.6, 'Y': 25.4, 'Z': 0}))
+
+    def test_reused_interpreter(self):
+        for gcode in ("G1 Z5\nG91", "G90 G1 X5\nG20 G91", "G1 X1 Y1\nG21"):
+            machine = SimulatedMachine()
+            interpreter = GCodeInterpreter(machine, simplification_tolerance=0.01)
+            interpreter.run_gcode_string(gcode)
+            interpreter.run_gcode_string("G1 X10\nG1 X10\nG1 Z1\nG90\nG1 X30\nG1 X40")
+
+            reference_machine = SimulatedMachine()
+            reference_interpreter = GCodeInterpreter(reference_machine)
+            reference_interpreter.run_gcode_string(gcode)
+            reference_interpreter.run_gcode_string("G1 X10\nG1 X10\nG1 Z1\nG90\nG1 X30\nG1 X40")
+
+            self.assertGreater(interpreter.num_removed_moves, 0)
+            for axis in range(3):
+                self.assertAlmostEqual(
+                    machine.simulated_moves[-1][axis], reference_machine.simulated_moves[-1][axis], msg=gcode)
+
+    def test_simulated_path(self):
+        program = compile_gcode_string(heart.code())
+
+        machine = SimulatedMachine()
+        interpreter = GCodeInterpreter(machine, simplification_tolerance=0.01)
+        interpreter.run_program(program)
+
+        reference_machine = SimulatedMachine()
+        GCodeInterpreter(reference_machine).run_program(program)
+
+        self.assertGreater(interpreter.num_removed_moves, 0)
+        self.assertEqual(len(machine.simulated_moves) + interpreter.num_removed_moves,
+                         len(reference_machine.simulated_moves))
+        for axis in range(3):
+            self.assertAlmostEqual(machine.simulated_moves[-1][axis], reference_machine.simulated_moves[-1][axis])
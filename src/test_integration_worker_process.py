@@ -1,4 +1,5 @@
 import multiprocessing
+import tempfile
 import time
 
 from unittest import mock, TestCase
@@ -77,6 +78,39 @@ class WorkerProcessIntegrationTestCase(TestCase):
         finally:
             worker_process.kill()
 
+    def test_succesful_gcode_file_sending(self):
+        try:
+            with mock.patch('config.MACHINE') as MockMachine, tempfile.NamedTemporaryFile('w') as gcode_file:
+                received_move_coordinates = multiprocessing.Array('c', range(100))
+
+                def mock_move_by_method(x, y, z, feed_rate):
+                    received_move_coordinates.value = b'x=%f y=%f z=%f feed_rate=%f' % (
+                        x,
+                        y,
+                        z,
+                        feed_rate,
+                    )
+
+                type(MockMachine).rapid_move_feed_rate = mock.PropertyMock(return_value=1000)
+                MockMachine.move_by.side_effect = mock_move_by_method
+
+                gcode_file.write("G91\nG0 X1\nG0 X2 Y2 Z1\n")
+                gcode_file.flush()
+
+                worker_process = WorkerProcess.create_and_start()
+                worker_process.send_message_gcode_file(gcode_file.name)
+                time.sleep(0.1)
+                self.assertEqual(
+                    received_move_coordinates.value,
+                    b'x=2.000000 y=2.000000 z=1.000000 feed_rate=1000.000000')
+
+                logs = worker_process.get_logs()
+                self.assertEqual(len(logs), 1)
+                self.assertEqual(logs[0]['level'], 'INFO')
+                self.assertTrue(logs[0]['message'].startswith("gcode interpreted successfully, took"))
+        finally:
+            worker_process.kill()
+
     def test_failed_gcode_sending(self):
         try:
             with mock.patch('config.MACHINE'):
@@ -0,0 +1,52 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from level_of_detail import decimate, level_of_detail_tolerances, levels_of_detail
+from machine.simulated_machine import SimulatedMachine
+
+
+class DecimateTestCase(TestCase):
+    def test_decimate(self):
+        machine = SimulatedMachine()
+        for unused_i in range(10):
+            machine.move_by(0.1, 0, 0, machine.default_feed_rate)
+        machine.set_rapid_moves(True)
+        machine.move_by(0, 0.1, 0, machine.rapid_move_feed_rate)
+        machine.set_rapid_moves(False)
+        machine.move_by(0, 0.1, 0, machine.default_feed_rate)
+        machine.move_by(0, 0.1, 0, machine.default_feed_rate)
+
+        decimated = decimate(machine.simulated_moves, 0.25)
+
+        # The points where the rapid move starts and ends, and the last point, are kept.
+        self.assertEqual(len(decimated), 7)
+        self.assertEqual(decimated[0], (0, 0, 0, False))
+        self.assertAlmostEqual(decimated[1][0], 0.3)
+        self.assertAlmostEqual(decimated[3][0], 0.9)
+        self.assertEqual(decimated[4][1:], (0, 0, False))
+        self.assertEqual(decimated[5][1:], (0.1, 0, True))
+        self.assertEqual(decimated[6][1:], (0.30000000000000004, 0, False))
+
+    def test_tolerances(self):
+        machine = SimulatedMachine()
+        machine.move_by(3, 4, 0, machine.default_feed_rate)
+        self.assertEqual(level_of_detail_tolerances(machine.simulated_moves), [])
+
+        with patch('level_of_detail.LEVEL_OF_DETAIL_MIN_MOVES', 2), \
+                patch('level_of_detail.LEVEL_OF_DETAIL_RELATIVE_TOLERANCES', (0.1, 0.01)):
+            self.assertEqual(level_of_detail_tolerances(machine.simulated_moves), [0.5, 0.05])
+
+    def test_levels_of_detail(self):
+        machine = SimulatedMachine()
+        for unused_i in range(10):
+            machine.move_by(0.1, 0, 0, machine.default_feed_rate)
+        moves = machine.simulated_moves
+
+        self.assertEqual(levels_of_detail(moves), [moves])
+
+        with patch('level_of_detail.LEVEL_OF_DETAIL_MIN_MOVES', 2), \
+                patch('level_of_detail.LEVEL_OF_DETAIL_RELATIVE_TOLERANCES', (0.5,)):
+            levels = levels_of_detail(moves)
+            self.assertEqual(len(levels), 2)
+            self.assertEqual(levels[0], decimate(moves, level_of_detail_tolerances(moves)[0]))
+        self.assertIs(levels[1], moves)
@@ -0,0 +1,144 @@
+import math
+from unittest import TestCase
+
+from motion_planner import MotionPlanner, split_into_ramps
+
+
+class MotionPlannerTestCase(TestCase):
+    def assertFeasible(self, planned_moves, acceleration):
+        """
+        Checks that the moves are planned continuously, starting and ending at zero speed, and that
+        the speed changes within the acceleration limit.
+        """
+        self.assertEqual(planned_moves[0].entry_speed, 0)
+        self.assertEqual(planned_moves[-1].exit_speed, 0)
+        for move, next_move in zip(planned_moves, planned_moves[1:]):
+            self.assertEqual(move.exit_speed, next_move.entry_speed)
+
+        for move in planned_moves:
+            self.assertLessEqual(move.cruise_speed, move.feed_rate / 60 + 1e-9)
+            self.assertLessEqual(move.acceleration_distance + move.deceleration_distance, move.length + 1e-9)
+            self.assertLessEqual(
+                abs(move.exit_speed ** 2 - move.entry_speed ** 2), 2 * acceleration * move.length + 1e-9)
+
+    def test_single_move(self):
+        planner = MotionPlanner(acceleration=100)
+        self.assertEqual(planner.add(100, 0, 0, 600), [])
+
+        planned_move, = planner.flush()
+        self.assertEqual(planned_move.length, 100)
+        self.assertEqual(planned_move.entry_speed, 0)
+        self.assertEqual(planned_move.cruise_speed, 10)
+        self.assertEqual(planned_move.exit_speed, 0)
+
+        # Accelerating and decelerating takes 0.1 s each (over 0.5 mm each), cruising the rest.
+        self.assertAlmostEqual(planned_move.duration, 0.2 + 99 / 10)
+        self.assertAlmostEqual(planned_move.time_at(0), 0)
+        self.assertAlmostEqual(planned_move.time_at(0.005), 0.1)
+        self.assertAlmostEqual(planned_move.time_at(0.5), 0.1 + 49.5 / 10)
+        self.assertAlmostEqual(planned_move.time_at(1), planned_move.duration)
+
+    def test_short_move(self):
+        planner = MotionPlanner(acceleration=100)
+        planner.add(0, 0, 1, 6000)
+        planned_move, = planner.flush()
+
+        # The move is too short to reach the feed rate: it accelerates over half of it and decelerates over
+        # the other half.
+        self.assertAlmostEqual(planned_move.cruise_speed, math.sqrt(100))
+        self.assertAlmostEqual(planned_move.duration, 0.2)
+        self.assertAlmostEqual(planned_move.time_at(0.5), 0.1)
+
+    def test_collinear_moves(self):
+        planner = MotionPlanner(acceleration=100)
+        planned_moves = planner.add_many([(1, 1, 0, 600)] * 10) + planner.flush()
+
+        self.assertEqual(len(planned_moves), 10)
+        self.assertFeasible(planned_moves, 100)
+        # The tool doesn't slow down between the moves.
+        self.assertAlmostEqual(planned_moves[5].entry_speed, 10)
+        self.assertAlmostEqual(sum(move.duration for move in planned_moves), 0.2 + (10 * math.sqrt(2) - 1) / 10)
+
+    def test_corners(self):
+        planner = MotionPlanner(acceleration=100, junction_deviation=0.01)
+        planned_moves = planner.add_many([
+            (10, 0, 0, 600),
+            (0, 10, 0, 600),  # a right angle
+            (0, -10, 0, 600),  # turning back
+            (0, -10, 0, 600),
+        ]) + planner.flush()
+
+        self.assertFeasible(planned_moves, 100)
+        sin_theta_d2 = math.sqrt(0.5)
+        self.assertAlmostEqual(planned_moves[1].entry_speed, math.sqrt(100 * 0.01 * sin_theta_d2 / (1 - sin_theta_d2)))
+        self.assertEqual(planned_moves[2].entry_speed, 0)
+        self.assertAlmostEqual(planned_moves[3].entry_speed, 10)
+
+    def test_feed_rate_change(self):
+        planner = MotionPlanner(acceleration=100)
+        planned_moves = planner.add_many([(10, 0, 0, 600), (10, 0, 0, 300)]) + planner.flush()
+
+        self.assertFeasible(planned_moves, 100)
+        self.assertAlmostEqual(planned_moves[1].entry_speed, 5)
+
+    def test_lookahead_window(self):
+        planner = MotionPlanner(acceleration=100, lookahead_window=4)
+        moves = [(math.cos(i / 10), math.sin(i / 10), 0, 6000) for i in range(20)]
+
+        planned_moves = []
+        for i, move in enumerate(moves):
+            finalized = planner.add(*move)
+            # The most recent moves are kept to be planned.
+            self.assertEqual(len(planned_moves) + len(finalized), max(0, i + 1 - 4))
+            planned_moves += finalized
+        planned_moves += planner.flush()
+
+        self.assertEqual([(move.x, move.y, move.z, move.feed_rate) for move in planned_moves], moves)
+        self.assertFeasible(planned_moves, 100)
+        # The tool accelerates through the gentle curve, more than it could within a single move.
+        self.assertGreater(max(move.entry_speed for move in planned_moves), math.sqrt(2 * 100 * 1))
+
+    def test_moves_after_flush_start_from_standstill(self):
+        planner = MotionPlanner(acceleration=100)
+        planner.add(10, 0, 0, 600)
+        planner.flush()
+        planner.add(10, 0, 0, 600)
+        planned_move, = planner.flush()
+
+        self.assertEqual(planned_move.entry_speed, 0)
+
+    def test_zero_length_moves_are_ignored(self):
+        planner = MotionPlanner(acceleration=100)
+        planner.add(0, 0, 0, 600)
+        self.assertEqual(planner.flush(), [])
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            MotionPlanner(acceleration=0)
+        with self.assertRaises(ValueError):
+            MotionPlanner(acceleration=100, lookahead_window=0)
+
+
+class SplitIntoRampsTestCase(TestCase):
+    def test_split_into_ramps(self):
+        planner = MotionPlanner(acceleration=100)
+        planner.add(100, 0, 0, 600)
+        planned_move, = planner.flush()
+
+        ramps = split_into_ramps(planned_move, max_speed_ratio=2, min_speed=1)
+
+        # Accelerating from 1 to 10 mm/s takes 4 ramps, as does decelerating.
+        self.assertEqual(len(ramps), 9)
+        self.assertAlmostEqual(sum(distance for distance, unused_entry_speed, unused_exit_speed in ramps), 100)
+        self.assertEqual(ramps[0][1], 1)
+        self.assertEqual(ramps[4], (99, 10, 10))
+        self.assertEqual(ramps[-1][2], 1)
+        for (unused_distance, unused_entry_speed, exit_speed), (unused_next_distance, next_entry_speed, unused) in zip(
+                ramps, ramps[1:]):
+            self.assertAlmostEqual(exit_speed, next_entry_speed)
+        for distance, entry_speed, exit_speed in ramps:
+            self.assertLessEqual(max(entry_speed, exit_speed) / min(entry_speed, exit_speed), 2 + 1e-9)
+            if entry_speed != exit_speed:
+                # The acceleration is constant - slightly lower than planned, as the ramps start at 1 mm/s
+                # and take the planned distance.
+                self.assertAlmostEqual(abs(exit_speed ** 2 - entry_speed ** 2) / (2 * distance), 99)
@@ -0,0 +1,34 @@
+import struct
+
+from unittest import TestCase
+
+from machine.simulated_machine import SimulatedMachine
+from moves_to_binary import MOVES_BINARY_HEADER_STRUCT, MOVES_BINARY_MAGIC, MOVES_BINARY_VERSION, moves_to_binary
+
+
+class MovesToBinaryTestCase(TestCase):
+    def test_encoding(self):
+        machine = SimulatedMachine()
+        machine.move_by(1, 2, 3, machine.default_feed_rate)
+        machine.set_rapid_moves(True)
+        machine.move_by(0.5, 0, -3, machine.rapid_move_feed_rate)
+
+        data = moves_to_binary(machine.simulated_moves)
+
+        self.assertEqual(
+            MOVES_BINARY_HEADER_STRUCT.unpack_from(data),
+            (MOVES_BINARY_MAGIC, MOVES_BINARY_VERSION, 3),
+        )
+        self.assertEqual(
+            struct.unpack_from('<9f', data, MOVES_BINARY_HEADER_STRUCT.size),
+            (0, 0, 0, 1, 2, 3, 1.5, 2, 0),
+        )
+        self.assertEqual(data[MOVES_BINARY_HEADER_STRUCT.size + 9 * 4:], b'\x00\x00\x01')
+
+    def test_moves_can_be_added_afterwards(self):
+        machine = SimulatedMachine()
+        moves_to_binary(machine.simulated_moves)
+
+        # The column views should have been released
+        machine.move_by(1, 2, 3, machine.default_feed_rate)
+        self.assertEqual(len(machine.simulated_moves), 2)
@@ -0,0 +1,37 @@
+import io
+import xml.etree.ElementTree
+
+from unittest import TestCase
+
+from machine.simulated_machine import SimulatedMachine
+from moves_to_svg import write_svg
+
+SVG_NAMESPACE = '{http://www.w3.org/2000/svg}'
+
+
+class WriteSvgTestCase(TestCase):
+    def _render(self, moves, tool_diameter=1, pixels_per_mm=10):
+        stream = io.StringIO()
+        write_svg(moves, stream, tool_diameter, pixels_per_mm)
+        return xml.etree.ElementTree.fromstring(stream.getvalue())
+
+    def test_paths(self):
+        machine = SimulatedMachine()
+        machine.move_by(1, 2, 3, machine.default_feed_rate)
+        machine.set_rapid_moves(True)
+        machine.move_by(-0.5, 0, -3, machine.rapid_move_feed_rate)
+
+        svg = self._render(machine.simulated_moves)
+
+        self.assertEqual(svg.get('viewBox'), '-20,-20,50,60')
+        tool_path, direction_path = svg.findall(SVG_NAMESPACE + 'path')
+        self.assertEqual(tool_path.get('d'), 'M0,0 L 0,0 10,20 5,20')
+        self.assertEqual(tool_path.get('stroke-width'), '10')
+        self.assertEqual(direction_path.get('d'), tool_path.get('d'))
+        self.assertEqual(direction_path.get('stroke-width'), '3')
+
+    def test_grid(self):
+        svg = self._render([(0, 0, 0, False), (2.5, 1, 0, False)])
+
+        # x = 0, 1, 2, 3 and y = 0, 1
+        self.assertEqual(len(svg.findall(SVG_NAMESPACE + 'line')), 6)
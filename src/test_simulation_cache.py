@@ -0,0 +1,93 @@
+import os
+import pickle
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from machine.base import DEFAULT_ARC_TOLERANCE
+from simulation_cache import SimulationCache, simulate, simulation_key
+
+PROGRAM = 'emit("G91 G17 G2 X10 Y0 I5 J0")'
+OTHER_PROGRAM = 'emit("G91 G1 X10")'
+
+
+class SimulationCacheTestCase(TestCase):
+    def test_memory_hit(self):
+        cache = SimulationCache()
+
+        moves = cache.get_or_simulate(PROGRAM)
+        self.assertEqual(moves, simulate(PROGRAM))
+        self.assertIs(cache.get_or_simulate(PROGRAM), moves)
+        self.assertEqual(cache.stats, {'memory_hits': 1, 'disk_hits': 0, 'misses': 1, 'entries': 1})
+
+    def test_arc_tolerance_is_a_part_of_the_key(self):
+        self.assertNotEqual(simulation_key(PROGRAM, 0.01), simulation_key(PROGRAM, 0.1))
+
+        cache = SimulationCache()
+        self.assertNotEqual(
+            len(cache.get_or_simulate(PROGRAM, arc_tolerance=0.01)),
+            len(cache.get_or_simulate(PROGRAM, arc_tolerance=0.1)),
+        )
+        self.assertEqual(cache.stats['misses'], 2)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = SimulationCache(max_entries=1)
+
+        cache.get_or_simulate(PROGRAM)
+        cache.get_or_simulate(OTHER_PROGRAM)
+        cache.get_or_simulate(PROGRAM)
+        self.assertEqual(cache.stats, {'memory_hits': 0, 'disk_hits': 0, 'misses': 3, 'entries': 1})
+
+    def test_levels_of_detail(self):
+        cache = SimulationCache(max_entries=1)
+
+        levels = cache.get_or_simulate_levels_of_detail(PROGRAM)
+        self.assertEqual(levels, [simulate(PROGRAM)])
+        self.assertIs(levels[-1], cache.get_or_simulate(PROGRAM))
+
+        with patch('simulation_cache.levels_of_detail') as levels_of_detail_mock:
+            self.assertIs(cache.get_or_simulate_levels_of_detail(PROGRAM), levels)
+            levels_of_detail_mock.assert_not_called()
+
+        # The levels are evicted along with the moves.
+        cache.get_or_simulate(OTHER_PROGRAM)
+        self.assertIsNot(cache.get_or_simulate_levels_of_detail(PROGRAM), levels)
+
+    def test_errors_are_not_cached(self):
+        cache = SimulationCache()
+
+        for unused_i in range(2):
+            with self.assertRaises(ZeroDivisionError):
+                cache.get_or_simulate('1 / 0')
+        self.assertEqual(cache.stats['entries'], 0)
+
+    def test_corrupted_disk_entry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            moves = SimulationCache(directory=directory).get_or_simulate(PROGRAM)
+            path = os.path.join(directory, simulation_key(PROGRAM, DEFAULT_ARC_TOLERANCE) + '.pickle')
+
+            for corrupted_data in (b'', pickle.dumps(moves)[:-10], b'\x80\x04cno_such_module\nX\n.'):
+                with open(path, 'wb') as f:
+                    f.write(corrupted_data)
+
+                cache = SimulationCache(directory=directory)
+                self.assertEqual(cache.get_or_simulate(PROGRAM), moves)
+                self.assertEqual(cache.stats['misses'], 1)
+
+                # The corrupted file has been replaced.
+                cache = SimulationCache(directory=directory)
+                self.assertEqual(cache.get_or_simulate(PROGRAM), moves)
+                self.assertEqual(cache.stats['disk_hits'], 1)
+
+    def test_disk_hit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            moves = SimulationCache(directory=directory).get_or_simulate(PROGRAM)
+
+            cache = SimulationCache(directory=directory)
+            with patch('simulation_cache.simulate') as simulate_mock:
+                self.assertEqual(cache.get_or_simulate(PROGRAM), moves)
+                self.assertEqual(cache.get_or_simulate(PROGRAM), moves)
+                simulate_mock.assert_not_called()
+
+            self.assertEqual(cache.stats, {'memory_hits': 1, 'disk_hits': 1, 'misses': 0, 'entries': 1})
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+
+from unittest import TestCase
+
+from svg_store import SvgStore, remove_stale_svg_files
+
+
+class FakeClock():
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class SvgStoreTestCase(TestCase):
+    def test_content_addressed(self):
+        store = SvgStore()
+
+        key = store.put('<svg />')
+        self.assertEqual(store.put('<svg />'), key)
+        self.assertNotEqual(store.put('<svg></svg>'), key)
+        self.assertEqual(store.get(key), b'<svg />')
+        self.assertEqual(store.num_bytes, len('<svg />') + len('<svg></svg>'))
+        self.assertIsNone(store.get('0' * 64))
+
+    def test_ttl(self):
+        clock = FakeClock()
+        store = SvgStore(ttl=10, clock=clock)
+
+        key = store.put('<svg />')
+        clock.now = 9
+        self.assertEqual(store.get(key), b'<svg />')
+        clock.now = 10
+        self.assertIsNone(store.get(key))
+        self.assertEqual(store.num_bytes, 0)
+
+    def test_size_limit(self):
+        store = SvgStore(max_bytes=20)
+
+        first_key = store.put('<svg id="1" />')
+        second_key = store.put('<svg id="2" />')
+        self.assertIsNone(store.get(first_key))
+        self.assertEqual(store.get(second_key), b'<svg id="2" />')
+
+
+class RemoveStaleSvgFilesTestCase(TestCase):
+    def test_remove_stale_svg_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            stale_file_name = 'a' * 40 + '.svg'
+            fresh_file_name = 'b' * 40 + '.svg'
+            other_file_name = 'image.svg'
+
+            for name in [stale_file_name, fresh_file_name, other_file_name]:
+                with open(os.path.join(directory, name), 'w') as f:
+                    f.write('<svg />')
+
+            old_time = time.time() - 100
+            for name in [stale_file_name, other_file_name]:
+                os.utime(os.path.join(directory, name), (old_time, old_time))
+
+            self.assertEqual(remove_stale_svg_files(directory, 50), 1)
+            self.assertEqual(sorted(os.listdir(directory)), [fresh_file_name, other_file_name])
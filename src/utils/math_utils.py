@@ -1,9 +1,7 @@
 import math
 import typing
 
-from typeguard import typechecked
-
-from utils.typing import Numeric
+from utils.typing import Numeric, typechecked
 
 
 @typechecked
@@ -21,3 +19,24 @@ def euclidean_distance(
     x2, y2, z2 = point2
 
     return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2)
+
+
+@typechecked
+def arc_num_segments(radius: Numeric, angle: Numeric, tolerance: Numeric) -> int:
+    """
+    Returns the minimal number of equal chords an arc has to be approximated with, so that the chords
+    deviate from the arc by at most given tolerance.
+
+    A chord spanning angle a deviates from the arc by radius * (1 - cos(a / 2)), so each chord may span
+    at most 2 * acos(1 - tolerance / radius).
+
+    Args:
+        radius: the arc radius
+        angle: the (absolute) angle the arc spans, in radians
+        tolerance: the maximum allowed deviation, in the same units as the radius
+    """
+    if tolerance <= 0:
+        raise ValueError("Arc tolerance should be positive, not %s" % tolerance)
+
+    max_angle_per_segment = 2 * math.acos(max(1 - tolerance / radius, -1))
+    return max(1, math.ceil(abs(angle) / max_angle_per_segment))
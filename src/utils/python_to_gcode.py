@@ -5,7 +5,7 @@ that emits G-code with emit() calls.
 
 import os
 
-from typeguard import typechecked
+from utils.typing import typechecked
 
 # We want the following utilities to be visible to the executed code
 # so that it is able to call them
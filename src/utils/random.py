@@ -1,7 +1,7 @@
 import binascii
 import os
 
-from typeguard import typechecked
+from utils.typing import typechecked
 
 
 @typechecked
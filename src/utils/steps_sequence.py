@@ -1,8 +1,7 @@
+import heapq
 import typing
 
-from typeguard import typechecked
-
-from utils.typing import Numeric
+from utils.typing import Numeric, typechecked
 
 
 @typechecked
@@ -28,28 +27,53 @@ def create_steps_sequence(num_steps: Numeric, axis: str) -> typing.List[typing.T
     return sequence
 
 
-@typechecked
-def create_xyz_steps_sequence(
+def _iterate_steps(num_steps: int, axis: str) -> typing.Iterator[typing.Tuple[float, str]]:
+    """
+    Yields the same tuples as create_steps_sequence, without building a list.
+    """
+    for step in range(num_steps):
+        yield (step * 1.0 / num_steps, axis)
+
+
+# Not typechecked, as typeguard would check every yielded tuple - and there may be tens of thousands of steps
+# per millimeter.
+def iterate_xyz_steps(
         num_x_steps: int,
         num_y_steps: int,
-        num_z_steps: int) -> typing.List[typing.Tuple[float, str]]:
+        num_z_steps: int) -> typing.Iterator[typing.Tuple[float, str]]:
     """
     Let's assume, you want to execute num_x_steps stepper motor steps on X axis, num_y_steps on Y axis, num_z_steps
     on Z axis in one time period (e.g. one second).
 
-    This function returns a list of tuples what paricular step on what axis in what time period should be executed.
+    This function yields tuples what paricular step on what axis in what time period should be executed, ordered
+    by time (and by axis, if the steps on different axes happen at the same time).
+
+    The steps of each axis are spaced evenly in time (as in a DDA interpolator), so the sequences of the axes
+    are already ordered and only need to be merged - in constant memory, no matter how many steps there are.
 
     Example:
 
-    >>> create_xyz_steps_sequence(num_x_steps=5, num_y_steps=2, num_z_steps=0)
+    >>> list(iterate_xyz_steps(num_x_steps=5, num_y_steps=2, num_z_steps=0))
     [(0.0, 'X'), (0.0, 'Y'), (0.2, 'X'), (0.4, 'X'), (0.5, 'Y'), (0.6, 'X'), (0.8, 'X')]
     """
-    sequence_x = create_steps_sequence(num_x_steps, 'X')
-    sequence_y = create_steps_sequence(num_y_steps, 'Y')
-    sequence_z = create_steps_sequence(num_z_steps, 'Z')
-
-    return sorted(
-        sequence_x +
-        sequence_y +
-        sequence_z
+    return heapq.merge(
+        _iterate_steps(num_x_steps, 'X'),
+        _iterate_steps(num_y_steps, 'Y'),
+        _iterate_steps(num_z_steps, 'Z'),
     )
+
+
+@typechecked
+def create_xyz_steps_sequence(
+        num_x_steps: int,
+        num_y_steps: int,
+        num_z_steps: int) -> typing.List[typing.Tuple[float, str]]:
+    """
+    Returns the steps yielded by iterate_xyz_steps as a list.
+
+    Example:
+
+    >>> create_xyz_steps_sequence(num_x_steps=5, num_y_steps=2, num_z_steps=0)
+    [(0.0, 'X'), (0.0, 'Y'), (0.2, 'X'), (0.4, 'X'), (0.5, 'Y'), (0.6, 'X'), (0.8, 'X')]
+    """
+    return list(iterate_xyz_steps(num_x_steps, num_y_steps, num_z_steps))
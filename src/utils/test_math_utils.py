@@ -2,7 +2,7 @@ import math
 
 from unittest import TestCase
 
-from utils.math_utils import euclidean_distance
+from utils.math_utils import arc_num_segments, euclidean_distance
 
 
 class EuclideanDistanceTestCase(TestCase):
@@ -48,3 +48,23 @@ class EuclideanDistanceTestCase(TestCase):
             ),
             math.sqrt(3)
         )
+
+
+class ArcNumSegmentsTestCase(TestCase):
+    def test_deviation_within_tolerance(self):
+        for radius in [0.5, 1, 10, 500]:
+            for tolerance in [0.001, 0.01, 0.1]:
+                num_segments = arc_num_segments(radius, 2 * math.pi, tolerance)
+                deviation = radius * (1 - math.cos(math.pi / num_segments))
+
+                self.assertLessEqual(deviation, tolerance)
+                if num_segments > 1:
+                    # One segment less would be too few
+                    self.assertGreater(radius * (1 - math.cos(math.pi / (num_segments - 1))), tolerance)
+
+    def test_tolerance_larger_than_radius(self):
+        self.assertEqual(arc_num_segments(1, math.pi / 2, 5), 1)
+
+    def test_invalid_tolerance(self):
+        with self.assertRaises(ValueError):
+            arc_num_segments(1, math.pi, 0)
@@ -0,0 +1,31 @@
+import itertools
+
+from unittest import TestCase
+
+from utils.steps_sequence import create_steps_sequence, iterate_xyz_steps
+
+
+def sorted_xyz_steps_sequence(num_x_steps, num_y_steps, num_z_steps):
+    """
+    The way the steps used to be ordered: all the steps in one list, sorted.
+    """
+    return sorted(
+        create_steps_sequence(num_x_steps, 'X') +
+        create_steps_sequence(num_y_steps, 'Y') +
+        create_steps_sequence(num_z_steps, 'Z')
+    )
+
+
+class IterateXyzStepsTestCase(TestCase):
+    def test_same_as_sorted(self):
+        step_counts = [0, 1, 2, 3, 7, 10, 64, 100, 333, 1000]
+        for num_steps in itertools.product(step_counts, repeat=3):
+            self.assertEqual(list(iterate_xyz_steps(*num_steps)), sorted_xyz_steps_sequence(*num_steps))
+
+    def test_same_as_sorted_many_steps(self):
+        num_steps = (6400 * 7, 6400 * 3 + 17, 31)
+        self.assertEqual(list(iterate_xyz_steps(*num_steps)), sorted_xyz_steps_sequence(*num_steps))
+
+    def test_lazy(self):
+        steps = iterate_xyz_steps(10 ** 12, 10 ** 12, 0)
+        self.assertEqual(list(itertools.islice(steps, 3)), [(0.0, 'X'), (0.0, 'Y'), (1e-12, 'X')])
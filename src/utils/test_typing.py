@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+from unittest import TestCase
+
+from utils.typing import DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE
+
+# Calls a typechecked function with an argument of a wrong type and prints whether it has been rejected
+CHECK_SCRIPT = """
+from utils.typing import typechecked
+
+@typechecked
+def identity(value: int) -> int:
+    return value
+
+try:
+    identity('0')
+    print('accepted')
+except TypeError:
+    print('rejected')
+"""
+
+
+class TypecheckedTestCase(TestCase):
+    def _run_check_script(self, env):
+        return subprocess.check_output([sys.executable, '-c', CHECK_SCRIPT], env=env).decode('ascii').strip()
+
+    def test_enabled_by_default(self):
+        env = dict(os.environ)
+        env.pop(DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE, None)
+        self.assertEqual(self._run_check_script(env), 'rejected')
+
+    def test_disabled(self):
+        env = dict(os.environ)
+        env[DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE] = '1'
+        self.assertEqual(self._run_check_script(env), 'accepted')
@@ -1,9 +1,7 @@
 import pygcode
 
-from typeguard import typechecked
-
 from gcode_interpreter import Mode
-from utils.typing import Numeric
+from utils.typing import Numeric, typechecked
 
 
 class TranslatorAndScaler():
@@ -38,7 +36,10 @@ class TranslatorAndScaler():
         elif isinstance(gcode, pygcode.gcodes.GCodeAbsoluteDistanceMode):
             self._mode = Mode.ABSOLUTE
             return gcode
-        elif isinstance(gcode, pygcode.gcodes.GCodeSelectXYPlane):
+        elif (
+                isinstance(gcode, pygcode.gcodes.GCodeSelectXYPlane) or
+                isinstance(gcode, pygcode.gcodes.GCodeSelectZXPlane) or
+                isinstance(gcode, pygcode.gcodes.GCodeSelectYZPlane)):
             return gcode
         elif isinstance(gcode, pygcode.gcodes.GCodeFeedRate):
             return gcode
@@ -77,12 +78,10 @@ class TranslatorAndScaler():
                 gcode.params['Z'].value *= scale
 
             if isinstance(gcode, pygcode.gcodes.GCodeArcMoveCW) or isinstance(gcode, pygcode.gcodes.GCodeArcMoveCCW):
-                assert 'I' in gcode.params
-                assert 'J' in gcode.params
-                assert 'R' not in gcode.params
-
-                gcode.params['I'].value *= scale
-                gcode.params['J'].value *= scale
+                # The center offsets and the radius are relative, so they are only scaled.
+                for word in ['I', 'J', 'K', 'R']:
+                    if word in gcode.params:
+                        gcode.params[word].value *= scale
             return gcode
         else:
             raise Exception("Unknown gcode: %s" % repr(gcode))
@@ -1,8 +1,21 @@
+import os
 import typing
 from unittest.mock import MagicMock
 
+import typeguard
+
+
+# If this environment variable is set to a non-empty value, @typechecked doesn't check anything. This removes
+# the overhead of checking the arguments and return values on every call in production (see launch.sh),
+# while the checks stay enabled e.g. in tests.
+DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE = 'CNC_DISABLE_TYPECHECKING'
+
 Numeric = typing.Union[int, float]
 
+# A sequence of (x, y, z, feed rate) moves. The moves themselves aren't type checked, as checking each of them
+# would cost about as much as passing them one by one.
+MoveRows = typing.Sequence[typing.Any]
+
 
 def mockable(cls):
     """
@@ -15,3 +28,13 @@ def mockable(cls):
     https://github.com/agronholm/typeguard/issues/96
     """
     return typing.Union[cls, MagicMock]
+
+
+if os.environ.get(DISABLE_TYPECHECKING_ENVIRONMENT_VARIABLE):
+    def typechecked(func):
+        """
+        A replacement of typeguard.typechecked that returns the function unchanged.
+        """
+        return func
+else:
+    typechecked = typeguard.typechecked
@@ -5,10 +5,9 @@ import time
 import traceback
 import typing
 
-from typeguard import typechecked
-
 import config
 import gcode_interpreter
+from utils.typing import typechecked
 
 
 class WorkerProcessAlreadyStartedException(Exception):
@@ -32,6 +31,7 @@ class WorkerProcessMessage(enum.Enum):
     """
     INITIALIZE = 'INITIALIZE'
     GCODE = 'GCODE'
+    GCODE_FILE = 'GCODE_FILE'
 
 
 class WorkerProcess():
@@ -70,6 +70,14 @@ class WorkerProcess():
     def send_message_gcode(self, gcode: str) -> None:
         self._command_queue.put((WorkerProcessMessage.GCODE, gcode))
 
+    @typechecked
+    def send_message_gcode_file(self, path: str) -> None:
+        """
+        Run G-code from a file. Only the path is sent to the process, and the file is read line by line,
+        so that large programs don't have to be kept in memory.
+        """
+        self._command_queue.put((WorkerProcessMessage.GCODE_FILE, path))
+
     @typechecked
     def kill(self) -> None:
         self._process.terminate()
@@ -101,15 +109,28 @@ class WorkerProcess():
                         'level': WorkerProcessLogItemLevel.INFO.value,
                         'message': "Machine initialized successfully"
                     })
-                elif message == WorkerProcessMessage.GCODE:
+                elif message == WorkerProcessMessage.GCODE or message == WorkerProcessMessage.GCODE_FILE:
                     start_time = time.time()
 
-                    gcode_interpreter.GCodeInterpreter(machine).run_gcode_string(data)
+                    interpreter = gcode_interpreter.GCodeInterpreter(
+                        machine,
+                        flush_policy=config.GCODE_FLUSH_POLICY,
+                        simplification_tolerance=config.GCODE_SIMPLIFICATION_TOLERANCE,
+                    )
+                    if message == WorkerProcessMessage.GCODE:
+                        interpreter.run_gcode_string(data)
+                    else:
+                        with open(data) as f:
+                            interpreter.run_gcode_stream(f)
                     gcode_execution_time = time.time() - start_time
 
+                    log_message = "gcode interpreted successfully, took %.02f seconds" % gcode_execution_time
+                    if config.GCODE_SIMPLIFICATION_TOLERANCE is not None:
+                        log_message += ", %d moves removed by simplification" % interpreter.num_removed_moves
+
                     log_queue.put({
                         'level': WorkerProcessLogItemLevel.INFO.value,
-                        'message': "gcode interpreted successfully, took %.02f seconds" % gcode_execution_time,
+                        'message': log_message,
                     })
                 else:
                     assert(False)